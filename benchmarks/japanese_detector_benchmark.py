@@ -0,0 +1,133 @@
+"""
+日本語判定ベンチマーク
+
+saved_conversations に保存された会話ログの各発言に対して、
+従来のASCII比率ヒューリスティックと core.japanese_detector の判定を比較し、
+修正呼び出し（LLMへの追加リクエスト）が発生する件数と判定時間を表示します。
+保存済みの会話ログは修正後の日本語が大半のため、このコーパスでは両者の修正呼び出し件数は変わりません
+（判定時間のみ差が出る）。不要な修正呼び出しの差は、URL・コード・数値を含む正当な日本語と
+実際に外国語が混入した文章のラベル付きサンプルで比較します。
+
+使い方:
+    python benchmarks/japanese_detector_benchmark.py [会話ログのディレクトリ ...]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.japanese_detector import detect_japanese  # noqa: E402
+
+DEFAULT_CORPUS_DIR = Path(__file__).resolve().parent.parent / "saved_conversations"
+_STATEMENT_HEADER = re.compile(r"^### \[.*?\] .*$", re.MULTILINE)
+
+
+# (テキスト, 修正が必要か)
+LABELED_SAMPLES: List[Tuple[str, bool]] = [
+    ("詳細は https://example.com/reports/2024/ai-adoption-survey.html を参照してください。", False),
+    ("設定例:\n```python\nclient = OpenAI(api_key=os.environ['OPENAI_API_KEY'])\nresponse = client.chat.completions.create(model='gpt-4o')\n```\nこのように初期化します。", False),
+    ("## 1. 概要\n- 売上: 1,200万円 (前年比 +15.3%)\n- 利益率: 8.5% → 11.2%\n- KPI: MAU 45,000 / DAU 12,000", False),
+    ("`pip install -r requirements.txt` を実行してから `python main.py` で起動します。", False),
+    ("問い合わせ先は support@example.co.jp です。", False),
+    ("| 指標 | 2023 | 2024 |\n|---|---|---|\n| CPU | 45% | 62% |\n| RAM | 8GB | 16GB |", False),
+    ("GDPR (General Data Protection Regulation) とCCPAへの対応が必要です。", False),
+    ("AWS Lambda・Amazon S3・CloudFront を組み合わせたサーバーレス構成を提案します。", False),
+    ("This proposal focuses on cost reduction and operational efficiency across all departments.", True),
+    ("まず現状を整理します。However, we should also consider the long-term impact on employees and their careers.", True),
+    ("我们应该重视人工智能技术在农业领域的应用与发展前景问题研究", True),
+    ("농업 인구 감소 문제를 해결하기 위해 스마트 농업을 도입해야 합니다.", True),
+    ("結論として、Additionally the regulatory framework must evolve alongside technological progress and adoption.", True),
+]
+
+
+def legacy_needs_correction(text: str) -> bool:
+    """MeetingManager._ensure_japanese_output の従来の判定（比較用）"""
+    if not text.strip():
+        return False
+    non_japanese_char_threshold = 0.3
+    min_japanese_char_ratio = 0.6
+    ascii_chars = len(re.findall(r'[ -~]', text))
+    total_chars = len(text)
+    japanese_chars = len(re.findall(r'[぀-ゟ゠-ヿ一-鿿々]', text))
+    if (ascii_chars / total_chars) > non_japanese_char_threshold and japanese_chars < (total_chars * (1 - non_japanese_char_threshold) * 0.8):
+        return True
+    if (japanese_chars / total_chars) < min_japanese_char_ratio and total_chars > 20:
+        return True
+    return False
+
+
+def load_statements(directories: List[Path]) -> List[str]:
+    """会話ログ(Markdown)から発言本文を取り出す"""
+    statements: List[str] = []
+    for directory in directories:
+        for path in sorted(directory.glob("*.md")):
+            text = path.read_text(encoding="utf-8")
+            headers = list(_STATEMENT_HEADER.finditer(text))
+            for header, next_header in zip(headers, headers[1:] + [None]):
+                body = text[header.end():next_header.start() if next_header else len(text)]
+                body = body.strip().removesuffix("---").strip()
+                if body:
+                    statements.append(body)
+    return statements
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="日本語判定ベンチマーク")
+    parser.add_argument("directories", nargs="*", type=Path, default=[DEFAULT_CORPUS_DIR])
+    parser.add_argument("--repeat", type=int, default=20, help="時間計測の繰り返し回数")
+    args = parser.parse_args()
+
+    statements = load_statements(args.directories)
+    if not statements:
+        print("発言が見つかりませんでした。")
+        return
+
+    legacy_flagged = [text for text in statements if legacy_needs_correction(text)]
+    detector_results = [detect_japanese(text) for text in statements]
+    detector_flagged = [result for result in detector_results if result.needs_correction]
+
+    legacy_seconds = timeit.timeit(
+        lambda: [legacy_needs_correction(text) for text in statements], number=args.repeat
+    ) / args.repeat
+    detector_seconds = timeit.timeit(
+        lambda: [detect_japanese(text) for text in statements], number=args.repeat
+    ) / args.repeat
+
+    total_chars = sum(len(text) for text in statements)
+    print(f"発言数: {len(statements)} ({total_chars}文字)")
+    print(f"{'判定方式':<20}{'修正呼び出し':>12}{'1発言あたり時間(µs)':>22}")
+    print(f"{'従来ヒューリスティック':<20}{len(legacy_flagged):>12}{legacy_seconds / len(statements) * 1e6:>22.1f}")
+    print(f"{'japanese_detector':<20}{len(detector_flagged):>12}{detector_seconds / len(statements) * 1e6:>22.1f}")
+    print(
+        f"保存済みの会話ログ: 修正呼び出しの削減 {len(legacy_flagged) - len(detector_flagged)}件、"
+        f"判定時間は従来の{detector_seconds / legacy_seconds:.0%}"
+        "（保存済みの発言は修正後の日本語が大半のため、修正呼び出しの差はラベル付きサンプルで比較する）"
+    )
+
+    legacy_errors = sum(legacy_needs_correction(text) != expected for text, expected in LABELED_SAMPLES)
+    detector_errors = sum(detect_japanese(text).needs_correction != expected for text, expected in LABELED_SAMPLES)
+    unnecessary_legacy = sum(legacy_needs_correction(text) for text, expected in LABELED_SAMPLES if not expected)
+    unnecessary_detector = sum(detect_japanese(text).needs_correction for text, expected in LABELED_SAMPLES if not expected)
+    print(f"\nラベル付きサンプル {len(LABELED_SAMPLES)}件:")
+    print(f"  従来ヒューリスティック: 誤判定 {legacy_errors}件 (うち不要な修正呼び出し {unnecessary_legacy}件)")
+    print(f"  japanese_detector: 誤判定 {detector_errors}件 (うち不要な修正呼び出し {unnecessary_detector}件)")
+
+    if detector_flagged:
+        print("\njapanese_detector が修正対象とした文:")
+        for result in detector_flagged:
+            for sentence in result.flagged_sentences:
+                print(f"  [{sentence.reason}] {sentence.text.strip()[:80]}")
+    if legacy_flagged:
+        print("\n従来ヒューリスティックが修正対象とした発言（冒頭）:")
+        for text in legacy_flagged:
+            print(f"  {text[:80].replace(chr(10), ' ')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,15 @@ from .base_client import BaseAIClient # AIResponse は削除 (代替案1のた
 from .openai_client import OpenAIClient
 from .claude_client import ClaudeClient
 from .gemini_client import GeminiClient
+from .local_client import LocalClient
+from .fake_client import FakeClient
 
 __all__ = [
     "BaseAIClient",
     "OpenAIClient",
     "ClaudeClient",
     "GeminiClient",
+    "LocalClient",
+    "FakeClient",
 ]
 # --- END OF FILE core/api_clients/__init__.py ---
\ No newline at end of file
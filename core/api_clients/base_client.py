@@ -1,32 +1,67 @@
+import asyncio
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Mapping, Tuple, Type
 
+from ..cassette import Cassette, decode_response, encode_response, request_fingerprint
+from ..exceptions import APIConnectionError, APITimeoutError, CircuitOpenError, RateLimitError
 from ..models import ModelInfo
-from ..utils import RateLimiter
+from ..response_cache import ResponseCache
+from ..rate_scheduler import ProviderRateScheduler, RateReservation, get_rate_scheduler
+from ..retry_policy import (
+    RETRYABLE_STATUS_CODES,
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    RetryPolicy,
+    error_headers,
+    error_status_code,
+    get_circuit_breaker,
+    get_concurrency_limiter,
+    parse_retry_after,
+)
+from ..utils import count_tokens, extract_content_and_tokens
 
 logger = logging.getLogger(__name__)
 
 class BaseAIClient(ABC):
     """AIクライアントの抽象基底クラス"""
 
+    # リトライする例外（各サブクラスでプロバイダー固有の例外を指定）。これ以外も RETRYABLE_STATUS_CODES のステータスならリトライする
+    retryable_exceptions: Tuple[Type[BaseException], ...] = (APITimeoutError, APIConnectionError, RateLimitError)
+    # レート制限を示す例外（ステータス 429 の例外も含む）
+    rate_limit_exceptions: Tuple[Type[BaseException], ...] = (RateLimitError,)
+
     def __init__(
         self,
         api_key: str,
         model_info: ModelInfo,
-        rate_limit_per_second: float = 1.0,
+        rate_scheduler: Optional[ProviderRateScheduler] = None,
         default_timeout: float = 60.0,
         max_retries: int = 3,
+        retry_policy: Optional[RetryPolicy] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        cassette: Optional[Cassette] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
         self.api_key = api_key
         self.model_info = model_info
-        self.rate_limiter = RateLimiter(calls_per_second=rate_limit_per_second)
+        # 同じプロバイダー・APIキーを使う全クライアントで共有するレートスケジューラ・同時送信数リミッター・サーキットブレーカー
+        self.rate_scheduler = rate_scheduler or get_rate_scheduler(model_info.provider, api_key)
+        self.concurrency_limiter = concurrency_limiter or get_concurrency_limiter(model_info.provider, api_key)
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(model_info.provider, api_key)
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=max_retries)
         self.default_timeout = default_timeout
-        self.max_retries = max_retries
+        self.max_retries = self.retry_policy.max_retries
+        # 応答を記録・再生するカセット（None の場合はそのままプロバイダーを呼ぶ）
+        self.cassette = cassette
+        # 同じリクエストの応答を再利用するキャッシュ（None の場合はキャッシュしない）
+        self.response_cache = response_cache
 
         logger.info(
             f"BaseAIClient initialized for {model_info.provider.value} - {model_info.name} "
-            f"with rate_limit={rate_limit_per_second}, default_timeout={self.default_timeout}, max_retries={self.max_retries}"
+            f"with rate_scheduler={self.rate_scheduler.name}, default_timeout={self.default_timeout}, max_retries={self.max_retries}"
         )
 
     @abstractmethod
@@ -40,21 +75,107 @@ class BaseAIClient(ABC):
         """実際にAPI呼び出しを行うメソッド（各サブクラスで実装）"""
         pass
 
+    async def _make_streaming_api_call(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        request_timeout: float,
+        on_delta: Callable[[str], None],
+    ) -> Any:
+        """ストリーミングでAPI呼び出しを行うメソッド（各サブクラスで上書き）。
+
+        生成されたテキスト断片ごとに on_delta を呼び、完了後は _make_api_call と同じ形式
+        (extract_content_and_tokens で解釈できる形) のレスポンスを返す。
+        既定の実装は通常の呼び出し結果を1つの断片として通知する。
+        """
+        response = await self._make_api_call(messages, temperature, max_tokens, request_timeout)
+        content, _ = extract_content_and_tokens(self.model_info.provider, response)
+        if content:
+            on_delta(content)
+        return response
+
     def _prepare_messages(
         self,
         user_message: str,
         conversation_history: Optional[List[Dict[str, str]]] = None,
         system_message: Optional[str] = None,
-    ) -> List[Dict[str, str]]:
-        messages: List[Dict[str, str]] = []
-        if system_message:
+        cacheable_system_prefix: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """OpenAI形式のメッセージリストを作成する。
+
+        cacheable_system_prefix が system_message の先頭と一致する場合、その部分を
+        "cacheable": True を付けた独立したシステムメッセージとして先頭に置く。
+        各クライアントはこの印を見てプロバイダーのプレフィックスキャッシュを利用する。
+        """
+        messages: List[Dict[str, Any]] = []
+        if system_message and cacheable_system_prefix and system_message.startswith(cacheable_system_prefix):
+            messages.append({"role": "system", "content": cacheable_system_prefix, "cacheable": True})
+            remainder = system_message[len(cacheable_system_prefix):].lstrip("\n")
+            if remainder:
+                messages.append({"role": "system", "content": remainder})
+        elif system_message:
             messages.append({"role": "system", "content": system_message})
         if conversation_history:
             messages.extend(conversation_history)
         messages.append({"role": "user", "content": user_message})
         return messages
 
-    @abstractmethod
+    async def _acquire_rate_slot(self, messages: List[Dict[str, Any]], max_tokens: int) -> RateReservation:
+        """レートスケジューラの枠を確保する（TPM 制限がある場合のみ入力と生成上限のトークン数を見積もる）"""
+        estimated_tokens = 0
+        if self.rate_scheduler.tracks_tokens:
+            estimated_tokens = max_tokens + sum(
+                count_tokens(str(message.get("content", "")), self.model_info.name) for message in messages
+            )
+        return await self.rate_scheduler.acquire(estimated_tokens)
+
+    def _settle_rate_slot(self, reservation: RateReservation, response: Any) -> None:
+        """確保した枠の見積もりトークン数を実際の使用量で置き換える"""
+        if not self.rate_scheduler.tracks_tokens or response is None:
+            return
+        _, tokens_used = extract_content_and_tokens(self.model_info.provider, response)
+        if tokens_used > 0:
+            self.rate_scheduler.settle(reservation, tokens_used)
+
+    def _observe_response_headers(self, headers: Optional[Mapping[str, Any]]) -> None:
+        """成功したレスポンスのレート制限ヘッダーを同時送信数リミッターに伝える（サブクラスから呼ぶ）"""
+        if headers:
+            self.concurrency_limiter.observe_headers(headers)
+
+    def _is_rate_limit_error(self, error: BaseException) -> bool:
+        return isinstance(error, self.rate_limit_exceptions) or error_status_code(error) == 429
+
+    def _is_retryable_error(self, error: BaseException) -> bool:
+        if isinstance(error, CircuitOpenError):
+            return False
+        return isinstance(error, self.retryable_exceptions) or error_status_code(error) in RETRYABLE_STATUS_CODES
+
+    def _record_request_success(self, reservation: RateReservation, response: Any) -> None:
+        self.circuit_breaker.record_success()
+        self.concurrency_limiter.on_success()
+        self._settle_rate_slot(reservation, response)
+
+    def _record_request_failure(self, error: BaseException) -> bool:
+        """
+        失敗をリミッターとサーキットブレーカーに伝え、リトライしてよいかを返す
+
+        レート制限は同時送信数を絞る合図として扱い、障害（タイムアウト・接続エラー・5xx）のみを
+        サーキットブレーカーの失敗として数えます。
+        """
+        if isinstance(error, CircuitOpenError):
+            return False
+        retryable = self._is_retryable_error(error)
+        if self._is_rate_limit_error(error):
+            self.concurrency_limiter.on_throttle()
+            self.circuit_breaker.record_success()
+        elif retryable:
+            self.circuit_breaker.record_failure()
+        else:
+            # 4xx などはプロバイダー自体には到達できている
+            self.circuit_breaker.record_success()
+        return retryable
+
     async def _execute_request_with_retry(
         self,
         messages: List[Dict[str, str]],
@@ -63,10 +184,57 @@ class BaseAIClient(ABC):
         request_specific_timeout: float
     ) -> Any:
         """
-        リトライロジックを含めてAPI呼び出しを実行するメソッド。
-        各具象クラスで、プロバイダ固有の例外を処理しながら _make_api_call を呼び出す。
+        リトライ付きでAPI呼び出しを実行する。
+
+        試行ごとにサーキットブレーカーの確認・レート枠と同時送信枠の確保を行い、
+        リトライ可能なエラーは retry_policy の待ち時間（Retry-After があればそれ以上）の後に再試行する。
         """
-        pass
+        provider_name = self.model_info.provider.value
+        attempt = 0
+        while True:
+            try:
+                self.circuit_breaker.before_request()
+                reservation = await self._acquire_rate_slot(messages, max_tokens)
+                async with self.concurrency_limiter.slot():
+                    response = await self._make_api_call(
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        request_timeout=request_specific_timeout
+                    )
+            except Exception as e:
+                retryable = self._record_request_failure(e)
+                if not retryable:
+                    logger.error(f"Non-retriable error during {provider_name} API call for {self.model_info.name}: {type(e).__name__}: {e}")
+                    raise
+                if attempt >= self.retry_policy.max_retries:
+                    logger.error(
+                        f"All {self.retry_policy.max_retries + 1} attempts failed for {provider_name} model {self.model_info.name}. "
+                        f"Last error: {type(e).__name__}: {e}"
+                    )
+                    raise
+                delay = self.retry_policy.backoff(attempt, parse_retry_after(error_headers(e)))
+                logger.warning(
+                    f"Attempt {attempt + 1}/{self.retry_policy.max_retries + 1} failed for {provider_name} model {self.model_info.name} "
+                    f"due to {type(e).__name__}. Retrying in {delay:.1f}s..."
+                )
+                await self.retry_policy.sleep(delay)
+                attempt += 1
+                continue
+            self._record_request_success(reservation, response)
+            return response
+
+    def _resolve_request_params(
+        self,
+        override_timeout: Optional[float],
+        override_max_tokens: Optional[int],
+        override_temperature: Optional[float] = None,
+    ) -> tuple:
+        """リクエストごとのタイムアウト・max_tokens・temperature を決定する"""
+        request_specific_timeout = override_timeout if override_timeout is not None else self.default_timeout
+        effective_max_tokens = override_max_tokens if override_max_tokens is not None else self.model_info.max_tokens
+        effective_temperature = override_temperature if override_temperature is not None else self.model_info.temperature
+        return request_specific_timeout, effective_max_tokens, effective_temperature
 
     async def request_completion(
         self,
@@ -74,16 +242,16 @@ class BaseAIClient(ABC):
         conversation_history: Optional[List[Dict[str, str]]] = None,
         system_message: Optional[str] = None,
         override_timeout: Optional[float] = None,
-        override_max_tokens: Optional[int] = None # <<< 引数追加
+        override_max_tokens: Optional[int] = None, # <<< 引数追加
+        cacheable_system_prefix: Optional[str] = None,
+        override_temperature: Optional[float] = None,
     ) -> Any:
-        await self.rate_limiter.acquire()
-
-        messages_for_api = self._prepare_messages(user_message, conversation_history, system_message)
-        request_specific_timeout = override_timeout if override_timeout is not None else self.default_timeout
-
-        # --- override_max_tokens を考慮して実際に使用する max_tokens を決定 ---
-        effective_max_tokens = override_max_tokens if override_max_tokens is not None else self.model_info.max_tokens
-        # --- ここまで追加 ---
+        messages_for_api = self._prepare_messages(
+            user_message, conversation_history, system_message, cacheable_system_prefix
+        )
+        request_specific_timeout, effective_max_tokens, effective_temperature = self._resolve_request_params(
+            override_timeout, override_max_tokens, override_temperature
+        )
 
         logger.info(
             f"Calling {self.model_info.provider.value} model {self.model_info.name} "
@@ -91,20 +259,199 @@ class BaseAIClient(ABC):
             f"System: {'Yes' if system_message else 'No'}, Hist: {len(conversation_history or [])} entries."
         )
 
+        try:
+            response = await self._through_cassette(
+                messages_for_api,
+                effective_temperature,
+                effective_max_tokens,
+                lambda: self._execute_request_with_retry(
+                    messages=messages_for_api,
+                    temperature=effective_temperature,
+                    max_tokens=effective_max_tokens, # <<< 決定した effective_max_tokens を渡す
+                    request_specific_timeout=request_specific_timeout
+                ),
+            )
+            return response
+        except Exception as e:
+            logger.error(
+                f"Final error after retries for {self.model_info.name} in request_completion: {type(e).__name__}: {e}",
+                exc_info=False
+            )
+            raise
+
+    async def request_completion_stream(
+        self,
+        user_message: str,
+        on_delta: Callable[[str], None],
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+        system_message: Optional[str] = None,
+        override_timeout: Optional[float] = None,
+        override_max_tokens: Optional[int] = None,
+        cacheable_system_prefix: Optional[str] = None,
+        override_temperature: Optional[float] = None,
+    ) -> Any:
+        """応答をストリーミングで生成し、テキスト断片ごとに on_delta を呼ぶ。
+
+        戻り値は request_completion と同じ形式の最終レスポンス。
+        最初の断片を通知する前に失敗した場合は、通常のリクエスト（リトライ付き）に切り替える。
+        断片の通知後に失敗した場合は、表示済みの内容と重複させないためリトライせずに例外を送出する。
+        """
+        messages_for_api = self._prepare_messages(
+            user_message, conversation_history, system_message, cacheable_system_prefix
+        )
+        request_specific_timeout, effective_max_tokens, effective_temperature = self._resolve_request_params(
+            override_timeout, override_max_tokens, override_temperature
+        )
+        logger.info(
+            f"Streaming {self.model_info.provider.value} model {self.model_info.name} "
+            f"with timeout {request_specific_timeout}s, max_tokens {effective_max_tokens}. "
+            f"System: {'Yes' if system_message else 'No'}, Hist: {len(conversation_history or [])} entries."
+        )
+
+        delta_emitted = False
+
+        def relay(delta: str):
+            nonlocal delta_emitted
+            if not delta:
+                return
+            delta_emitted = True
+            try:
+                on_delta(delta)
+            except Exception as e:
+                logger.error(f"on_delta コールバック実行エラー: {e}", exc_info=True)
+
+        return await self._through_cassette(
+            messages_for_api,
+            effective_temperature,
+            effective_max_tokens,
+            lambda: self._stream_completion(
+                messages_for_api, effective_temperature, effective_max_tokens, request_specific_timeout,
+                relay, lambda: delta_emitted
+            ),
+            on_delta=relay,
+        )
+
+    async def _stream_completion(
+        self,
+        messages_for_api: List[Dict[str, Any]],
+        effective_temperature: float,
+        effective_max_tokens: int,
+        request_specific_timeout: float,
+        relay: Callable[[str], None],
+        delta_emitted: Callable[[], bool],
+    ) -> Any:
+        """request_completion_stream の本体（最初の断片の前に失敗した場合は通常のリクエストに切り替える）"""
+        try:
+            self.circuit_breaker.before_request()
+            reservation = await self._acquire_rate_slot(messages_for_api, effective_max_tokens)
+            async with self.concurrency_limiter.slot():
+                response = await self._make_streaming_api_call(
+                    messages=messages_for_api,
+                    temperature=effective_temperature,
+                    max_tokens=effective_max_tokens,
+                    request_timeout=request_specific_timeout,
+                    on_delta=relay,
+                )
+            self._record_request_success(reservation, response)
+            return response
+        except Exception as e:
+            self._record_request_failure(e)
+            if delta_emitted():
+                logger.error(
+                    f"Streaming from {self.model_info.name} failed after partial output: {type(e).__name__}: {e}",
+                    exc_info=False
+                )
+                raise
+            logger.warning(
+                f"Streaming from {self.model_info.name} failed before first token ({type(e).__name__}: {e}). "
+                f"Falling back to non-streaming request."
+            )
+
         try:
             response = await self._execute_request_with_retry(
                 messages=messages_for_api,
-                temperature=self.model_info.temperature,
-                max_tokens=effective_max_tokens, # <<< 決定した effective_max_tokens を渡す
+                temperature=effective_temperature,
+                max_tokens=effective_max_tokens,
                 request_specific_timeout=request_specific_timeout
             )
-            return response
         except Exception as e:
             logger.error(
-                f"Final error after retries for {self.model_info.name} in request_completion: {type(e).__name__}: {e}",
+                f"Final error after retries for {self.model_info.name} in request_completion_stream: {type(e).__name__}: {e}",
                 exc_info=False
             )
             raise
+        content, _ = extract_content_and_tokens(self.model_info.provider, response)
+        relay(content)
+        return response
+
+    async def _through_cassette(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        call: Callable[[], Awaitable[Any]],
+        on_delta: Optional[Callable[[str], None]] = None,
+    ) -> Any:
+        """
+        カセットがあれば、再生モードでは記録済みの応答を返し、記録モードでは応答を記録する
+
+        カセットで再生しないリクエストは応答キャッシュ（_through_response_cache）を経由して call を呼ぶ。
+        再生した応答は on_delta に1つの断片として通知する。
+        """
+        cassette = self.cassette
+        if cassette is None:
+            return await self._through_response_cache(messages, temperature, max_tokens, call, on_delta)
+        provider = self.model_info.provider
+        key = request_fingerprint(provider, self.model_info.name, temperature, messages)
+        if cassette.replaying:
+            entry = cassette.next_entry(key)
+            if cassette.replay_latency == "original" and entry.latency_seconds > 0:
+                await asyncio.sleep(entry.latency_seconds)
+            response = decode_response(provider, entry.response)
+            if on_delta:
+                content, _ = extract_content_and_tokens(provider, response)
+                on_delta(content)
+            return response
+        started = time.perf_counter()
+        response = await self._through_response_cache(messages, temperature, max_tokens, call, on_delta)
+        cassette.record(key, provider, self.model_info.name, encode_response(provider, response), time.perf_counter() - started)
+        return response
+
+    async def _through_response_cache(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        call: Callable[[], Awaitable[Any]],
+        on_delta: Optional[Callable[[str], None]] = None,
+    ) -> Any:
+        """
+        応答キャッシュにあればその応答を返し、なければ call の応答をキャッシュに保存する
+
+        キャッシュするのは temperature がキャッシュの max_temperature 以下のリクエスト（既定では 0 の補助処理）だけ。
+        キャッシュの応答は on_delta に1つの断片として通知する。
+        キャッシュの応答のトークン数は 0 にする（この呼び出しではトークンを使っていないため）。
+        """
+        cache = self.response_cache
+        if cache is None or temperature > cache.max_temperature:
+            return await call()
+        provider = self.model_info.provider
+        key = request_fingerprint(provider, self.model_info.name, temperature, messages, max_tokens=max_tokens)
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug(f"応答キャッシュを使用しました: {self.model_info.name} ({key})")
+            response = decode_response(
+                provider, {**cached, "tokens": 0, "cached_tokens": 0, "cache_creation_tokens": 0}
+            )
+            if on_delta:
+                content, _ = extract_content_and_tokens(provider, response)
+                on_delta(content)
+            return response
+        response = await call()
+        encoded = encode_response(provider, response)
+        if encoded["content"]:
+            cache.put(key, provider, self.model_info.name, encoded)
+        return response
 
     @property
     def model_name(self) -> str:
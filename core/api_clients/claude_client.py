@@ -1,55 +1,80 @@
-import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple
 import httpx
 import anthropic
+import anthropic._base_client
 from anthropic import APITimeoutError, APIConnectionError, RateLimitError, APIStatusError
 
 from .base_client import BaseAIClient
+from ..http_pool import get_async_http_client
+from ..cassette import Cassette
+from ..response_cache import ResponseCache
+from ..rate_scheduler import ProviderRateScheduler
+from ..retry_policy import AdaptiveConcurrencyLimiter, CircuitBreaker, RetryPolicy
 from ..models import ModelInfo
 
 logger = logging.getLogger(__name__)
 
+# 新しい anthropic SDK は httpx 互換のフォーク httpx2 を使い、httpx のクライアントを受け付けない
+_SDK_HTTP_MODULE = getattr(anthropic._base_client, "httpx2", None) or httpx
+
 class ClaudeClient(BaseAIClient):
     """Anthropic Claude API クライアント"""
 
+    retryable_exceptions = (APITimeoutError, APIConnectionError, RateLimitError)
+    rate_limit_exceptions = (RateLimitError,)
+
     def __init__(
         self,
         api_key: str,
         model_info: ModelInfo,
-        rate_limit_per_second: float = 1.0,
+        rate_scheduler: Optional[ProviderRateScheduler] = None,
         default_timeout: float = 60.0,
         max_retries: int = 3,
+        enable_prompt_cache: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        cassette: Optional[Cassette] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
         super().__init__(
-            api_key, model_info, rate_limit_per_second, default_timeout, max_retries
+            api_key, model_info, rate_scheduler, default_timeout, max_retries,
+            retry_policy, concurrency_limiter, circuit_breaker, cassette, response_cache
         )
+        self.enable_prompt_cache = enable_prompt_cache
         try:
             self.async_client_instance = anthropic.AsyncAnthropic(
-                api_key=self.api_key
+                api_key=self.api_key,
+                max_retries=0, # リトライは BaseAIClient の retry_policy で行う
+                http_client=get_async_http_client(self.model_info.provider, self.api_key, _SDK_HTTP_MODULE), # 接続はプロセス全体で共有する
             )
             logger.info(f"ClaudeClient 初期化完了: {self.model_info.name} (デフォルトタイムアウト: {self.default_timeout}s)")
         except Exception as e:
             logger.error(f"ClaudeClient の初期化に失敗: {e}", exc_info=True)
             raise
 
-    async def _make_api_call(
-        self,
-        messages: List[Dict[str, str]], # OpenAI形式
-        temperature: float,
-        max_tokens: int, # この max_tokens がAPIに渡される
-        request_timeout: float
-    ) -> Any:
-        system_prompt = ""
+    def _convert_messages(self, messages: List[Dict[str, Any]]) -> Tuple[Any, List[Dict[str, str]]]:
+        """OpenAI形式のメッセージを Claude の (system, messages) に変換する"""
+        system_blocks: List[Dict[str, Any]] = []
         claude_messages = []
         for msg in messages:
             if msg["role"] == "system":
-                system_prompt = msg["content"]
+                block: Dict[str, Any] = {"type": "text", "text": msg["content"]}
+                if self.enable_prompt_cache and msg.get("cacheable"):
+                    # 会議全体で共通のプレフィックスをプロンプトキャッシュの対象にする
+                    block["cache_control"] = {"type": "ephemeral"}
+                system_blocks.append(block)
             elif msg["role"] == "user" or msg["role"] == "assistant": # Claudeは'assistant'ロールを期待
                 claude_messages.append({"role": msg["role"], "content": msg["content"]})
             else:
                 logger.warning(f"Unsupported role '{msg['role']}' in ClaudeClient _make_api_call, skipping message.")
 
+        system_prompt: Any = ""
+        if any("cache_control" in block for block in system_blocks):
+            system_prompt = system_blocks
+        elif system_blocks:
+            system_prompt = "\n\n".join(block["text"] for block in system_blocks)
         if not claude_messages and not system_prompt: # システムプロンプトのみでもOKな場合がある
              raise ValueError("Claude API call: No messages or system prompt provided.")
         # ユーザー/アシスタントメッセージがないがシステムプロンプトはある場合、
@@ -57,11 +82,21 @@ class ClaudeClient(BaseAIClient):
         # 通常は少なくとも1つのユーザーメッセージが必要。
         if not any(m["role"] == "user" for m in claude_messages) and not system_prompt:
             raise ValueError("Claude API call: At least one user message or a system prompt is required.")
+        return system_prompt, claude_messages
 
+    async def _make_api_call(
+        self,
+        messages: List[Dict[str, str]], # OpenAI形式
+        temperature: float,
+        max_tokens: int, # この max_tokens がAPIに渡される
+        request_timeout: float
+    ) -> Any:
+        system_prompt, claude_messages = self._convert_messages(messages)
 
         try:
             # logger.debug(f"Claude API _make_api_call: model={self.model_info.name}, system_len={len(system_prompt)}, messages_len={len(claude_messages)}, temp={temperature}, max_tokens={max_tokens}, timeout={request_timeout}")
-            response = await self.async_client_instance.messages.create(
+            # レート制限ヘッダーを読むため生のレスポンスを受け取ってからパースする
+            raw_response = await self.async_client_instance.messages.with_raw_response.create(
                 model=self.model_info.name,
                 system=system_prompt if system_prompt else None, # systemプロンプトを渡す
                 messages=claude_messages, # type: ignore
@@ -69,7 +104,8 @@ class ClaudeClient(BaseAIClient):
                 max_tokens=max_tokens, # ここで受け取った max_tokens を使用
                 timeout=httpx.Timeout(request_timeout)
             )
-            return response
+            self._observe_response_headers(raw_response.headers)
+            return await raw_response.parse()
         except APITimeoutError as e:
             logger.error(f"Claude API Timeout Error (timeout={request_timeout}s): {e.message if hasattr(e, 'message') else str(e)}", exc_info=True)
             raise
@@ -89,45 +125,35 @@ class ClaudeClient(BaseAIClient):
             logger.error(f"Claude API呼び出し中に予期せぬエラー (timeout_setting={request_timeout}s): {e}", exc_info=True)
             raise
 
-    async def _execute_request_with_retry(
+    async def _make_streaming_api_call(
         self,
         messages: List[Dict[str, str]],
         temperature: float,
-        max_tokens: int, # BaseClientから渡されたmax_tokens
-        request_specific_timeout: float
+        max_tokens: int,
+        request_timeout: float,
+        on_delta: Callable[[str], None],
     ) -> Any:
-        last_exception = None
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = await self._make_api_call(
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens, # そのまま渡す
-                    request_timeout=request_specific_timeout
-                )
-                return response
-            except (APITimeoutError, APIConnectionError, RateLimitError) as e:
-                last_exception = e
-                logger.warning(
-                    f"Attempt {attempt + 1}/{self.max_retries + 1} failed for Claude model {self.model_info.name} "
-                    f"due to {type(e).__name__}. Retrying in {1 * (2**attempt)}s..."
-                )
-                if attempt < self.max_retries:
-                    await asyncio.sleep(1 * (2**attempt))
-                else:
-                    logger.error(
-                        f"All {self.max_retries + 1} attempts failed for Claude model {self.model_info.name}. "
-                        f"Last error: {type(e).__name__}: {e}"
-                    )
-                    raise
-            except APIStatusError as e:
-                logger.error(f"Non-retriable APIStatusError from Claude for model {self.model_info.name}: {e.status_code} {e.message}", exc_info=True)
-                raise
-            except Exception as e:
-                logger.error(f"Non-retriable error during Claude API call for {self.model_info.name}: {e}", exc_info=True)
-                raise
-
-        if last_exception: # ループを抜けたが last_exception がある場合 (通常はループ内でraiseされる)
-            raise last_exception
-        # フォールバック (通常到達しないはず)
-        raise Exception(f"Claude API call failed for {self.model_info.name} after multiple retries without specific exception.")
+        system_prompt, claude_messages = self._convert_messages(messages)
+        request_kwargs: Dict[str, Any] = {}
+        if system_prompt:
+            request_kwargs["system"] = system_prompt
+        try:
+            async with self.async_client_instance.messages.stream(
+                model=self.model_info.name,
+                messages=claude_messages, # type: ignore
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=httpx.Timeout(request_timeout),
+                **request_kwargs,
+            ) as stream:
+                self._observe_response_headers(stream.response.headers)
+                async for text in stream.text_stream:
+                    on_delta(text)
+                # 最終メッセージは messages.create の戻り値と同じ Message 型（usage を含む）
+                return await stream.get_final_message()
+        except httpx.ReadTimeout as e:
+            logger.error(f"Claude API (httpx) ReadTimeout during streaming (configured_timeout={request_timeout}s): {e}", exc_info=True)
+            raise APITimeoutError(request=e.request) from e # type: ignore
+        except Exception as e:
+            logger.error(f"Claude API ストリーミング中にエラー (timeout_setting={request_timeout}s): {e}", exc_info=True)
+            raise
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import List, Dict, Any, Callable, Awaitable, Deque, Optional, Tuple
+
+from .base_client import BaseAIClient
+from ..exceptions import APIStatusError, APITimeoutError, RateLimitError
+from ..models import FakeProviderSettings, ModelInfo
+from ..rate_scheduler import api_key_fingerprint
+from ..utils import count_tokens
+
+logger = logging.getLogger(__name__)
+
+_JA_SENTENCES = [
+    "この論点については、まず前提条件を整理する必要があります。",
+    "現状のデータからは、短期的な効果よりも長期的な影響の方が大きいと考えられます。",
+    "一方で、コストと導入の難しさを過小評価すべきではありません。",
+    "具体的には、小規模な試行から始めて効果を測定するのが現実的です。",
+    "利害関係者ごとに期待する成果が異なる点にも注意が必要です。",
+    "先ほどの意見に補足すると、リスクを定量的に評価する仕組みが欠けています。",
+    "結論として、段階的な導入と定期的な見直しを組み合わせることを提案します。",
+    "ただし、この前提が成り立たない場合は別の選択肢を検討するべきでしょう。",
+]
+
+_EN_SENTENCES = [
+    "From a practical standpoint, we should validate this assumption first.",
+    "The evidence so far suggests a moderate but consistent effect.",
+    "However, the implementation cost may outweigh the expected benefits.",
+    "A phased rollout would let us measure the impact before committing fully.",
+    "We also need to consider how different stakeholders will respond.",
+]
+
+
+@lru_cache(maxsize=None)
+def _sentence_tokens(sentence: str) -> int:
+    return count_tokens(sentence)
+
+
+def _truncate_to_tokens(sentence: str, max_tokens: int) -> Tuple[str, int]:
+    """max_tokens に収まる文の先頭部分とそのトークン数（少なくとも1文字は残す）"""
+    low, high = 1, len(sentence)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if _sentence_tokens(sentence[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return sentence[:low], _sentence_tokens(sentence[:low])
+
+
+class _FakeQuota:
+    """同じAPIキーの fake クライアントで共有する、直近1分間のリクエスト数"""
+
+    def __init__(self, clock: Callable[[], float]):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._timestamps: Deque[float] = deque()
+
+    def take(self, requests_per_minute: int) -> Tuple[bool, int, float]:
+        """枠を1つ使う。(許可されたか, 残りの枠, 次の枠が空くまでの秒数) を返す"""
+        now = self._clock()
+        with self._lock:
+            while self._timestamps and now - self._timestamps[0] >= 60.0:
+                self._timestamps.popleft()
+            if len(self._timestamps) >= requests_per_minute:
+                return False, 0, 60.0 - (now - self._timestamps[0])
+            self._timestamps.append(now)
+            return True, requests_per_minute - len(self._timestamps), 0.0
+
+
+_quotas: Dict[str, _FakeQuota] = {}
+_quotas_lock = threading.Lock()
+
+
+def _get_quota(api_key: Optional[str], clock: Callable[[], float]) -> _FakeQuota:
+    key = api_key_fingerprint(api_key)
+    with _quotas_lock:
+        if key not in _quotas:
+            _quotas[key] = _FakeQuota(clock)
+        return _quotas[key]
+
+
+def reset_fake_quotas() -> None:
+    """fake プロバイダーのリクエスト数の記録を消す（テスト用）"""
+    with _quotas_lock:
+        _quotas.clear()
+
+
+class FakeClient(BaseAIClient):
+    """
+    API を呼ばずに応答を生成するクライアント（計測・テスト用）
+
+    応答時間・出力トークン数・言語・503/429 の発生率を FakeProviderSettings で指定できる。
+    レスポンスは OpenAI の ChatCompletion と同じ属性を持つため、リトライ・レート制御・
+    トークン集計は実際のプロバイダーと同じ経路を通る。
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model_info: ModelInfo,
+        settings: Optional[FakeProviderSettings] = None,
+        sleep: Optional[Callable[[float], Awaitable[None]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        **kwargs: Any,
+    ):
+        super().__init__(api_key=api_key, model_info=model_info, **kwargs)
+        self.settings = settings or FakeProviderSettings()
+        self.rng = random.Random(self.settings.seed)
+        self._sleep = sleep or asyncio.sleep
+        self._quota = _get_quota(api_key, clock)
+        self.calls = 0
+        logger.info(f"FakeClient 初期化完了: {self.model_info.name} ({self.settings})")
+
+    def _sample_latency(self) -> float:
+        settings = self.settings
+        mean = settings.latency_mean_seconds
+        if settings.latency_distribution == "fixed" or mean <= 0:
+            return mean
+        if settings.latency_distribution == "uniform":
+            return self.rng.uniform(max(0.0, mean - settings.latency_spread), mean + settings.latency_spread)
+        # 平均が latency_mean_seconds になる対数正規分布
+        mu = math.log(mean) - settings.latency_spread ** 2 / 2
+        return self.rng.lognormvariate(mu, settings.latency_spread)
+
+    async def _simulate_errors(self, latency: float, request_timeout: float) -> None:
+        """設定に応じて 429・503・タイムアウトを発生させる（エラーは応答ヘッダーが届く時点で返す）"""
+        settings = self.settings
+        time_to_headers = latency * settings.first_token_fraction
+        if settings.requests_per_minute:
+            allowed, remaining, retry_after = self._quota.take(settings.requests_per_minute)
+            if not allowed:
+                await self._sleep(time_to_headers)
+                raise self._rate_limit_error(retry_after)
+            self._observe_response_headers({
+                "x-ratelimit-limit-requests": str(settings.requests_per_minute),
+                "x-ratelimit-remaining-requests": str(remaining),
+            })
+        roll = self.rng.random()
+        if roll < settings.rate_limit_rate:
+            await self._sleep(time_to_headers)
+            raise self._rate_limit_error(settings.retry_after_seconds)
+        if roll < settings.rate_limit_rate + settings.error_rate:
+            await self._sleep(time_to_headers)
+            raise APIStatusError(f"{self.model_info.name}: 503 Service Unavailable (fake)", status_code=503)
+        if latency > request_timeout:
+            await self._sleep(request_timeout)
+            raise APITimeoutError(f"{self.model_info.name}: {request_timeout}s でタイムアウトしました (fake)")
+
+    def _rate_limit_error(self, retry_after: Optional[float]) -> RateLimitError:
+        error = RateLimitError(f"{self.model_info.name}: 429 Too Many Requests (fake)", status_code=429)
+        headers = {} if retry_after is None else {"retry-after": f"{retry_after:.3f}"}
+        error.response = SimpleNamespace(status_code=429, headers=headers)
+        return error
+
+    def _generate_sentences(self, max_tokens: int) -> Tuple[List[str], int, str]:
+        """(文のリスト, 出力トークン数, finish_reason)"""
+        settings = self.settings
+        upper = max(1, min(settings.output_tokens_max, max_tokens))
+        target = self.rng.randint(min(settings.output_tokens_min, upper), upper)
+        sentences: List[str] = []
+        tokens = 0
+        while tokens < target:
+            english = settings.language == "en" or (
+                settings.language == "mixed" and self.rng.random() < settings.mixed_english_ratio
+            )
+            sentence = self.rng.choice(_EN_SENTENCES if english else _JA_SENTENCES)
+            sentence_tokens = _sentence_tokens(sentence)
+            if tokens + sentence_tokens > max_tokens:
+                if not sentences:
+                    # 実際のプロバイダーと同じく、上限で打ち切った途中までの文を返す（空の応答にはしない）
+                    truncated, tokens = _truncate_to_tokens(sentence, max_tokens)
+                    sentences.append(truncated)
+                return sentences, tokens, "length"
+            sentences.append(sentence if not english or not sentences else " " + sentence)
+            tokens += sentence_tokens
+        return sentences, tokens, "stop"
+
+    def _build_response(self, messages: List[Dict[str, Any]], content: str, completion_tokens: int, finish_reason: str) -> Any:
+        prompt_tokens = sum(count_tokens(str(m.get("content", "")), self.model_info.name) for m in messages)
+        return SimpleNamespace(
+            id=f"fake-{self.calls}",
+            model=self.model_info.name,
+            choices=[SimpleNamespace(
+                message=SimpleNamespace(role="assistant", content=content),
+                finish_reason=finish_reason,
+            )],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+                prompt_tokens_details=None,
+            ),
+        )
+
+    async def _make_api_call(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        request_timeout: float
+    ) -> Any:
+        self.calls += 1
+        latency = self._sample_latency()
+        await self._simulate_errors(latency, request_timeout)
+        sentences, completion_tokens, finish_reason = self._generate_sentences(max_tokens)
+        await self._sleep(latency)
+        return self._build_response(messages, "".join(sentences), completion_tokens, finish_reason)
+
+    async def _make_streaming_api_call(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        request_timeout: float,
+        on_delta: Callable[[str], None],
+    ) -> Any:
+        self.calls += 1
+        latency = self._sample_latency()
+        await self._simulate_errors(latency, request_timeout)
+        sentences, completion_tokens, finish_reason = self._generate_sentences(max_tokens)
+        first_token_delay = latency * self.settings.first_token_fraction
+        await self._sleep(first_token_delay)
+        per_sentence_delay = (latency - first_token_delay) / max(1, len(sentences))
+        for sentence in sentences:
+            on_delta(sentence)
+            await self._sleep(per_sentence_delay)
+        return self._build_response(messages, "".join(sentences), completion_tokens, finish_reason)
+
@@ -1,6 +1,11 @@
 import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import time
+import weakref
+from datetime import timedelta
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import google.generativeai as genai
 # Content と Part の直接インポートを削除 (またはコメントアウト)
 # from google.generativeai.types import Content, Part
@@ -8,29 +13,77 @@ from google.generativeai.types import HarmCategory, HarmBlockThreshold # これ
 from google.api_core import exceptions as google_exceptions
 
 from .base_client import BaseAIClient
+from ..cassette import Cassette
+from ..response_cache import ResponseCache
+from ..rate_scheduler import ProviderRateScheduler
+from ..retry_policy import AdaptiveConcurrencyLimiter, CircuitBreaker, RetryPolicy
 from ..models import ModelInfo
+from ..utils import count_tokens
 # カスタム例外のインポート (もしあれば)
 from ..exceptions import APITimeoutError, APIConnectionError, APIStatusError
 
 
 logger = logging.getLogger(__name__)
 
+# genai.configure はプロセス全体の設定を書き換えるため、APIキーが変わったときだけ呼ぶ
+_configured_api_key: Optional[str] = None
+_configure_lock = threading.Lock()
+
+# コンテキストキャッシュの作成に一時的なエラー（429・5xx など）で失敗した場合、同じプレフィックスで作成し直すまでの秒数
+CONTEXT_CACHE_RETRY_SECONDS = 60.0
+# このクライアントのモデルではコンテキストキャッシュを使えないことを示すエラー（以後は作成を試みない）
+_CONTEXT_CACHE_UNSUPPORTED_ERRORS = (
+    google_exceptions.NotFound, google_exceptions.PermissionDenied, google_exceptions.MethodNotImplemented,
+)
+
+
+def _configure_genai(api_key: str) -> None:
+    global _configured_api_key
+    with _configure_lock:
+        if _configured_api_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+
 class GeminiClient(BaseAIClient):
     """Google Gemini API クライアント"""
 
+    # google の例外は _make_api_call でカスタム例外に変換される（429・503 は APIStatusError のステータスでリトライ）
+    retryable_exceptions = (APITimeoutError, APIConnectionError, google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable)
+    rate_limit_exceptions = (google_exceptions.ResourceExhausted,)
+
     def __init__(
         self,
         api_key: str,
         model_info: ModelInfo,
-        rate_limit_per_second: float = 1.0,
+        rate_scheduler: Optional[ProviderRateScheduler] = None,
         default_timeout: float = 60.0,
         max_retries: int = 3,
+        context_cache_enabled: bool = False,
+        context_cache_ttl_seconds: int = 600,
+        context_cache_min_tokens: int = 4096,
+        retry_policy: Optional[RetryPolicy] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        cassette: Optional[Cassette] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
         super().__init__(
-            api_key, model_info, rate_limit_per_second, default_timeout, max_retries
+            api_key, model_info, rate_scheduler, default_timeout, max_retries,
+            retry_policy, concurrency_limiter, circuit_breaker, cassette, response_cache
+        )
+        self.context_cache_enabled = context_cache_enabled
+        self.context_cache_ttl_seconds = context_cache_ttl_seconds
+        self.context_cache_min_tokens = context_cache_min_tokens
+        # プレフィックスのハッシュ -> (CachedContent, 有効期限(monotonic))
+        self._context_caches: Dict[str, Tuple[Any, float]] = {}
+        # 作成に失敗したプレフィックスのハッシュ -> 作成し直してよい時刻(monotonic)。不正なリクエスト(400)は作成し直さない
+        self._context_cache_failures: Dict[str, float] = {}
+        # ClientFactory がキャッシュしたクライアントは複数の会議（イベントループ）で使われるため、ロックはループごとに持つ
+        self._context_cache_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
         )
         try:
-            genai.configure(api_key=self.api_key)
+            _configure_genai(self.api_key)
             # モデル名は self.model_info.name を使用
             self.model = genai.GenerativeModel(self.model_info.name)
             logger.info(f"GeminiClient 初期化完了: {self.model_info.name} (デフォルトタイムアウト: {self.default_timeout}s)")
@@ -39,13 +92,64 @@ class GeminiClient(BaseAIClient):
             raise
 
 
-    async def _make_api_call(
-        self,
-        messages: List[Dict[str, str]], # OpenAI形式
-        temperature: float,
-        max_tokens: int,
-        request_timeout: float
-    ) -> Any:
+    async def _get_cached_content(self, prefix: str) -> Optional[Any]:
+        """共通プレフィックスの CachedContent を取得（なければ作成）。利用できない場合は None。"""
+        if not self.context_cache_enabled:
+            return None
+        if count_tokens(prefix, self.model_info.name) < self.context_cache_min_tokens:
+            return None
+        cache_key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        loop = asyncio.get_running_loop()
+        lock = self._context_cache_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            cached = self._context_caches.get(cache_key)
+            # 期限切れ直前のキャッシュは使わない（リクエスト中に失効するのを避ける）
+            if cached and cached[1] - time.monotonic() > 30:
+                return cached[0]
+            if self._context_cache_failures.get(cache_key, 0.0) > time.monotonic():
+                return None
+            try:
+                cached_content = await asyncio.to_thread(
+                    genai.caching.CachedContent.create,
+                    model=self.model_info.name if self.model_info.name.startswith("models/") else f"models/{self.model_info.name}",
+                    system_instruction=prefix,
+                    ttl=timedelta(seconds=self.context_cache_ttl_seconds),
+                )
+            except _CONTEXT_CACHE_UNSUPPORTED_ERRORS as e:
+                logger.warning(f"{self.model_info.name} ではコンテキストキャッシュを使えないため、以後は通常のリクエストを使用します: {e}")
+                self.context_cache_enabled = False
+                return None
+            except google_exceptions.InvalidArgument as e:
+                # プレフィックスがモデルの最小トークン数に満たない場合など。このプレフィックスでは作成し直さない
+                logger.warning(f"Gemini コンテキストキャッシュを作成できないプレフィックスのため、通常のリクエストを使用します: {e}")
+                self._context_cache_failures[cache_key] = float("inf")
+                return None
+            except Exception as e:
+                logger.warning(
+                    f"Gemini コンテキストキャッシュの作成に失敗したため、通常のリクエストを使用します"
+                    f"（{CONTEXT_CACHE_RETRY_SECONDS:.0f}秒後に作成し直します）: {e}"
+                )
+                self._context_cache_failures[cache_key] = time.monotonic() + CONTEXT_CACHE_RETRY_SECONDS
+                return None
+            self._context_cache_failures.pop(cache_key, None)
+            self._context_caches[cache_key] = (cached_content, time.monotonic() + self.context_cache_ttl_seconds)
+            logger.info(f"Gemini コンテキストキャッシュを作成しました: {self.model_info.name} (TTL {self.context_cache_ttl_seconds}s)")
+            return cached_content
+
+    async def _build_request(
+        self, messages: List[Dict[str, Any]], temperature: float, max_tokens: int
+    ) -> Tuple[Any, List[Dict[str, Any]], Dict[str, Any], List[Dict[str, Any]]]:
+        """OpenAI形式のメッセージから (GenerativeModel, contents, generation_config, safety_settings) を組み立てる"""
+        cached_content = None
+        cacheable_prefix = next(
+            (m["content"] for m in messages if m["role"] == "system" and m.get("cacheable")), None
+        )
+        if cacheable_prefix:
+            cached_content = await self._get_cached_content(cacheable_prefix)
+        if cached_content is not None:
+            # キャッシュ済みのプレフィックスはシステム指示から除く
+            messages = [m for m in messages if not (m["role"] == "system" and m.get("cacheable"))]
+
         system_instruction_str: Optional[str] = None
         # Content オブジェクトではなく、辞書のリストとして contents を構築
         gemini_contents_for_api: List[Dict[str, Any]] = []
@@ -96,15 +200,40 @@ class GeminiClient(BaseAIClient):
             {"category": HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT, "threshold": HarmBlockThreshold.BLOCK_NONE},
         ]
 
+        # システム指示は GenerativeModel 単位で指定する（generate_content_async の引数ではない）
+        if cached_content is not None:
+            model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+            if system_instruction_str:
+                # キャッシュ利用時は追加のシステム指示を渡せないため、先頭のユーザーパートとして送る
+                if gemini_contents_for_api and gemini_contents_for_api[0]["role"] == "user":
+                    gemini_contents_for_api[0]["parts"].insert(0, {"text": system_instruction_str})
+                else:
+                    gemini_contents_for_api.insert(0, {"role": "user", "parts": [{"text": system_instruction_str}]})
+        elif system_instruction_str:
+            model = genai.GenerativeModel(self.model_info.name, system_instruction=system_instruction_str)
+        else:
+            model = self.model
+
+        return model, gemini_contents_for_api, generation_config_dict, safety_settings_list
+
+    async def _make_api_call(
+        self,
+        messages: List[Dict[str, str]], # OpenAI形式
+        temperature: float,
+        max_tokens: int,
+        request_timeout: float
+    ) -> Any:
+        model, gemini_contents_for_api, generation_config_dict, safety_settings_list = await self._build_request(
+            messages, temperature, max_tokens
+        )
         request_options = {"timeout": request_timeout} if request_timeout > 0 else {}
 
         try:
             # logger.debug(f"Gemini API _make_api_call: model={self.model.model_name}, system='{system_instruction_str}', contents_len={len(gemini_contents_for_api)}, temp={temperature}, max_tokens={max_tokens}, timeout={request_timeout}")
-            response = await self.model.generate_content_async(
+            response = await model.generate_content_async(
                 contents=gemini_contents_for_api, # 辞書のリストを渡す
                 generation_config=generation_config_dict, # 辞書として渡す
                 safety_settings=safety_settings_list,
-                system_instruction=system_instruction_str if system_instruction_str else None,
                 request_options=request_options if request_options else None # type: ignore
             )
             return response
@@ -123,45 +252,43 @@ class GeminiClient(BaseAIClient):
             logger.error(f"Gemini API呼び出し中に予期せぬエラー (timeout_setting={request_timeout}s): {e}", exc_info=True)
             raise
 
-    async def _execute_request_with_retry(
+    async def _make_streaming_api_call(
         self,
         messages: List[Dict[str, str]],
         temperature: float,
         max_tokens: int,
-        request_specific_timeout: float
+        request_timeout: float,
+        on_delta: Callable[[str], None],
     ) -> Any:
-        last_exception = None
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = await self._make_api_call(
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    request_timeout=request_specific_timeout
-                )
-                return response
-            # _make_api_call 内で Google の例外はカスタム例外にラップされているはず
-            except (APITimeoutError, APIConnectionError, google_exceptions.ResourceExhausted, google_exceptions.Unavailable) as e: # google_exceptionsも直接キャッチ
-                last_exception = e
-                logger.warning(
-                    f"Attempt {attempt + 1}/{self.max_retries + 1} failed for Gemini model {self.model_info.name} "
-                    f"due to {type(e).__name__}. Retrying in {1 * (2**attempt)}s..."
+        model, gemini_contents_for_api, generation_config_dict, safety_settings_list = await self._build_request(
+            messages, temperature, max_tokens
+        )
+        request_options = {"timeout": request_timeout} if request_timeout > 0 else {}
+        try:
+            response = await model.generate_content_async(
+                contents=gemini_contents_for_api,
+                generation_config=generation_config_dict,
+                safety_settings=safety_settings_list,
+                request_options=request_options if request_options else None, # type: ignore
+                stream=True,
+            )
+            async for chunk in response:
+                if not chunk.candidates or not chunk.candidates[0].content:
+                    continue
+                delta_text = "".join(
+                    part.text for part in chunk.candidates[0].content.parts if hasattr(part, "text")
                 )
-                if attempt < self.max_retries:
-                    await asyncio.sleep(1 * (2**attempt))
-                else:
-                    logger.error(
-                        f"All {self.max_retries + 1} attempts failed for Gemini model {self.model_info.name}. "
-                        f"Last error: {type(e).__name__}: {e}"
-                    )
-                    raise
-            except APIStatusError as e: # カスタム例外
-                logger.error(f"Non-retriable APIStatusError from Gemini for model {self.model_info.name}: {e.status_code} {e.message}", exc_info=True)
-                raise
-            except Exception as e:
-                logger.error(f"Non-retriable error during Gemini API call for {self.model_info.name}: {e}", exc_info=True)
-                raise
-
-        if last_exception:
-            raise last_exception
-        raise Exception(f"Gemini API call failed for {self.model_info.name} after multiple retries without specific exception.")
\ No newline at end of file
+                if delta_text:
+                    on_delta(delta_text)
+            # 反復し終えたレスポンスは全チャンクを結合した candidates と usage_metadata を持つ
+            return response
+        except google_exceptions.DeadlineExceeded as e:
+            logger.error(f"Gemini API DeadlineExceeded during streaming (timeout={request_timeout}s): {e}", exc_info=True)
+            raise APITimeoutError(message=f"Gemini API DeadlineExceeded: {str(e)}") from e
+        except google_exceptions.GoogleAPIError as e:
+            logger.error(f"Gemini API GoogleAPIError during streaming: {e}", exc_info=True)
+            status_code = e.code if hasattr(e, 'code') else 500
+            raise APIStatusError(message=f"Gemini API GoogleAPIError: {str(e)}", status_code=status_code, request=None) from e # type: ignore
+        except Exception as e:
+            logger.error(f"Gemini API ストリーミング中にエラー (timeout_setting={request_timeout}s): {e}", exc_info=True)
+            raise
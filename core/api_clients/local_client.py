@@ -0,0 +1,99 @@
+import logging
+from typing import List, Dict, Any, Callable, Optional
+
+from openai.types import CompletionUsage
+
+from .openai_client import OpenAIClient
+from ..http_pool import get_sync_http_client
+from ..models import AIProvider, ModelInfo
+from ..utils import count_tokens, extract_content_and_tokens
+
+logger = logging.getLogger(__name__)
+
+# モデル一覧の取得はUI操作や起動時に行うため、応答しないサーバーを長く待たない
+MODEL_DISCOVERY_TIMEOUT_SECONDS = 5.0
+
+
+def discover_local_models(
+    base_url: str, api_key: Optional[str] = None, timeout: float = MODEL_DISCOVERY_TIMEOUT_SECONDS
+) -> List[str]:
+    """
+    OpenAI 互換サーバーの /models からモデル名の一覧を取得する
+
+    Args:
+        base_url: サーバーのベースURL（例: http://localhost:8000/v1）
+        api_key: APIキー（認証しないサーバーでは None でよい）
+        timeout: タイムアウト（秒）
+
+    Returns:
+        モデル名のリスト（取得できない場合は空リスト）
+    """
+    url = f"{base_url.rstrip('/')}/models"
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    try:
+        response = get_sync_http_client(AIProvider.LOCAL, api_key).get(url, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        models = response.json().get("data") or []
+        names = [str(model["id"]) for model in models if isinstance(model, dict) and model.get("id")]
+    except Exception as e:
+        logger.warning(f"ローカルサーバーのモデル一覧を取得できませんでした ({url}): {e}")
+        return []
+    logger.info(f"ローカルサーバーのモデル一覧を取得しました ({url}): {names}")
+    return names
+
+
+class LocalClient(OpenAIClient):
+    """
+    OpenAI 互換 API を提供するローカルサーバー（vLLM・Ollama・llama.cpp など）のクライアント
+
+    呼び出しは OpenAIClient と同じ。サーバーによってはトークン使用量 (usage) を返さないため、
+    その場合は入力と出力のトークン数を count_tokens で見積もって補う。
+    """
+
+    def __init__(self, api_key: str, model_info: ModelInfo, base_url: Optional[str] = None, **kwargs: Any):
+        if not base_url:
+            raise ValueError("ローカルサーバーのベースURL (LOCAL_BASE_URL) が設定されていません")
+        super().__init__(api_key=api_key, model_info=model_info, base_url=base_url, **kwargs)
+        self.base_url = base_url
+        logger.info(f"LocalClient 初期化完了: {self.model_info.name} ({self.base_url})")
+
+    async def list_models(self) -> List[str]:
+        """サーバーが提供するモデル名の一覧"""
+        page = await self.async_client.models.list()
+        return [model.id for model in page.data]
+
+    def _fill_missing_usage(self, messages: List[Dict[str, Any]], response: Any) -> Any:
+        """usage がないレスポンスに見積もりのトークン使用量を設定する"""
+        if response is None or getattr(response, "usage", None):
+            return response
+        content, _ = extract_content_and_tokens(AIProvider.LOCAL, response)
+        prompt_tokens = sum(count_tokens(str(m.get("content", "")), self.model_info.name) for m in messages)
+        completion_tokens = count_tokens(content, self.model_info.name)
+        response.usage = CompletionUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+        logger.debug(f"{self.model_info.name} のトークン使用量を見積もりました: {response.usage.total_tokens}")
+        return response
+
+    async def _make_api_call(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        request_timeout: float
+    ) -> Any:
+        response = await super()._make_api_call(messages, temperature, max_tokens, request_timeout)
+        return self._fill_missing_usage(messages, response)
+
+    async def _make_streaming_api_call(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        request_timeout: float,
+        on_delta: Callable[[str], None],
+    ) -> Any:
+        response = await super()._make_streaming_api_call(messages, temperature, max_tokens, request_timeout, on_delta)
+        return self._fill_missing_usage(messages, response)
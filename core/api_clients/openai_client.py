@@ -1,10 +1,15 @@
-import asyncio
 import logging
-from typing import List, Dict, Any
+from types import SimpleNamespace
+from typing import List, Dict, Any, Callable, Optional
 import httpx
 from openai import AsyncOpenAI, APITimeoutError as OpenAPITimeoutError, APIConnectionError as OpenAIAPIConnectionError, APIStatusError as OpenAIAPIStatusError, RateLimitError as OpenAPIRateLimitError
 
 from .base_client import BaseAIClient
+from ..http_pool import get_async_http_client
+from ..cassette import Cassette
+from ..response_cache import ResponseCache
+from ..rate_scheduler import ProviderRateScheduler
+from ..retry_policy import AdaptiveConcurrencyLimiter, CircuitBreaker, RetryPolicy
 from ..models import ModelInfo
 # カスタム例外をインポートする場合 (必要に応じて)
 # from ..exceptions import APITimeoutError, APIConnectionError, APIStatusError, RateLimitError
@@ -15,25 +20,42 @@ logger = logging.getLogger(__name__)
 class OpenAIClient(BaseAIClient):
     """OpenAI API クライアント"""
 
+    retryable_exceptions = (OpenAPITimeoutError, OpenAIAPIConnectionError, OpenAPIRateLimitError)
+    rate_limit_exceptions = (OpenAPIRateLimitError,)
+
     def __init__(
         self,
         api_key: str,
         model_info: ModelInfo,
-        rate_limit_per_second: float = 3.0, # OpenAIは比較的寛容なため少し高め
+        rate_scheduler: Optional[ProviderRateScheduler] = None,
         default_timeout: float = 60.0, # デフォルトタイムアウト延長
         max_retries: int = 3,
+        retry_policy: Optional[RetryPolicy] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        base_url: Optional[str] = None, # OpenAI 互換サーバーを使う場合のベースURL（None は公式API）
+        cassette: Optional[Cassette] = None,
+        response_cache: Optional[ResponseCache] = None,
     ):
         super().__init__(
             api_key=api_key,
             model_info=model_info,
-            rate_limit_per_second=rate_limit_per_second,
+            rate_scheduler=rate_scheduler,
             default_timeout=default_timeout,
-            max_retries=max_retries
+            max_retries=max_retries,
+            retry_policy=retry_policy,
+            concurrency_limiter=concurrency_limiter,
+            circuit_breaker=circuit_breaker,
+            cassette=cassette,
+            response_cache=response_cache,
         )
         try:
             self.async_client = AsyncOpenAI(
                 api_key=self.api_key,
+                base_url=base_url,
                 # timeout はリクエスト毎に httpx.Timeout で指定するため、ここでは設定不要
+                max_retries=0, # リトライは BaseAIClient の retry_policy で行う
+                http_client=get_async_http_client(self.model_info.provider, self.api_key), # 接続はプロセス全体で共有する
             )
             logger.info(f"OpenAIClient 初期化完了: {self.model_info.name} (デフォルトタイムアウト: {self.default_timeout}s)")
         except Exception as e:
@@ -49,18 +71,23 @@ class OpenAIClient(BaseAIClient):
     ) -> Any:
         try:
             # logger.debug(f"OpenAI API _make_api_call: model={self.model_info.name}, messages_len={len(messages)}, temp={temperature}, max_tokens={max_tokens}, timeout={request_timeout}")
-            response = await self.async_client.chat.completions.create(
+            # OpenAIは先頭が一致するプロンプトを自動でキャッシュするため、
+            # キャッシュ可能なシステムプレフィックスは先頭のまま順序を変えずに送る（印のキーのみ除去）
+            api_messages = [{"role": m["role"], "content": m["content"]} for m in messages]
+            # レート制限ヘッダーを読むため生のレスポンスを受け取ってからパースする
+            raw_response = await self.async_client.chat.completions.with_raw_response.create(
                 model=self.model_info.name,
-                messages=messages, # type: ignore
+                messages=api_messages, # type: ignore
                 temperature=temperature,
                 max_tokens=max_tokens, # ここで受け取った max_tokens を使用
                 timeout=httpx.Timeout(request_timeout) # httpx.Timeoutオブジェクトを渡す
             )
-            return response
+            self._observe_response_headers(raw_response.headers)
+            return raw_response.parse()
         # openaiライブラリの例外をキャッチ
         except OpenAPITimeoutError as e:
             logger.error(f"OpenAI API Timeout Error (timeout={request_timeout}s): {e.message if hasattr(e, 'message') else str(e)}", exc_info=True)
-            raise # そのままraise (リトライ処理は_execute_request_with_retryで行う)
+            raise # そのままraise (リトライ処理は BaseAIClient._execute_request_with_retry で行う)
         except OpenAIAPIConnectionError as e:
             logger.error(f"OpenAI API Connection Error: {e.message if hasattr(e, 'message') else str(e)}", exc_info=True)
             raise
@@ -75,51 +102,58 @@ class OpenAIClient(BaseAIClient):
         # その他のOpenAI APIエラー (ステータスコード関連など)
         except OpenAIAPIStatusError as e:
             logger.error(f"OpenAI API Status Error (status_code={e.status_code}): {e.message}", exc_info=True)
-            raise # リトライしない想定が多い
+            raise # 429・5xx はステータスコードを見て BaseAIClient がリトライする
         except Exception as e:
             logger.error(f"OpenAI API呼び出し中に予期せぬエラー (timeout_setting={request_timeout}s): {e}", exc_info=True)
             raise
 
-    async def _execute_request_with_retry(
+    async def _make_streaming_api_call(
         self,
         messages: List[Dict[str, str]],
         temperature: float,
-        max_tokens: int, # BaseClientから渡されたmax_tokens
-        request_specific_timeout: float
+        max_tokens: int,
+        request_timeout: float,
+        on_delta: Callable[[str], None],
     ) -> Any:
-        last_exception = None
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = await self._make_api_call(
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens, # そのまま渡す
-                    request_timeout=request_specific_timeout
-                )
-                return response
-            # リトライ対象の例外 (OpenAIライブラリ固有のもの)
-            except (OpenAPITimeoutError, OpenAIAPIConnectionError, OpenAPIRateLimitError) as e:
-                last_exception = e
-                logger.warning(
-                    f"Attempt {attempt + 1}/{self.max_retries + 1} failed for OpenAI model {self.model_info.name} "
-                    f"due to {type(e).__name__}. Retrying in {1 * (2**attempt)}s..."
-                )
-                if attempt < self.max_retries:
-                    await asyncio.sleep(1 * (2**attempt))
-                else:
-                    logger.error(
-                        f"All {self.max_retries + 1} attempts failed for OpenAI model {self.model_info.name}. "
-                        f"Last error: {type(e).__name__}: {e}"
-                    )
-                    raise
-            # リトライしないOpenAI APIエラー
-            except OpenAIAPIStatusError as e:
-                logger.error(f"Non-retriable APIStatusError from OpenAI for model {self.model_info.name}: {e.status_code} {e.message}", exc_info=True)
-                raise
-            except Exception as e:
-                logger.error(f"Non-retriable error during OpenAI API call for {self.model_info.name}: {e}", exc_info=True)
-                raise
-
-        if last_exception:
-            raise last_exception
-        raise Exception(f"OpenAI API call failed for {self.model_info.name} after multiple retries without specific exception.")
+        api_messages = [{"role": m["role"], "content": m["content"]} for m in messages]
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model_info.name,
+                messages=api_messages, # type: ignore
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=httpx.Timeout(request_timeout),
+                stream=True,
+                stream_options={"include_usage": True}, # 最後のチャンクでトークン使用量を受け取る
+            )
+            self._observe_response_headers(getattr(getattr(stream, "response", None), "headers", None))
+            content_parts: List[str] = []
+            usage = None
+            finish_reason = None
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                delta_text = getattr(choice.delta, "content", None)
+                if delta_text:
+                    content_parts.append(delta_text)
+                    on_delta(delta_text)
+        except httpx.ReadTimeout as e:
+            logger.error(f"OpenAI API (httpx) ReadTimeout during streaming (configured_timeout={request_timeout}s): {e}", exc_info=True)
+            raise OpenAPITimeoutError(request=e.request) from e # type: ignore
+        except Exception as e:
+            logger.error(f"OpenAI API ストリーミング中にエラー (timeout_setting={request_timeout}s): {e}", exc_info=True)
+            raise
+        # 非ストリーミング時の ChatCompletion と同じ属性で参照できる形にまとめる
+        return SimpleNamespace(
+            model=self.model_info.name,
+            choices=[SimpleNamespace(
+                message=SimpleNamespace(role="assistant", content="".join(content_parts)),
+                finish_reason=finish_reason,
+            )],
+            usage=usage,
+        )
@@ -0,0 +1,243 @@
+"""
+プロバイダー呼び出しの記録・再生（カセット）
+
+record モードでは BaseAIClient.request_completion(_stream) の応答を、正規化したメッセージ・モデル・
+temperature から求めたキーとともにカセットファイル（JSON Lines。拡張子 .gz なら gzip 圧縮）に追記します。
+replay モードではプロバイダーを呼ばずにカセットの応答を返すため、記録した会議をAPIキーなしで
+再実行してオーケストレーション部分の性能を測ったり、回帰テストに使ったりできます。
+
+同じキーのリクエストが複数回あった場合は記録した順に返し、使い切った後は最後の応答を返します。
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, IO, List, Literal, Optional
+
+from .exceptions import CassetteMissError
+from .models import AIProvider, AppConfig
+from .utils import extract_content_and_tokens
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_FORMAT_VERSION = 1
+
+CassetteMode = Literal["record", "replay"]
+ReplayLatency = Literal["original", "none"]
+
+
+def _normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """役割と内容だけを残し、空白の違いを無視する"""
+    return [
+        {"role": str(m.get("role", "")), "content": " ".join(str(m.get("content", "")).split())}
+        for m in messages
+    ]
+
+
+def request_fingerprint(
+    provider: AIProvider,
+    model_name: str,
+    temperature: float,
+    messages: List[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+) -> str:
+    """正規化したメッセージ・モデル・temperature（指定があれば max_tokens も）からリクエストのキーを求める"""
+    request: Dict[str, Any] = {
+        "provider": AIProvider(provider).value,
+        "model": model_name,
+        "temperature": round(float(temperature), 4),
+        "messages": _normalize_messages(messages),
+    }
+    if max_tokens is not None:
+        request["max_tokens"] = int(max_tokens)
+    payload = json.dumps(request, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def encode_response(provider: AIProvider, response: Any) -> Dict[str, Any]:
+    """プロバイダーの応答を、再生に必要な内容とトークン数だけの辞書にする"""
+    usage: Dict[str, int] = {}
+    content, tokens = extract_content_and_tokens(provider, response, usage)
+    encoded: Dict[str, Any] = {"content": content, "tokens": tokens}
+    for key in ("cached_tokens", "cache_creation_tokens"):
+        if usage.get(key):
+            encoded[key] = usage[key]
+    return encoded
+
+
+def decode_response(provider: AIProvider, data: Dict[str, Any]) -> Any:
+    """
+    encode_response の辞書を、そのプロバイダーの応答と同じ属性を持つオブジェクトに戻す
+    （extract_content_and_tokens が記録時と同じ内容・トークン数を返す形）
+    """
+    content = data.get("content", "")
+    tokens = int(data.get("tokens", 0))
+    cached = int(data.get("cached_tokens", 0))
+    creation = int(data.get("cache_creation_tokens", 0))
+    if provider == AIProvider.CLAUDE:
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=content)],
+            usage=SimpleNamespace(
+                input_tokens=max(0, tokens - cached - creation), output_tokens=0,
+                cache_read_input_tokens=cached, cache_creation_input_tokens=creation,
+            ),
+        )
+    if provider == AIProvider.GEMINI:
+        return SimpleNamespace(
+            candidates=[SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text=content)]))],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=tokens, candidates_token_count=0, cached_content_token_count=cached,
+            ),
+        )
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=content), finish_reason="stop")],
+        usage=SimpleNamespace(total_tokens=tokens, prompt_tokens_details=SimpleNamespace(cached_tokens=cached)),
+    )
+
+
+@dataclass
+class CassetteEntry:
+    """カセットに記録した1回の呼び出し"""
+    key: str
+    provider: str
+    model: str
+    response: Dict[str, Any]
+    latency_seconds: float
+
+
+def _open_text(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """
+    1つのカセットファイル（スレッドセーフ）
+
+    Args:
+        path: カセットファイルのパス
+        mode: record（新しく記録する）または replay（記録を再生する）
+        replay_latency: original は記録時の応答時間だけ待ってから返す。none は待たない
+    """
+
+    def __init__(self, path: str, mode: CassetteMode, replay_latency: ReplayLatency = "none"):
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[CassetteEntry]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._file: Optional[IO[str]] = None
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        if mode == "record":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = _open_text(self.path, "w")
+            self._write({"type": "header", "version": CASSETTE_FORMAT_VERSION})
+        else:
+            self._load()
+        logger.info(f"カセットを開きました: {self.path} (mode={mode}, 記録済み {sum(len(v) for v in self._entries.values())} 件)")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        assert self._file is not None
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def _load(self) -> None:
+        with _open_text(self.path, "r") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.warning(f"カセット {self.path} の {line_number} 行目を読み込めません（スキップします）: {e}")
+                    continue
+                if record.get("type") == "header":
+                    if record.get("version") != CASSETTE_FORMAT_VERSION:
+                        logger.warning(f"カセット {self.path} の形式バージョン {record.get('version')} は未対応の可能性があります")
+                    continue
+                entry = CassetteEntry(
+                    key=record["key"], provider=record.get("provider", ""), model=record.get("model", ""),
+                    response=record.get("response", {}), latency_seconds=float(record.get("latency", 0.0)),
+                )
+                self._entries.setdefault(entry.key, []).append(entry)
+
+    def record(self, key: str, provider: AIProvider, model_name: str, response: Dict[str, Any], latency_seconds: float) -> None:
+        """呼び出しを1件追記する（record モードのみ）"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._write({
+                "key": key, "provider": AIProvider(provider).value, "model": model_name,
+                "latency": round(latency_seconds, 4), "response": response,
+            })
+            self.recorded += 1
+
+    def next_entry(self, key: str) -> CassetteEntry:
+        """キーに対応する次の記録を返す（replay モード）。ない場合は CassetteMissError"""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMissError(f"カセット {self.path} にリクエスト {key} の記録がありません")
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            self.replayed += 1
+            return entries[min(cursor, len(entries) - 1)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": str(self.path), "mode": self.mode, "recorded": self.recorded,
+                "replayed": self.replayed, "misses": self.misses,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str, mode: CassetteMode, replay_latency: ReplayLatency = "none") -> Cassette:
+    """パスとモードごとに共有するカセット（record は最初に開いたときだけファイルを作り直す）"""
+    key = f"{mode}:{Path(path).resolve()}"
+    with _cassettes_lock:
+        cassette = _cassettes.get(key)
+        if cassette is None:
+            cassette = Cassette(path, mode, replay_latency)
+            _cassettes[key] = cassette
+        cassette.replay_latency = replay_latency
+        return cassette
+
+
+def cassette_from_config(config: AppConfig) -> Optional[Cassette]:
+    """設定の cassette_mode・cassette_path に対応するカセット（off の場合は None）"""
+    if config.cassette_mode == "off" or not config.cassette_path:
+        return None
+    return get_cassette(config.cassette_path, config.cassette_mode, config.cassette_replay_latency)
+
+
+def reset_cassettes() -> None:
+    """開いているカセットをすべて閉じる（テスト用）"""
+    with _cassettes_lock:
+        cassettes = list(_cassettes.values())
+        _cassettes.clear()
+    for cassette in cassettes:
+        cassette.close()
@@ -0,0 +1,342 @@
+"""
+ヘッドレス実行（バッチランナー）
+
+Flet を使わずに、JSON / JSONL で定義した会議を1つのイベントループ上で並行実行し、
+会議ごとの結果を JSONL で出力します。
+
+使い方:
+    python -m core.cli meetings.jsonl -o results.jsonl --concurrency 4
+
+会議定義（1件分）の例:
+    {
+      "id": "market-2025",
+      "query": "国内EV市場の今後5年の見通しを議論してください",
+      "participants": ["gpt-4o", {"name": "claude-3-5-sonnet-20241022", "persona": "技術者"}],
+      "moderator": "gpt-4o",
+      "rounds": 2,
+      "document": "docs/report.pdf"
+    }
+
+participants / moderator はモデル名の文字列（プロバイダーはモデル名から推定、
+"provider:model" 形式も可）か、ModelInfo と同じキーを持つオブジェクトで指定します。
+moderator を省略した場合は最初の参加者が司会を兼ねます。
+{"resume": "saved_journals/xxx.jsonl"} を渡すと、中断した会議をジャーナルから再開します。
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Union
+
+from .config_manager import get_config_manager
+from .http_pool import http_pool_stats
+from .meeting_journal import load_journal
+from .meeting_manager import MeetingManager
+from .models import AIProvider, MeetingSettings, ModelInfo
+from .utils import detect_provider, generate_file_hash
+from .vector_store_manager import DEFAULT_VECTOR_STORE_DIR, VectorStoreManager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+
+
+def load_meeting_definitions(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    会議定義を読み込む
+
+    JSON（オブジェクト1件またはオブジェクトの配列）と JSONL（1行1件）の両方に対応します。
+
+    Args:
+        path: 定義ファイルのパス（"-" の場合は標準入力）
+
+    Returns:
+        会議定義のリスト
+    """
+    text = sys.stdin.read() if str(path) == "-" else Path(path).read_text(encoding="utf-8")
+    stripped = text.strip()
+    if not stripped:
+        return []
+    try:
+        data = json.loads(stripped)
+    except json.JSONDecodeError:
+        # JSONとして読めない場合は JSONL とみなす
+        data = []
+        for line_number, line in enumerate(stripped.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                data.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"会議定義の {line_number} 行目をJSONとして解析できません: {e}") from e
+    if isinstance(data, dict):
+        data = [data]
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise ValueError("会議定義はオブジェクトまたはオブジェクトの配列で指定してください")
+    return data
+
+
+def parse_model_spec(spec: Union[str, Dict[str, Any]], default_temperature: float, default_max_tokens: int) -> ModelInfo:
+    """
+    モデル指定（文字列またはオブジェクト）を ModelInfo に変換する
+
+    Args:
+        spec: "gpt-4o" / "openai:gpt-4o" 形式の文字列、または ModelInfo と同じキーを持つ辞書
+        default_temperature: temperature 未指定時の値
+        default_max_tokens: max_tokens 未指定時の値
+
+    Returns:
+        ModelInfo
+    """
+    if isinstance(spec, str):
+        spec = {"name": spec}
+    if not isinstance(spec, dict) or not str(spec.get("name", "")).strip():
+        raise ValueError(f"モデル指定が不正です: {spec}")
+
+    values = dict(spec)
+    name = str(values["name"]).strip()
+    if not values.get("provider"):
+        provider_prefix, separator, model_name = name.partition(":")
+        if separator and provider_prefix.strip().lower() in {p.value for p in AIProvider}:
+            values["provider"] = provider_prefix.strip().lower()
+            name = model_name.strip()
+        else:
+            provider = detect_provider(name)
+            if provider is None:
+                raise ValueError(f"モデル '{name}' のプロバイダーを判別できません。provider を指定してください")
+            values["provider"] = provider
+    values["name"] = name
+    values.setdefault("temperature", default_temperature)
+    values.setdefault("max_tokens", default_max_tokens)
+    return ModelInfo(**values)
+
+
+def build_meeting_settings(definition: Dict[str, Any], default_rounds: Optional[int] = None) -> MeetingSettings:
+    """
+    会議定義から MeetingSettings を作成する
+
+    Args:
+        definition: 会議定義（query / participants / moderator / rounds / document）
+        default_rounds: rounds 未指定時の各AIの発言回数（None の場合は設定値）
+
+    Returns:
+        MeetingSettings
+    """
+    config = get_config_manager().config
+    query = str(definition.get("query", "")).strip()
+    if not query:
+        raise ValueError("query が指定されていません")
+    participant_specs = definition.get("participants") or []
+    if not isinstance(participant_specs, list):
+        raise ValueError("participants はリストで指定してください")
+
+    participants = [
+        parse_model_spec(spec, config.default_temperature, config.default_max_tokens)
+        for spec in participant_specs
+    ]
+    moderator_spec = definition.get("moderator")
+    if moderator_spec is None:
+        if not participants:
+            raise ValueError("participants が指定されていません")
+        moderator = participants[0].model_copy(deep=True)
+    else:
+        moderator = parse_model_spec(moderator_spec, config.default_temperature, config.default_max_tokens)
+
+    return MeetingSettings(
+        participant_models=participants,
+        moderator_model=moderator,
+        rounds_per_ai=int(definition.get("rounds") or default_rounds or config.default_rounds_per_ai),
+        user_query=query,
+        document_path=definition.get("document"),
+    )
+
+
+class BatchRunner:
+    """複数の会議を1つのイベントループ上で、同時実行数の上限付きで実行する"""
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        default_rounds: Optional[int] = None,
+        vector_store_dir: Optional[str] = DEFAULT_VECTOR_STORE_DIR,
+    ):
+        """
+        初期化
+
+        Args:
+            concurrency: 同時に実行する会議数の上限
+            default_rounds: rounds 未指定の会議で使う各AIの発言回数
+            vector_store_dir: ベクトルストアの保存先（None の場合はRAGを使わない）
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency は1以上を指定してください")
+        self.concurrency = concurrency
+        self.default_rounds = default_rounds
+        self.vector_store_dir = vector_store_dir
+        self.config_manager = get_config_manager()
+        # 同じ資料を使う会議の間でベクトルストアを共有する（ファイルハッシュ -> 構築タスク）
+        self._vector_stores: Dict[str, "asyncio.Future[Optional[VectorStoreManager]]"] = {}
+
+    async def run(
+        self, definitions: List[Dict[str, Any]], output: TextIO
+    ) -> List[Dict[str, Any]]:
+        """
+        全会議を実行し、終わった順に1件1行のJSONで output に書き出す
+
+        Returns:
+            会議ごとの結果レコード（定義の順）
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        records: List[Optional[Dict[str, Any]]] = [None] * len(definitions)
+
+        async def run_one(index: int, definition: Dict[str, Any]):
+            async with semaphore:
+                record = await self.run_definition(index, definition)
+            records[index] = record
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+
+        await asyncio.gather(*(run_one(i, d) for i, d in enumerate(definitions)))
+        for name, stats in http_pool_stats().items():
+            logger.info(f"HTTPプール {name}: {stats}")
+        return [record for record in records if record is not None]
+
+    async def run_definition(self, index: int, definition: Dict[str, Any]) -> Dict[str, Any]:
+        """会議定義1件を実行して結果レコードを返す（例外は status=failed のレコードにする）"""
+        meeting_id = str(definition.get("id") or index)
+        record: Dict[str, Any] = {
+            "index": index, "id": meeting_id, "status": "failed", "error": None, "journal": None, "result": None,
+        }
+        resume_path = definition.get("resume")
+        try:
+            if resume_path:
+                settings = load_journal(resume_path).settings
+            else:
+                settings = build_meeting_settings(definition, self.default_rounds)
+        except Exception as e:
+            logger.error(f"会議定義 {meeting_id} が不正です: {e}")
+            record["error"] = str(e)
+            return record
+
+        try:
+            vector_store_manager = None
+            if settings.document_path:
+                vector_store_manager = await self._get_vector_store(settings.document_path)
+            manager = MeetingManager(
+                vector_store_manager=vector_store_manager,
+                document_store_dir=self.vector_store_dir or DEFAULT_VECTOR_STORE_DIR,
+            )
+            progress_logger = self._progress_logger(meeting_id)
+            if resume_path:
+                logger.info(f"会議 {meeting_id} をジャーナルから再開します: {resume_path}")
+                result = await manager.resume_meeting(resume_path, progress_callback=progress_logger)
+            else:
+                logger.info(f"会議 {meeting_id} を開始します（参加者 {len(settings.participant_models)} 名）")
+                result = await manager.run_meeting(settings, progress_callback=progress_logger)
+        except Exception as e:
+            logger.error(f"会議 {meeting_id} の実行中にエラーが発生: {e}", exc_info=True)
+            record["error"] = str(e)
+            return record
+
+        record["status"] = manager.state.phase
+        record["journal"] = manager.journal_path
+        record["error"] = manager.state.error_message
+        record["result"] = result.model_dump(mode="json")
+        logger.info(f"会議 {meeting_id} が終了しました（状態: {manager.state.phase}）")
+        return record
+
+    def _progress_logger(self, meeting_id: str):
+        def log_progress(phase: str, current: int, total: int):
+            logger.info(f"[{meeting_id}] {phase} ({current}/{total})")
+        return log_progress
+
+    async def _get_vector_store(self, document_path: str) -> Optional[VectorStoreManager]:
+        """資料のベクトルストアを取得する（同じ資料は1回だけ構築する）"""
+        openai_key = self.config_manager.config.openai_api_key
+        if not self.vector_store_dir or not openai_key:
+            return None
+        file_hash = generate_file_hash(document_path)
+        if not file_hash:
+            return None
+        if file_hash not in self._vector_stores:
+            self._vector_stores[file_hash] = asyncio.ensure_future(
+                self._build_vector_store(document_path, openai_key, Path(self.vector_store_dir) / file_hash)
+            )
+        return await asyncio.shield(self._vector_stores[file_hash])
+
+    async def _build_vector_store(
+        self, document_path: str, openai_key: str, store_path: Path
+    ) -> Optional[VectorStoreManager]:
+        try:
+            manager = await asyncio.to_thread(
+                VectorStoreManager, openai_key, str(store_path), config_manager=self.config_manager
+            )
+            if not manager.vector_store:
+                await asyncio.to_thread(manager.create_from_file, document_path)
+                manager.save_to_disk()
+            return manager if manager.vector_store else None
+        except Exception as e:
+            logger.warning(f"ベクトルストアを構築できませんでした（RAGなしで続行します）: {e}")
+            return None
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m core.cli",
+        description="JSON / JSONL で定義した会議をUIなしで並行実行し、結果を JSONL で出力します。",
+    )
+    parser.add_argument("input", help="会議定義ファイル（JSON または JSONL。'-' で標準入力）")
+    parser.add_argument("-o", "--output", help="結果の出力先（JSONL。省略時は標準出力）")
+    parser.add_argument(
+        "-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+        help=f"同時に実行する会議数の上限（既定: {DEFAULT_CONCURRENCY}）",
+    )
+    parser.add_argument("--rounds", type=int, default=None, help="rounds 未指定の会議で使う各AIの発言回数")
+    parser.add_argument(
+        "--vector-store-dir", default=DEFAULT_VECTOR_STORE_DIR,
+        help=f"資料のベクトルストア保存先（既定: {DEFAULT_VECTOR_STORE_DIR}）",
+    )
+    parser.add_argument("--no-rag", action="store_true", help="資料のベクトル検索（RAG）を使わない")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    config = get_config_manager().config
+    logging.basicConfig(
+        level=getattr(logging, config.log_level, logging.INFO),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+
+    try:
+        definitions = load_meeting_definitions(args.input)
+    except (OSError, ValueError) as e:
+        logger.error(f"会議定義を読み込めませんでした: {e}")
+        return 2
+    if not definitions:
+        logger.error("会議定義が空です")
+        return 2
+
+    runner = BatchRunner(
+        concurrency=args.concurrency,
+        default_rounds=args.rounds,
+        vector_store_dir=None if args.no_rag else args.vector_store_dir,
+    )
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        records = asyncio.run(runner.run(definitions, output))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    completed = sum(1 for record in records if record["status"] == "completed")
+    logger.info(f"{len(records)} 件中 {completed} 件の会議が完了しました")
+    return 0 if completed == len(records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,21 @@
-from typing import Optional, Dict, Type, Any
+from typing import Optional, Dict, Type, Any, Tuple, List
+from collections import OrderedDict
 import logging
+import threading
 
-from .models import ModelInfo, AIProvider, AppConfig # AppConfig をインポート
-from .api_clients import BaseAIClient, OpenAIClient, ClaudeClient, GeminiClient
+from .models import ModelInfo, AIProvider, AppConfig, AuxiliaryTask, ProviderRateLimit # AppConfig をインポート
+from .api_clients import BaseAIClient, OpenAIClient, ClaudeClient, GeminiClient, LocalClient, FakeClient
+from .cassette import cassette_from_config
+from .response_cache import response_cache_from_config
 from .config_manager import get_config_manager
+from .http_pool import HttpPoolSettings, configure_http_pools
+from .rate_scheduler import api_key_fingerprint, get_rate_scheduler
+from .retry_policy import RetryPolicy, get_circuit_breaker, get_concurrency_limiter
 
 logger = logging.getLogger(__name__)
 
+REPLAY_PLACEHOLDER_API_KEY = "cassette-replay"
+
 
 class ClientFactory:
     """AIクライアントファクトリークラス"""
@@ -15,8 +24,16 @@ class ClientFactory:
         AIProvider.OPENAI: OpenAIClient,
         AIProvider.CLAUDE: ClaudeClient,
         AIProvider.GEMINI: GeminiClient,
+        AIProvider.LOCAL: LocalClient,
+        AIProvider.FAKE: FakeClient,
     }
 
+    # (プロバイダー, モデル名, temperature, max_tokens, APIキーのハッシュ) -> クライアント（LRU）
+    _client_cache: "OrderedDict[Tuple[Any, ...], BaseAIClient]" = OrderedDict()
+    _client_cache_lock = threading.Lock()
+    # キャッシュを作ったときの設定（設定が読み直されたらキャッシュを破棄する）
+    _client_cache_config: Optional[AppConfig] = None
+
     @classmethod
     def create_client(
         cls,
@@ -34,11 +51,27 @@ class ClientFactory:
 
         if api_key is None:
             api_key = config_manager.get_api_key(provider)
+            if not api_key and app_config.cassette_mode == "replay":
+                # 再生時はプロバイダーを呼ばないためAPIキーは不要
+                api_key = REPLAY_PLACEHOLDER_API_KEY
             if not api_key:
                 logger.error(f"{provider.value} APIキーが設定されていません (ConfigManagerから取得失敗)")
                 raise RuntimeError(f"{provider.value} APIキーが設定されていません")
 
+        # 引数で初期化内容を変える場合はキャッシュを使わない
+        cache_key = None
+        if not kwargs and app_config.client_cache_size > 0:
+            cache_key = (
+                provider, model_info.name, model_info.temperature, model_info.max_tokens, api_key_fingerprint(api_key)
+            )
+            cached_client = cls._get_cached_client(cache_key, app_config)
+            if cached_client is not None:
+                logger.debug(f"キャッシュ済みの AI クライアントを再利用: {provider.value} - {model_info.name}")
+                return cached_client
+
         client_class = cls._client_classes[provider]
+        # 共有HTTPプールは最初に使うときに作られるため、その前に設定を反映する
+        configure_http_pools(cls._http_pool_settings_from_config(app_config))
 
         # プロバイダー固有のデフォルト引数を AppConfig から取得
         default_provider_kwargs = cls._get_default_kwargs_from_config(provider, app_config)
@@ -49,47 +82,176 @@ class ClientFactory:
         # 必須の引数を設定
         final_kwargs['api_key'] = api_key
         final_kwargs['model_info'] = model_info
+        final_kwargs.setdefault('rate_scheduler', get_rate_scheduler(
+            provider, api_key, cls._rate_limits_from_config(provider, app_config)
+        ))
+        final_kwargs.setdefault('concurrency_limiter', get_concurrency_limiter(
+            provider, api_key, app_config.max_concurrent_requests
+        ))
+        final_kwargs.setdefault('circuit_breaker', get_circuit_breaker(
+            provider, api_key, app_config.circuit_breaker_failure_threshold, app_config.circuit_breaker_reset_seconds
+        ))
+        final_kwargs.setdefault('cassette', cassette_from_config(app_config))
+        final_kwargs.setdefault('response_cache', response_cache_from_config(app_config))
 
+        # APIキーはログに出さない
+        loggable_kwargs = {k: v for k, v in final_kwargs.items() if k not in ('api_key', 'model_info')}
         try:
             client = client_class(**final_kwargs)
-            logger.info(f"AI クライアント作成完了: {provider.value} - {model_info.name} with args: {final_kwargs}")
-            return client
+            logger.info(f"AI クライアント作成完了: {provider.value} - {model_info.name}")
+            logger.debug(f"AI クライアント作成時の引数: {loggable_kwargs}")
         except TypeError as e:
             logger.error(
                 f"AI クライアント作成時の TypeError ({provider.value} - {model_info.name}): {str(e)}. "
-                f"渡された引数: {final_kwargs}", exc_info=True
+                f"渡された引数: {loggable_kwargs}", exc_info=True
             )
             raise RuntimeError(f"AI クライアント({model_info.name})作成失敗 (引数エラー): {str(e)}") from e
         except Exception as e:
             logger.error(f"AI クライアント作成失敗 ({provider.value} - {model_info.name}): {str(e)}", exc_info=True)
             raise RuntimeError(f"AI クライアント({model_info.name})作成失敗: {str(e)}") from e
+        if cache_key is not None:
+            client = cls._store_cached_client(cache_key, client, app_config)
+        return client
+
+    @classmethod
+    def _get_cached_client(cls, cache_key: Tuple[Any, ...], app_config: AppConfig) -> Optional[BaseAIClient]:
+        with cls._client_cache_lock:
+            if cls._client_cache_config is not app_config:
+                cls._client_cache.clear()
+                cls._client_cache_config = app_config
+            client = cls._client_cache.get(cache_key)
+            if client is not None:
+                cls._client_cache.move_to_end(cache_key)
+            return client
+
+    @classmethod
+    def _store_cached_client(
+        cls, cache_key: Tuple[Any, ...], client: BaseAIClient, app_config: AppConfig
+    ) -> BaseAIClient:
+        """クライアントをキャッシュに入れる（別スレッドが先に入れていた場合はそちらを返す）"""
+        with cls._client_cache_lock:
+            if cls._client_cache_config is not app_config:
+                return client
+            existing = cls._client_cache.get(cache_key)
+            if existing is not None:
+                cls._client_cache.move_to_end(cache_key)
+                return existing
+            cls._client_cache[cache_key] = client
+            while len(cls._client_cache) > app_config.client_cache_size:
+                cls._client_cache.popitem(last=False)
+            return client
+
+    @classmethod
+    def clear_client_cache(cls) -> None:
+        with cls._client_cache_lock:
+            cls._client_cache.clear()
+            cls._client_cache_config = None
+
+    @classmethod
+    def prewarm_models(cls) -> List[ModelInfo]:
+        """事前に作成しておくモデル（APIキーが設定されたプロバイダーの既定モデルと、補助タスク用のモデル）"""
+        config_manager = get_config_manager()
+        app_config = config_manager.config
+        models: List[ModelInfo] = []
+        for provider in config_manager.get_configured_providers():
+            model_name = config_manager.get_default_model_for_provider(provider)
+            if model_name and provider in cls._client_classes:
+                models.append(ModelInfo(
+                    name=model_name, provider=provider,
+                    temperature=app_config.default_temperature, max_tokens=app_config.default_max_tokens,
+                ))
+        models.extend(
+            model for model in app_config.task_model_routing.values()
+            if config_manager.is_api_key_configured(model.provider)
+        )
+        return models
+
+    @classmethod
+    def prewarm(cls, model_infos: Optional[List[ModelInfo]] = None) -> threading.Thread:
+        """
+        クライアントをバックグラウンドのスレッドで作成してキャッシュに入れる
+
+        Args:
+            model_infos: 作成するモデル（None の場合は prewarm_models）
+
+        Returns:
+            開始したスレッド
+        """
+        def run():
+            for model_info in (model_infos if model_infos is not None else cls.prewarm_models()):
+                try:
+                    cls.create_client(model_info)
+                except Exception as e:
+                    logger.warning(f"クライアントの事前作成に失敗 ({model_info.provider.value} - {model_info.name}): {e}")
+            logger.info("AI クライアントの事前作成が完了しました")
+
+        thread = threading.Thread(target=run, name="client-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    @classmethod
+    def create_task_client(cls, task: AuxiliaryTask, **kwargs: Any) -> Optional[BaseAIClient]:
+        """
+        AppConfig.task_model_routing で補助タスクに割り当てられたモデルのクライアントを作成する。
+        割り当てがない場合や作成に失敗した場合は None を返す（呼び出し側の既定のクライアントを使う）。
+        """
+        model_info = get_config_manager().config.task_model_routing.get(task)
+        if model_info is None:
+            return None
+        try:
+            client = cls.create_client(model_info, **kwargs)
+        except Exception as e:
+            logger.warning(f"補助タスク {task.value} 用クライアント({model_info.name})を作成できないため、既定のモデルを使用します: {e}")
+            return None
+        logger.info(f"補助タスク {task.value} を {model_info.provider.value} - {model_info.name} で実行します")
+        return client
+
+    @classmethod
+    def _rate_limits_from_config(cls, provider: AIProvider, config: AppConfig) -> ProviderRateLimit:
+        """プロバイダーのレート上限（api_call_delay_seconds は個別指定がない場合の最小間隔として使う）"""
+        limits = config.rate_limits.get(provider) or ProviderRateLimit()
+        if not limits.min_interval_seconds and config.api_call_delay_seconds:
+            limits = limits.model_copy(update={"min_interval_seconds": config.api_call_delay_seconds})
+        return limits
+
+    @classmethod
+    def _http_pool_settings_from_config(cls, config: AppConfig) -> HttpPoolSettings:
+        return HttpPoolSettings(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_keepalive_connections,
+            keepalive_expiry_seconds=config.http_keepalive_expiry_seconds,
+            http2=config.http2_enabled,
+        )
 
     @classmethod
     def _get_default_kwargs_from_config(cls, provider: AIProvider, config: AppConfig) -> Dict[str, Any]:
         """
         AppConfig から各プロバイダーのクライアント初期化のためのデフォルトキーワード引数を返す。
-        主にタイムアウトとリトライ回数を設定。レートリミットはBaseAIClientのデフォルトを使うか、
-        AppConfigに設定があればそれを使う。
+        主にタイムアウトとリトライ方針を設定。レート制御・同時送信数・サーキットブレーカーは
+        create_client でプロバイダー・APIキー単位の共有インスタンスを渡す。
         """
-        # 各クライアントの __init__ が受け取る引数名に合わせる
-        # OpenAIClient の修正案では、default_timeout, max_retries, rate_limit_per_second を想定
-        
-        # BaseAIClient で rate_limit_per_second のデフォルトが決まる想定。
-        # もし AppConfig でプロバイダ毎に設定したいなら、ここに追加。
-        # "rate_limit_per_second": config.provider_specific_rate_limit.get(provider, 3.0) のような形
-
-        # 各クライアントの __init__ が `default_timeout` と `max_retries` を
-        # 受け取ることを期待。
-        # (OpenAIClientの修正案では、__init__でsuperに渡す引数としてこれらを使用)
         provider_kwargs = {
             "default_timeout": config.api_timeout_seconds_default, # 全プロバイダ共通のデフォルトタイムアウト
-            "max_retries": 3, # 全プロバイダ共通のリトライ回数 (これもAppConfigで設定可能にしても良い)
-            # "rate_limit_per_second": 3.0 # もし設定するなら
+            "retry_policy": RetryPolicy(
+                max_retries=config.max_retries,
+                base_delay_seconds=config.retry_base_delay_seconds,
+                max_delay_seconds=config.retry_max_delay_seconds,
+            ),
         }
         
         # プロバイダ固有の調整があればここで行う (例: Claudeはタイムアウト長めなど)
         # if provider == AIProvider.CLAUDE:
         #     provider_kwargs["default_timeout"] = max(config.api_timeout_seconds_default, 60) # Claudeは最低60秒など
+        if provider == AIProvider.CLAUDE:
+            provider_kwargs["enable_prompt_cache"] = config.prompt_cache_enabled
+        elif provider == AIProvider.GEMINI:
+            provider_kwargs["context_cache_enabled"] = config.prompt_cache_enabled and config.gemini_context_cache_enabled
+            provider_kwargs["context_cache_ttl_seconds"] = config.gemini_context_cache_ttl_seconds
+            provider_kwargs["context_cache_min_tokens"] = config.gemini_context_cache_min_tokens
+        elif provider == AIProvider.LOCAL:
+            provider_kwargs["base_url"] = config.local_base_url
+        elif provider == AIProvider.FAKE:
+            provider_kwargs["settings"] = config.fake_provider
 
         return provider_kwargs
 
@@ -10,6 +10,32 @@ from .models import AppConfig, AIProvider # AppConfig は pydantic.BaseModel を
 
 logger = logging.getLogger(__name__)
 
+# 認証しないローカルサーバー用の仮のAPIキー（SDK が空のキーを受け付けないため）
+LOCAL_PLACEHOLDER_API_KEY = "local"
+# fake プロバイダーのAPIキー（レート制御などのキーとしてのみ使う）
+FAKE_PROVIDER_API_KEY = "fake"
+FAKE_MODEL_NAMES = ["fake-model", "fake-model-fast"]
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    """環境変数を真偽値として読み込む（1/true/yes/on を True とみなす）"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_json(name: str) -> Optional[Any]:
+    """環境変数をJSONとして読み込む（未設定・不正な場合は None）"""
+    value = os.getenv(name)
+    if not value or not value.strip():
+        return None
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError as e:
+        logger.warning(f"環境変数 {name} をJSONとして解釈できませんでした: {e}")
+        return None
+
 
 class ConfigManager:
     """設定管理クラス"""
@@ -29,6 +55,8 @@ class ConfigManager:
         
         # 設定を初期化
         self._config = self._load_config()
+        # ローカルサーバーから取得したモデル名（ベースURL → モデル名リスト）
+        self._local_model_names: Dict[str, list[str]] = {}
         
         # ログレベルを設定
         self._setup_logging()
@@ -40,6 +68,11 @@ class ConfigManager:
             "openai_api_key": os.getenv("OPENAI_API_KEY"),
             "anthropic_api_key": os.getenv("ANTHROPIC_API_KEY"),
             "google_api_key": os.getenv("GOOGLE_API_KEY"),
+            "local_base_url": os.getenv("LOCAL_BASE_URL") or None,
+            "local_api_key": os.getenv("LOCAL_API_KEY") or None,
+            "fake_provider_enabled": _env_flag("FAKE_PROVIDER_ENABLED"),
+            "fake_provider": _env_json("FAKE_PROVIDER"),
+            "local_models": [name.strip() for name in os.getenv("LOCAL_MODELS", "").split(",") if name.strip()],
             "default_temperature": float(os.getenv("DEFAULT_TEMPERATURE", "0.7")),
             "default_max_tokens": int(os.getenv("DEFAULT_MAX_TOKENS", "1000")),
             "default_rounds_per_ai": int(os.getenv("DEFAULT_ROUNDS_PER_AI", "3")),
@@ -49,8 +82,51 @@ class ConfigManager:
             "window_title": os.getenv("WINDOW_TITLE", "マルチAIディープリサーチツール"),
             "window_width": int(os.getenv("WINDOW_WIDTH", "1200")),
             "window_height": int(os.getenv("WINDOW_HEIGHT", "800")),
-            "api_call_delay_seconds": float(os.getenv("API_CALL_DELAY_SECONDS", "1.0")),
+            "api_call_delay_seconds": float(os.getenv("API_CALL_DELAY_SECONDS", "0")),
+            "rate_limits": _env_json("RATE_LIMITS"),
+            "max_concurrent_requests": int(os.getenv("MAX_CONCURRENT_REQUESTS", "8")),
+            "max_retries": int(os.getenv("MAX_RETRIES", "3")),
+            "client_cache_size": int(os.getenv("CLIENT_CACHE_SIZE", "32")),
+            "client_prewarm_enabled": _env_flag("CLIENT_PREWARM_ENABLED", True),
+            "http_max_connections": int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            "http_max_keepalive_connections": int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            "http_keepalive_expiry_seconds": float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30")),
+            "http2_enabled": _env_flag("HTTP2_ENABLED"),
+            "retry_base_delay_seconds": float(os.getenv("RETRY_BASE_DELAY_SECONDS", "1.0")),
+            "retry_max_delay_seconds": float(os.getenv("RETRY_MAX_DELAY_SECONDS", "30.0")),
+            "circuit_breaker_failure_threshold": int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5")),
+            "circuit_breaker_reset_seconds": float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30.0")),
             "conversation_history_limit": int(os.getenv("CONVERSATION_HISTORY_LIMIT", "10")),
+            "parallel_rounds": _env_flag("PARALLEL_ROUNDS"),
+            "cassette_mode": os.getenv("CASSETTE_MODE", "off").lower(),
+            "cassette_path": os.getenv("CASSETTE_PATH") or None,
+            "cassette_replay_latency": os.getenv("CASSETTE_REPLAY_LATENCY", "none").lower(),
+            "document_summary_cache_enabled": _env_flag("DOCUMENT_SUMMARY_CACHE_ENABLED", True),
+            "progressive_document_summary": _env_flag("PROGRESSIVE_DOCUMENT_SUMMARY"),
+            "persona_enhancement_batched": _env_flag("PERSONA_ENHANCEMENT_BATCHED", True),
+            "persona_cache_enabled": _env_flag("PERSONA_CACHE_ENABLED", True),
+            "persona_cache_path": os.getenv("PERSONA_CACHE_PATH", "cache/personas.sqlite3"),
+            "persona_cache_max_entries": int(os.getenv("PERSONA_CACHE_MAX_ENTRIES", "1000")),
+            "persona_cache_ttl_seconds": float(os.getenv("PERSONA_CACHE_TTL_SECONDS", "2592000")),
+            "response_cache_enabled": _env_flag("RESPONSE_CACHE_ENABLED"),
+            "response_cache_path": os.getenv("RESPONSE_CACHE_PATH", "cache/responses.sqlite3"),
+            "response_cache_max_entries": int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000")),
+            "response_cache_max_mb": float(os.getenv("RESPONSE_CACHE_MAX_MB", "100")),
+            "response_cache_ttl_seconds": float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "604800")),
+            "response_cache_max_temperature": float(os.getenv("RESPONSE_CACHE_MAX_TEMPERATURE", "0")),
+            "meeting_random_seed": int(os.environ["MEETING_RANDOM_SEED"]) if os.getenv("MEETING_RANDOM_SEED") else None,
+            "history_strategy": os.getenv("HISTORY_STRATEGY", "recent").lower(),
+            "history_packing": os.getenv("HISTORY_PACKING", "count").lower(),
+            "prompt_cache_enabled": _env_flag("PROMPT_CACHE_ENABLED", True),
+            "gemini_context_cache_enabled": _env_flag("GEMINI_CONTEXT_CACHE_ENABLED"),
+            "streaming_enabled": _env_flag("STREAMING_ENABLED", True),
+            "japanese_correction_mode": os.getenv("JAPANESE_CORRECTION_MODE", "full").lower(),
+            "task_model_routing": _env_json("TASK_MODEL_ROUTING"),
+            "meeting_journal_dir": os.getenv("MEETING_JOURNAL_DIR", "saved_journals"),
+            "early_stop_enabled": _env_flag("EARLY_STOP_ENABLED"),
+            "early_stop_novelty_threshold": float(os.getenv("EARLY_STOP_NOVELTY_THRESHOLD", "0.55")),
+            "early_stop_min_rounds": int(os.getenv("EARLY_STOP_MIN_ROUNDS", "2")),
+            "early_stop_patience": int(os.getenv("EARLY_STOP_PATIENCE", "1")),
             "log_level": os.getenv("LOG_LEVEL", "INFO").upper(),
         }
         
@@ -126,6 +202,7 @@ class ConfigManager:
             save_data.pop("openai_api_key", None)
             save_data.pop("anthropic_api_key", None)
             save_data.pop("google_api_key", None)
+            save_data.pop("local_api_key", None)
             
             with open(self.config_file_path, 'w', encoding='utf-8') as f:
                 json.dump(save_data, f, indent=2, ensure_ascii=False)
@@ -146,11 +223,16 @@ class ConfigManager:
             AIProvider.OPENAI: self._config.openai_api_key,
             AIProvider.CLAUDE: self._config.anthropic_api_key,
             AIProvider.GEMINI: self._config.google_api_key,
+            # 認証しないローカルサーバーでも SDK はキーを必要とするため、URL があれば仮のキーを使う
+            AIProvider.LOCAL: self._config.local_api_key or (LOCAL_PLACEHOLDER_API_KEY if self._config.local_base_url else None),
+            AIProvider.FAKE: FAKE_PROVIDER_API_KEY if self._config.fake_provider_enabled else None,
         }
         return key_mapping.get(provider)
     
     def is_api_key_configured(self, provider: AIProvider) -> bool:
-        """指定されたプロバイダーのAPIキーが設定されているかチェック"""
+        """指定されたプロバイダーのAPIキーが設定されているかチェック（local はベースURLの有無）"""
+        if provider == AIProvider.LOCAL:
+            return bool(self._config.local_base_url and self._config.local_base_url.strip())
         key = self.get_api_key(provider)
         return key is not None and key.strip() != ""
     
@@ -192,6 +274,10 @@ class ConfigManager:
     
     def get_model_names_for_provider(self, provider: AIProvider) -> list[str]:
         """プロバイダー別の利用可能モデル名リストを取得"""
+        if provider == AIProvider.LOCAL:
+            return self.get_local_model_names()
+        if provider == AIProvider.FAKE:
+            return list(FAKE_MODEL_NAMES)
         # 将来的にはAPIから動的に取得するなどの拡張も考えられる
         model_mapping = {
             AIProvider.OPENAI: [
@@ -222,14 +308,60 @@ class ConfigManager:
             ]
         }
         return model_mapping.get(provider, [])
+
+    def get_local_model_names(self, refresh: bool = False) -> list[str]:
+        """
+        ローカルサーバーのモデル名リストを取得
+
+        local_models が設定されていればそれを、なければサーバーの /models から取得した一覧を返す。
+        取得結果はベースURLごとに保持する（refresh=True で取り直す）。
+        """
+        if self._config.local_models:
+            return list(self._config.local_models)
+        base_url = self._config.local_base_url
+        if not base_url:
+            return []
+        if refresh or base_url not in self._local_model_names:
+            # SDK の読み込みを設定の読み込み時に行わないよう、ここで import する
+            from .api_clients.local_client import discover_local_models
+            self._local_model_names[base_url] = discover_local_models(base_url, self.get_api_key(AIProvider.LOCAL))
+        return list(self._local_model_names[base_url])
     
+    def get_context_window_for_model(self, model_name: str) -> int:
+        """モデルのコンテキスト長（入力+出力の合計トークン数）を取得"""
+        # 前方一致で判定するため、より具体的な名前を先に並べる
+        context_windows = [
+            ("gpt-4o", 128000),
+            ("gpt-4-turbo", 128000),
+            ("gpt-4-0125", 128000),
+            ("gpt-4-1106", 128000),
+            ("gpt-4-32k", 32768),
+            ("gpt-4", 8192),
+            ("gpt-3.5-turbo-16k", 16385),
+            ("gpt-3.5-turbo", 16385),
+            ("claude-3", 200000),
+            ("claude", 100000),
+            ("gemini-1.5", 1000000),
+            ("gemini-pro", 32760),
+            ("gemini", 32760),
+        ]
+        model_lower = model_name.lower()
+        for prefix, window in context_windows:
+            if model_lower.startswith(prefix):
+                return window
+        return 8192  # 不明なモデルは控えめな値を使用
+
     def get_default_model_for_provider(self, provider: AIProvider) -> Optional[str]:
         """プロバイダーのデフォルトモデルを取得"""
         default_mapping = {
             AIProvider.OPENAI: "gpt-4o-mini", # より高速なモデルをデフォルトに
             AIProvider.CLAUDE: "claude-3-haiku-20240307", # より高速なモデルをデフォルトに
-            AIProvider.GEMINI: "gemini-1.5-flash-latest" # より高速なモデルをデフォルトに
+            AIProvider.GEMINI: "gemini-1.5-flash-latest", # より高速なモデルをデフォルトに
+            AIProvider.FAKE: FAKE_MODEL_NAMES[0],
         }
+        if provider == AIProvider.LOCAL:
+            local_models = self.get_local_model_names()
+            return local_models[0] if local_models else None
         return default_mapping.get(provider)
 
 
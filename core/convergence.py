@@ -0,0 +1,88 @@
+"""
+議論の収束判定
+
+各ラウンドの発言が、それまでの発言にない内容をどれだけ含むか（新規性）を
+文字n-gramの重複から測ります。日本語は単語の区切りがないため、単語ではなく文字単位のn-gramを使います。
+新規性が閾値を下回るラウンドが続いた場合に、議論が収束した（言い換えの繰り返しになった）とみなします。
+"""
+
+import re
+import unicodedata
+from typing import Iterable, List, Optional, Set
+
+DEFAULT_NGRAM_SIZE = 3
+
+# 空白・句読点・記号は新規性の計算に使わない
+_IGNORED_CHARS_PATTERN = re.compile(r"[\s\W_]+")
+
+
+def char_ngrams(text: str, n: int = DEFAULT_NGRAM_SIZE) -> Set[str]:
+    """正規化したテキストの文字n-gramの集合を返す"""
+    normalized = _IGNORED_CHARS_PATTERN.sub("", unicodedata.normalize("NFKC", text).lower())
+    if len(normalized) < n:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + n] for i in range(len(normalized) - n + 1)}
+
+
+def novelty(text: str, prior_ngrams: Set[str], n: int = DEFAULT_NGRAM_SIZE) -> float:
+    """text のn-gramのうち prior_ngrams に含まれないものの割合（0.0〜1.0）"""
+    ngrams = char_ngrams(text, n)
+    if not ngrams:
+        return 0.0
+    return len(ngrams - prior_ngrams) / len(ngrams)
+
+
+class ConvergenceTracker:
+    """ラウンドごとの新規性を記録し、収束したかどうかを判定する"""
+
+    def __init__(
+        self,
+        threshold: float,
+        min_rounds: int = 2,
+        patience: int = 1,
+        ngram_size: int = DEFAULT_NGRAM_SIZE,
+    ):
+        """
+        初期化
+
+        Args:
+            threshold: ラウンドの新規性がこの値を下回ったら収束の兆候とみなす
+            min_rounds: 収束と判定する前に必ず行うラウンド数
+            patience: 新規性が閾値を下回るラウンドがこの回数続いたら収束とみなす
+            ngram_size: 文字n-gramの長さ
+        """
+        self.threshold = threshold
+        self.min_rounds = min_rounds
+        self.patience = patience
+        self.ngram_size = ngram_size
+        self.round_novelties: List[float] = []
+        self._prior_ngrams: Set[str] = set()
+        self._low_novelty_streak = 0
+
+    def seed(self, texts: Iterable[str]) -> None:
+        """判定の対象外とする既存の発言を取り込む（会議の再開時など）"""
+        for text in texts:
+            self._prior_ngrams |= char_ngrams(text, self.ngram_size)
+
+    def observe_round(self, texts: List[str]) -> Optional[float]:
+        """
+        ラウンドの発言を取り込み、そのラウンドの新規性を返す
+
+        新規性は各発言の新規性の平均で、比較対象はそれ以前のラウンドの発言です
+        （同じラウンドの他の参加者の発言とは比較しない）。発言がない場合は None。
+        """
+        if not texts:
+            return None
+        round_novelty = sum(novelty(text, self._prior_ngrams, self.ngram_size) for text in texts) / len(texts)
+        for text in texts:
+            self._prior_ngrams |= char_ngrams(text, self.ngram_size)
+        self.round_novelties.append(round_novelty)
+        if round_novelty < self.threshold:
+            self._low_novelty_streak += 1
+        else:
+            self._low_novelty_streak = 0
+        return round_novelty
+
+    def has_converged(self, rounds_completed: int) -> bool:
+        """rounds_completed ラウンドを終えた時点で、残りのラウンドを省略してよいか"""
+        return rounds_completed >= self.min_rounds and self._low_novelty_streak >= self.patience
@@ -0,0 +1,149 @@
+"""
+会話レジャー
+
+会議の発言を追記専用で保持し、API送信用・最終要約用の整形済みテキストと
+トークン数を追加時に一度だけ計算してキャッシュします。
+直近N件やトークン予算内のビューは、履歴全体ではなく取り出す範囲分の計算量で取得できます。
+"""
+
+import bisect
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .models import ConversationEntry
+from .utils import count_tokens
+
+logger = logging.getLogger(__name__)
+
+ERROR_STATEMENT_PREFIX = "エラーにより発言できませんでした"
+
+
+@dataclass(frozen=True)
+class LedgerRecord:
+    """レジャーの1レコード（追加時に整形・トークン計算済み）"""
+    entry: ConversationEntry
+    is_error: bool
+    is_round_summary: bool
+    api_text: str
+    summary_text: str
+    api_tokens: int
+    summary_tokens: int
+
+    def as_api_message(self) -> dict:
+        return {"role": "user", "content": self.api_text}
+
+
+def render_entry_for_api(entry: ConversationEntry) -> str:
+    """会話履歴としてAPIに渡す形式に整形する"""
+    return f"[スピーカー: {entry.speaker} (役割: {entry.persona}), ラウンド {entry.round_number}の発言]: {entry.content}"
+
+
+def render_entry_for_summary(entry: ConversationEntry) -> str:
+    """最終要約プロンプト用のMarkdown形式に整形する"""
+    # entry.content内の改行をMarkdownの改行（スペース2つ + \n）に置換
+    content_for_markdown = entry.content.replace('\n', '  \n')
+    return f"- **ラウンド {entry.round_number}, {entry.speaker} (役割: {entry.persona}):**\n  {content_for_markdown}\n"
+
+
+class ConversationLedger:
+    """追記専用の会話レジャー"""
+
+    def __init__(self, token_model_name: str = "gpt-3.5-turbo"):
+        """
+        初期化
+
+        Args:
+            token_model_name: トークン数計算に使うモデル名（エンコーディング推定用）
+        """
+        self.token_model_name = token_model_name
+        self._records: List[LedgerRecord] = []
+        self._valid_positions: List[int] = []  # エラーでないレコードの位置（昇順）
+        self._round_summary_positions: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index: int) -> LedgerRecord:
+        return self._records[index]
+
+    @property
+    def valid_count(self) -> int:
+        return len(self._valid_positions)
+
+    def append(
+        self,
+        entry: ConversationEntry,
+        is_error: bool = False,
+        is_round_summary: bool = False,
+    ) -> LedgerRecord:
+        """エントリを追加し、整形済みテキストとトークン数を確定する"""
+        api_text = render_entry_for_api(entry)
+        summary_text = render_entry_for_summary(entry)
+        record = LedgerRecord(
+            entry=entry,
+            is_error=is_error,
+            is_round_summary=is_round_summary,
+            api_text=api_text,
+            summary_text=summary_text,
+            api_tokens=count_tokens(api_text, self.token_model_name),
+            summary_tokens=count_tokens(summary_text, self.token_model_name),
+        )
+        position = len(self._records)
+        self._records.append(record)
+        if not is_error:
+            self._valid_positions.append(position)
+        if is_round_summary:
+            self._round_summary_positions.append(position)
+        return record
+
+    def round_summaries(self) -> List[LedgerRecord]:
+        """司会のラウンド要約レコードを古い順に返す"""
+        return [self._records[pos] for pos in self._round_summary_positions]
+
+    def recent_valid(self, limit: int, start: int = 0) -> List[LedgerRecord]:
+        """位置 start 以降の有効レコードのうち、直近 limit 件を古い順に返す"""
+        if limit <= 0:
+            return []
+        first = bisect.bisect_left(self._valid_positions, start)
+        window_start = max(first, len(self._valid_positions) - limit)
+        return [self._records[pos] for pos in self._valid_positions[window_start:]]
+
+    def newest_valid_within_budget(
+        self,
+        max_tokens: int,
+        start: int = 0,
+        use_summary_form: bool = False,
+        max_count: Optional[int] = None,
+        per_record_overhead: int = 0,
+        always_include_newest: bool = True,
+    ) -> Tuple[List[LedgerRecord], bool]:
+        """新しい順にトークン予算内で有効レコードを詰め、古い順で返す
+
+        Args:
+            max_tokens: トークン予算（0以下は無制限）
+            start: この位置以降のレコードのみを対象とする
+            use_summary_form: 要約用テキストのトークン数で数える（Falseの場合はAPI用）
+            max_count: 取り出す最大件数
+            per_record_overhead: 1レコードごとに加算するトークン数（メッセージの枠分など）
+            always_include_newest: 最新の1件は予算を超えていても含める
+
+        Returns:
+            (records, truncated): 取り出したレコードと、予算により古いレコードを省いたかどうか
+        """
+        first = bisect.bisect_left(self._valid_positions, start)
+        selected: List[LedgerRecord] = []
+        used_tokens = 0
+        truncated = False
+        for i in range(len(self._valid_positions) - 1, first - 1, -1):
+            if max_count is not None and len(selected) >= max_count:
+                break
+            record = self._records[self._valid_positions[i]]
+            tokens = (record.summary_tokens if use_summary_form else record.api_tokens) + per_record_overhead
+            if max_tokens > 0 and used_tokens + tokens > max_tokens and (selected or not always_include_newest):
+                truncated = True
+                break
+            selected.append(record)
+            used_tokens += tokens
+        selected.reverse()
+        return selected, truncated
@@ -3,18 +3,51 @@ import re
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import docx
 import mammoth
 import PyPDF2
 
 from .api_clients import BaseAIClient
-from .models import AppConfig, DocumentSummary, FileInfo  # AppConfig をインポート
+from .models import AUXILIARY_TASK_TEMPERATURE, AppConfig, DocumentSummary, FileInfo  # AppConfig をインポート
 from .utils import Timer, chunk_text, count_tokens, extract_content_and_tokens
 
 logger = logging.getLogger(__name__)
 
+# 要約プロンプト（_build_*_summarization_prompt）を変更したら上げる。保存済みの資料要約はバージョンごとに別扱いになる
+SUMMARY_PROMPT_VERSION = 1
+
+_SENTENCE_END_PATTERN = re.compile(r"(?<=[。！？!?])|(?<=\.)\s")
+
+
+def build_extractive_digest(text: str, max_chars: int) -> str:
+    """
+    LLMを使わない資料の抜粋を作る（要約が終わるまでのつなぎ）
+
+    各段落の冒頭の文（段落が1つしかない場合は各文）を、資料の先頭から末尾まで均等に選び、
+    改行区切りで max_chars 文字以内に収める。
+    """
+    paragraphs = [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+    if len(paragraphs) > 1:
+        candidates = [_SENTENCE_END_PATTERN.split(p.strip(), maxsplit=1)[0] for p in paragraphs]
+    else:
+        candidates = _SENTENCE_END_PATTERN.split(text)
+    sentences = [" ".join(s.split())[:max_chars - 1] for s in candidates]
+    sentences = [s for s in sentences if s]
+    if not sentences:
+        return ""
+    total_chars = sum(len(s) + 1 for s in sentences)
+    stride = -(-total_chars // max_chars)  # 切り上げ
+    digest: List[str] = []
+    used = 0
+    for sentence in sentences[::stride]:
+        if used + len(sentence) + 1 > max_chars:
+            break
+        digest.append(sentence)
+        used += len(sentence) + 1
+    return "\n".join(digest)
+
 
 @dataclass
 class ExtractionResult:
@@ -280,8 +313,18 @@ class DocumentProcessor:
         text: str,
         summarizer_ai_client: BaseAIClient,
         # target_token_count: int = 500, # AppConfigから取得するため削除
-        style: str = "会議用要約"
+        style: str = "会議用要約",
+        chunk_summarizer_ai_client: Optional[BaseAIClient] = None,
     ) -> DocumentSummary:
+        """
+        会議用に資料を要約する
+
+        Args:
+            text: 資料のテキスト
+            summarizer_ai_client: 要約（長文の場合は最終統合）に使うクライアント
+            style: 要約のスタイル
+            chunk_summarizer_ai_client: 長文資料のチャンク要約に使うクライアント（省略時は summarizer_ai_client）
+        """
         target_token_count = self.config.summarization_target_tokens # AppConfigから取得
         tokens_used_total = 0 # 要約に使用した総トークン数を追跡
         token_count = count_tokens(text, summarizer_ai_client.model_info.name)
@@ -299,14 +342,16 @@ class DocumentProcessor:
 
                 if token_count > 4000: # 閾値は適宜調整
                     summary_result = await self._summarize_long_document(
-                        text, summarizer_ai_client, target_token_count, style
+                        text, summarizer_ai_client, target_token_count, style,
+                        chunk_summarizer_ai_client=chunk_summarizer_ai_client,
                     )
                     tokens_used_total += summary_result.tokens_used # _summarize_long_document がトークン数を返すようにする
                     return summary_result # DocumentSummaryをそのまま返す
                 
                 prompt = self._build_summarization_prompt(text, target_token_count, style)
                 response = await summarizer_ai_client.request_completion(
-                    user_message=prompt, system_message="あなたは専門的な文書要約の専門家です。"
+                    user_message=prompt, system_message="あなたは専門的な文書要約の専門家です。",
+                    override_temperature=AUXILIARY_TASK_TEMPERATURE,
                 )
                 summary, tokens_used = extract_content_and_tokens(
                     summarizer_ai_client.model_info.provider, response
@@ -334,10 +379,12 @@ class DocumentProcessor:
         text: str,
         summarizer_ai_client: BaseAIClient,
         target_token_count: int,
-        style: str
+        style: str,
+        chunk_summarizer_ai_client: Optional[BaseAIClient] = None,
     ) -> DocumentSummary:
         original_length = len(text)
         tokens_used_total = 0
+        chunk_client = chunk_summarizer_ai_client or summarizer_ai_client
 
         chunks = chunk_text(text, max_chunk_size=3000, overlap=200) # chunk_sizeはモデルのコンテキスト長に応じて調整
         logger.info(f"長文書要約開始: {len(chunks)}チャンクに分割")
@@ -345,11 +392,12 @@ class DocumentProcessor:
         chunk_summaries = []
         for i, chunk in enumerate(chunks):
             chunk_prompt = self._build_chunk_summarization_prompt(chunk, i + 1, len(chunks))
-            response = await summarizer_ai_client.request_completion(
-                user_message=chunk_prompt, system_message="あなたは文書要約の専門家です。"
+            response = await chunk_client.request_completion(
+                user_message=chunk_prompt, system_message="あなたは文書要約の専門家です。",
+                override_temperature=AUXILIARY_TASK_TEMPERATURE,
             )
             content, tokens_used = extract_content_and_tokens(
-                summarizer_ai_client.model_info.provider, response
+                chunk_client.model_info.provider, response
             )
             tokens_used_total += tokens_used
             chunk_summaries.append(content.strip())
@@ -358,7 +406,8 @@ class DocumentProcessor:
         combined_summaries = "\n\n".join(chunk_summaries)
         final_prompt = self._build_final_summarization_prompt(combined_summaries, target_token_count, style)
         response = await summarizer_ai_client.request_completion(
-            user_message=final_prompt, system_message="あなたは文書要約の専門家です。"
+            user_message=final_prompt, system_message="あなたは文書要約の専門家です。",
+            override_temperature=AUXILIARY_TASK_TEMPERATURE,
         )
         final_summary, tokens_used = extract_content_and_tokens(
             summarizer_ai_client.model_info.provider, response
@@ -0,0 +1,86 @@
+"""
+資料要約のキャッシュ
+
+長い資料の要約はチャンクごとに順番に要約を依頼するため、会議開始前の処理で最も時間がかかります。
+同じ資料で会議を開き直したときに要約をやり直さないよう、日本語修正まで済んだ DocumentSummary を
+ベクトルストアと同じディレクトリ（<ベクトルストアの保存先>/<ファイルハッシュ>）に保存して再利用します。
+
+キーはファイルハッシュ・要約モデル・チャンク要約モデル・要約の目標トークン数・要約プロンプトのバージョンから
+求めるため、どれかが変われば新しく要約します。
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from .models import DocumentSummary, ModelInfo
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FILE_PREFIX = "summary-"
+
+
+def summary_cache_key(
+    file_hash: str,
+    summarizer: ModelInfo,
+    target_tokens: int,
+    prompt_version: int,
+    chunk_summarizer: Optional[ModelInfo] = None,
+) -> str:
+    """要約のキャッシュキー（チャンク要約モデルを指定しない場合は要約モデルでチャンクも要約する）"""
+    chunk_model = chunk_summarizer or summarizer
+    payload = json.dumps(
+        {
+            "file_hash": file_hash,
+            "summarizer": f"{summarizer.provider.value}:{summarizer.name}",
+            "chunk_summarizer": f"{chunk_model.provider.value}:{chunk_model.name}",
+            "target_tokens": target_tokens,
+            "prompt_version": prompt_version,
+        },
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class DocumentSummaryCache:
+    """
+    1つの資料の要約キャッシュ（キーごとに summary-<キー>.json を保存する）
+
+    Args:
+        directory: 保存先ディレクトリ（通常はその資料のベクトルストアのディレクトリ）
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{SUMMARY_FILE_PREFIX}{key}.json"
+
+    def load(self, key: str) -> Optional[DocumentSummary]:
+        """保存済みの要約（ないか読み込めない場合は None）"""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            summary = DocumentSummary.model_validate_json(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"保存済みの資料要約を読み込めません（要約し直します）: {path}: {e}")
+            return None
+        logger.info(f"保存済みの資料要約を再利用します: {path}")
+        return summary
+
+    def store(self, key: str, summary: DocumentSummary) -> None:
+        """要約を保存する（書き込み途中のファイルを読まないよう、一時ファイルから置き換える）"""
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(summary.model_dump_json(), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"資料要約を保存できませんでした: {path}: {e}")
+            return
+        logger.info(f"資料要約を保存しました: {path}")
@@ -48,4 +48,15 @@ class AuthenticationError(BaseAIException):
     """APIキーが無効など、認証に失敗したことを示す例外"""
     pass
 
+
+class CircuitOpenError(BaseAIException):
+    """障害が続いているプロバイダーへの呼び出しをサーキットブレーカーが遮断したことを示す例外"""
+    pass
+
+
+class CassetteMissError(BaseAIException):
+    """カセットの再生中に、記録されていないリクエストが送られたことを示す例外"""
+    pass
+
+
 # 必要に応じて他のカスタム例外を追加
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+共有HTTPコネクションプール
+
+プロバイダーSDKのクライアント（AsyncOpenAI・AsyncAnthropic など）はクライアントごとに
+独自のコネクションプールを持つため、参加者・司会者・会議ごとに作り直すと毎回TCP/TLSの
+ハンドシェイクが発生し、keep-alive の接続も再利用されません。
+このモジュールはプロバイダー・APIキーごとに1つのプールをプロセス全体で共有します。
+
+httpx の非同期コネクションプールは作成したイベントループに結び付くため、
+PooledAsyncTransport は実際のプールをイベントループごとに持ち、呼び出し元のループのものを使います。
+SDK によっては httpx 互換のフォーク（httpx2 など）を使い、httpx のオブジェクトを受け付けないため、
+プールは SDK が使う HTTP モジュールごとに作ります。
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple, Type
+
+import httpx
+
+from .models import AIProvider
+from .rate_scheduler import api_key_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# SDK 既定と同じく、接続は短く・応答待ちは長めに取る（リクエストごとのタイムアウトが優先される）
+DEFAULT_TIMEOUT_SECONDS = 600.0
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class HttpPoolSettings:
+    """コネクションプールの設定"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry_seconds: float = 30.0
+    http2: bool = False
+
+    def limits(self, http_module: ModuleType = httpx) -> Any:
+        return http_module.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry_seconds,
+        )
+
+
+def _http2_available(requested: bool) -> bool:
+    if requested and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 を使うには h2 パッケージが必要です（pip install 'httpx[http2]'）。HTTP/1.1 で接続します")
+        return False
+    return requested
+
+
+def _pool_connection_stats(transport: Any) -> Tuple[int, int]:
+    """httpx のトランスポートが持つプールの (接続数, アイドル接続数)"""
+    connections = list(getattr(getattr(transport, "_pool", None), "connections", []) or [])
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return len(connections), idle
+
+
+class PooledAsyncTransport:
+    """
+    イベントループごとの共有コネクションプールにリクエストを振り分けるトランスポート
+
+    HTTP モジュールの AsyncBaseTransport と組み合わせて使う（pooled_async_transport_class を参照）。
+    """
+
+    def __init__(self, name: str, settings: HttpPoolSettings, http_module: ModuleType = httpx):
+        self.name = name
+        self.settings = settings
+        self.http_module = http_module
+        self.http2 = _http2_available(settings.http2)
+        self._lock = threading.Lock()
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self.total_requests = 0
+        self.transports_created = 0
+
+    def _transport_for_running_loop(self) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.total_requests += 1
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self.http_module.AsyncHTTPTransport(
+                    limits=self.settings.limits(self.http_module), http2=self.http2
+                )
+                self._transports[loop] = transport
+                self.transports_created += 1
+            return transport
+
+    async def handle_async_request(self, request: Any) -> Any:
+        return await self._transport_for_running_loop().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """呼び出し元のイベントループのプールを閉じる（他のループのプールはそのまま）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.pop(loop, None)
+        if transport is not None:
+            await transport.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            transports = [t for loop, t in self._transports.items() if not loop.is_closed()]
+            total_requests = self.total_requests
+            transports_created = self.transports_created
+        connections = idle = 0
+        for transport in transports:
+            count, idle_count = _pool_connection_stats(transport)
+            connections += count
+            idle += idle_count
+        return {
+            "requests": total_requests,
+            "event_loops": len(transports),
+            "pools_created": transports_created,
+            "connections": connections,
+            "idle_connections": idle,
+            "http2": self.http2,
+        }
+
+
+_transport_classes: Dict[str, Type[PooledAsyncTransport]] = {}
+
+
+def pooled_async_transport_class(http_module: ModuleType = httpx) -> Type[PooledAsyncTransport]:
+    """http_module の AsyncBaseTransport として使える PooledAsyncTransport のクラス"""
+    name = http_module.__name__
+    if name not in _transport_classes:
+        _transport_classes[name] = type(
+            "PooledAsyncTransport", (PooledAsyncTransport, http_module.AsyncBaseTransport), {}
+        )
+    return _transport_classes[name]
+
+
+def _default_timeout(http_module: ModuleType) -> Any:
+    return http_module.Timeout(DEFAULT_TIMEOUT_SECONDS, connect=DEFAULT_CONNECT_TIMEOUT_SECONDS)
+
+
+class _SharedPool:
+    """プロバイダー・APIキー・HTTPモジュールごとの共有クライアント一式"""
+
+    def __init__(self, name: str, settings: HttpPoolSettings, http_module: ModuleType = httpx):
+        self.name = name
+        self.settings = settings
+        self.http_module = http_module
+        self.async_transport = pooled_async_transport_class(http_module)(name, settings, http_module)
+        self.async_client = http_module.AsyncClient(
+            transport=self.async_transport, timeout=_default_timeout(http_module)
+        )
+        self._sync_client: Any = None
+        self._sync_lock = threading.Lock()
+
+    @property
+    def sync_client(self) -> Any:
+        # 同期プールはイベントループに依存しないため1つを全スレッドで共有する
+        with self._sync_lock:
+            if self._sync_client is None:
+                self._sync_client = self.http_module.Client(
+                    limits=self.settings.limits(self.http_module),
+                    http2=self.async_transport.http2,
+                    timeout=_default_timeout(self.http_module),
+                )
+            return self._sync_client
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.async_transport.stats()
+        with self._sync_lock:
+            sync_client = self._sync_client
+        sync_connections, sync_idle = _pool_connection_stats(getattr(sync_client, "_transport", None))
+        stats["sync_connections"] = sync_connections
+        stats["sync_idle_connections"] = sync_idle
+        return stats
+
+
+_pools: Dict[Tuple[AIProvider, str, str], _SharedPool] = {}
+_pools_lock = threading.Lock()
+_settings = HttpPoolSettings()
+
+
+def configure_http_pools(settings: HttpPoolSettings) -> None:
+    """以降に作成するプールの設定を変更する（作成済みのプールには影響しない）"""
+    global _settings
+    with _pools_lock:
+        _settings = settings
+
+
+def _get_pool(provider: AIProvider, api_key: Optional[str], http_module: ModuleType) -> _SharedPool:
+    key = (provider, api_key_fingerprint(api_key), http_module.__name__)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            name = f"{provider.value}:{key[1]}" + ("" if http_module is httpx else f":{http_module.__name__}")
+            pool = _SharedPool(name, _settings, http_module)
+            _pools[key] = pool
+            logger.info(f"共有HTTPプールを作成しました: {pool.name} ({_settings})")
+        return pool
+
+
+def get_async_http_client(provider: AIProvider, api_key: Optional[str], http_module: ModuleType = httpx) -> Any:
+    """
+    プロバイダーとAPIキーの組で共有する非同期HTTPクライアント（SDK の http_client に渡す）
+
+    Args:
+        provider: プロバイダー
+        api_key: APIキー（ハッシュ化してキーに使う）
+        http_module: SDK が使う HTTP モジュール（httpx または httpx 互換のフォーク）
+    """
+    return _get_pool(provider, api_key, http_module).async_client
+
+
+def get_sync_http_client(provider: AIProvider, api_key: Optional[str], http_module: ModuleType = httpx) -> Any:
+    """プロバイダーとAPIキーの組で共有する同期HTTPクライアント（SDK の http_client に渡す）"""
+    return _get_pool(provider, api_key, http_module).sync_client
+
+
+def http_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """全共有プールの利用状況（プール名 → 統計）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.stats() for pool in pools}
+
+
+def reset_http_pools() -> None:
+    """共有プールをすべて破棄する（テスト用。使用中の接続は各イベントループの終了時に破棄される）"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        with pool._sync_lock:
+            if pool._sync_client is not None:
+                pool._sync_client.close()
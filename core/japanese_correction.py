@@ -0,0 +1,127 @@
+"""
+文単位の日本語修正
+
+japanese_detector が日本語でないと判定した文だけを前後の文脈付きでLLMに送り、
+返ってきた修正文を元のテキストの該当位置に差し戻します。
+全文の書き直しに比べて出力トークンが少なく、問題のない部分が書き換わることもありません。
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+from .japanese_detector import SentenceVerdict
+
+SPAN_CORRECTION_SYSTEM_MESSAGE = (
+    "あなたは高度な翻訳・校正AIです。指定された文だけを、前後の文脈に自然につながる日本語に書き直してください。"
+)
+# 修正対象の前後に付ける文脈の文字数
+SPAN_CONTEXT_CHARS = 80
+# 修正対象の文がテキストのこの割合を超える場合は全文修正の方が自然なため文単位修正を使わない
+SPAN_CORRECTION_MAX_RATIO = 0.5
+
+_NUMBERED_LINE_PATTERN = re.compile(r"^\s*\[(\d+)\]\s*(.*)$")
+
+_JAPANESE_TERMINATORS = "。！？"
+_ASCII_TO_JAPANESE_TERMINATOR = {".": "。", "!": "！", "?": "？"}
+
+
+def span_correction_ratio(text: str, sentences: Sequence[SentenceVerdict]) -> float:
+    """修正対象の文がテキスト全体に占める割合"""
+    if not text:
+        return 0.0
+    return sum(sentence.end - sentence.start for sentence in sentences) / len(text)
+
+
+def build_span_correction_prompt(
+    text: str, sentences: Sequence[SentenceVerdict], context_chars: int = SPAN_CONTEXT_CHARS
+) -> str:
+    """修正対象の文を番号付きで並べ、前後の文脈を添えたプロンプトを作る"""
+    lines = [
+        "以下の各項目の【修正対象】の文だけを、完全に自然で流暢な日本語に書き直してください。",
+        "前後の文脈は参考情報です。書き直したり出力に含めたりしないでください。",
+        "元の文の意図やニュアンスを保ち、他の言語の要素は含めないでください（固有名詞・略語・URLはそのままで構いません）。",
+        "",
+    ]
+    for number, sentence in enumerate(sentences, start=1):
+        before = text[max(0, sentence.start - context_chars):sentence.start].strip()
+        after = text[sentence.end:sentence.end + context_chars].strip()
+        lines.append(f"[{number}]")
+        lines.append(f"前の文脈: {before or '（なし）'}")
+        lines.append(f"【修正対象】: {sentence.text.strip()}")
+        lines.append(f"後の文脈: {after or '（なし）'}")
+        lines.append("")
+    lines.append("回答は次の形式で、項目ごとに修正後の文のみを返してください（説明は不要です）:")
+    lines.extend(f"[{number}] 修正後の文" for number in range(1, len(sentences) + 1))
+    return "\n".join(lines)
+
+
+def parse_span_corrections(response_text: str, expected_count: int) -> Optional[List[str]]:
+    """番号付きの回答を解析する。全項目がそろわない場合は None"""
+    corrections: Dict[int, str] = {}
+    current_number: Optional[int] = None
+    for line in response_text.splitlines():
+        match = _NUMBERED_LINE_PATTERN.match(line)
+        if match:
+            current_number = int(match.group(1))
+            corrections[current_number] = match.group(2).strip()
+        elif current_number is not None and line.strip():
+            # 修正文が複数行にわたる場合は同じ項目として連結する
+            corrections[current_number] = f"{corrections[current_number]}{line.strip()}"
+    result = [corrections.get(number, "") for number in range(1, expected_count + 1)]
+    if not all(result):
+        return None
+    return result
+
+
+def _with_terminator(correction: str, original: str) -> str:
+    """修正文の文末を日本語の句点類にそろえる（修正文に文末がなければ元の文の文末を付ける）"""
+    last = correction[-1:]
+    if last in _ASCII_TO_JAPANESE_TERMINATOR:
+        return correction[:-1] + _ASCII_TO_JAPANESE_TERMINATOR[last]
+    if last in _JAPANESE_TERMINATORS:
+        return correction
+    original_last = original[-1:]
+    if original_last in _JAPANESE_TERMINATORS:
+        return correction + original_last
+    return correction + _ASCII_TO_JAPANESE_TERMINATOR.get(original_last, "")
+
+
+def splice_corrections(
+    text: str, sentences: Sequence[SentenceVerdict], corrections: Sequence[str]
+) -> str:
+    """
+    修正文を元のテキストの該当位置に差し戻す（文の前後の改行は保持する）
+
+    修正文の文末は日本語の句点類にそろえ、元の文が半角の文末と空白で次の文と区切られていた場合は、
+    その空白を取り除く（「…すべきです。次に…」のようにつなげる）。
+    """
+    pieces: List[str] = []
+    cursor = 0
+    drop_separator = False
+
+    def append(piece: str) -> None:
+        nonlocal drop_separator
+        if drop_separator and piece:
+            without_space = piece.lstrip(" ")
+            if not without_space:
+                return  # 空白だけなら、続く文の前の区切りとして取り除く
+            if not without_space[0].isspace():
+                piece = without_space
+            drop_separator = False
+        pieces.append(piece)
+
+    for sentence, correction in sorted(zip(sentences, corrections), key=lambda pair: pair[0].start):
+        original = text[sentence.start:sentence.end]
+        stripped = original.strip()
+        leading = original[:len(original) - len(original.lstrip())]
+        trailing = original[len(original.rstrip()):]
+        append(text[cursor:sentence.start])
+        if stripped:
+            append(leading)
+            pieces.append(f"{_with_terminator(correction.strip(), stripped)}{trailing}")
+            drop_separator = not trailing and stripped[-1:] in _ASCII_TO_JAPANESE_TERMINATOR
+        else:
+            append(original)
+        cursor = sentence.end
+    append(text[cursor:])
+    return "".join(pieces)
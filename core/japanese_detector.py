@@ -0,0 +1,219 @@
+"""
+日本語適合判定
+
+AIの出力が日本語として書かれているかを、LLMを呼ばずにローカルで判定します。
+事前に構築した文字種テーブルで本文を str.translate により1回で文字種列に変換し、
+文ごとに判定結果を返します（文字単位の処理はすべてC実装の文字列・バイト列操作で行う）。
+URL・メールアドレス・コード（```ブロック / `インライン`）は判定対象から除外するため、
+これらを含む正当な日本語の文章で修正呼び出しが発生しません。
+ラテン小文字・ハングル等がテキスト全体で閾値未満で、仮名をはさまない漢字の長い並びもない場合
+（保存済みの会話ログでは大半の発言）は、文ごとの判定を作らずに「修正不要」と返します。
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# 文字種
+_NEUTRAL = 0       # 数字・記号・空白など（判定に使わない）
+_KANA = 1          # ひらがな・カタカナ
+_KANJI = 2         # 漢字
+_LATIN_LOWER = 3   # ラテン文字（小文字。英文などの判定に使う）
+_OTHER_SCRIPT = 4  # ハングル・キリル文字など日本語で通常使わない文字
+_TERMINATOR = 5    # 文末（。！？!? 改行）
+_PERIOD = 6        # 半角ピリオド（直後が空白・文末の場合のみ文末として扱う）
+_LATIN_UPPER = 7   # ラテン文字（大文字。AI・KPI などの略語は日本語の文中でも普通に使われる）
+
+_MAX_CODE_POINT = 0x110000
+
+_KANA_RANGES = [(0x3040, 0x309F), (0x30A0, 0x30FF), (0x31F0, 0x31FF), (0xFF66, 0xFF9F)]
+_KANJI_RANGES = [(0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF), (0x3005, 0x3007), (0x20000, 0x3FFFF)]
+_LATIN_UPPER_RANGES = [(0x41, 0x5A), (0xC0, 0xD6), (0xD8, 0xDE), (0xFF21, 0xFF3A)]
+_LATIN_LOWER_RANGES = [(0x61, 0x7A), (0xDF, 0xF6), (0xF8, 0x24F), (0xFF41, 0xFF5A)]
+_OTHER_SCRIPT_RANGES = [
+    (0x370, 0x3FF),    # ギリシャ文字
+    (0x400, 0x4FF),    # キリル文字
+    (0x590, 0x6FF),    # ヘブライ文字・アラビア文字
+    (0x900, 0x97F),    # デーヴァナーガリー
+    (0xE00, 0xE7F),    # タイ文字
+    (0x1100, 0x11FF),  # ハングル字母
+    (0x3130, 0x318F),  # ハングル互換字母
+    (0xAC00, 0xD7AF),  # ハングル音節
+]
+_TERMINATOR_CHARS = "。！？!?\n．"
+
+
+def _build_char_class_table() -> bytearray:
+    table = bytearray(_MAX_CODE_POINT)
+    for class_id, ranges in (
+        (_KANA, _KANA_RANGES),
+        (_KANJI, _KANJI_RANGES),
+        (_LATIN_UPPER, _LATIN_UPPER_RANGES),
+        (_LATIN_LOWER, _LATIN_LOWER_RANGES),
+        (_OTHER_SCRIPT, _OTHER_SCRIPT_RANGES),
+    ):
+        for start, end in ranges:
+            table[start:end + 1] = bytes([class_id]) * (end - start + 1)
+    for ch in _TERMINATOR_CHARS:
+        table[ord(ch)] = _TERMINATOR
+    table[ord(".")] = _PERIOD
+    return table
+
+
+# str.translate 用の変換表（コードポイント -> 文字種を表す1文字）
+_CHAR_CLASS_TABLE = _build_char_class_table().decode("latin-1")
+
+# 判定から除外する範囲（URL・メールアドレス・コード）。
+# 該当しうる文字を含むテキストにだけ適用し、大半の発言では正規表現の走査自体を省く
+_IGNORED_SPAN_PATTERNS = (
+    ("`", re.compile(r"```.*?(?:```|\Z)|`[^`\n]+`", re.DOTALL)),  # コードブロック（閉じられていない場合は末尾まで）・インラインコード
+    ("://", re.compile(r"(?:https?|ftp)://[^\s<>()\[\]「」（）]+")),  # URL
+    ("www.", re.compile(r"www\.[^\s<>()\[\]「」（）]+")),
+    ("@", re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")),  # メールアドレス
+)
+
+# 文ごとの判定閾値
+# ラテン文字は小文字のみを数える（大文字だけの略語・型番では外国語と判定しない）
+MIN_LATIN_LETTERS_FOREIGN_SENTENCE = 8    # 日本語文字を含まない文で、これ以上のラテン小文字があれば外国語とみなす
+MIXED_MIN_LATIN_LETTERS = 20              # 日本語混じりの文で外国語とみなすラテン小文字数の下限
+MIXED_LATIN_TO_JAPANESE_RATIO = 3.0       # 日本語混じりの文で、ラテン小文字が日本語文字のこの倍数を超えたら外国語とみなす
+MIN_OTHER_SCRIPT_LETTERS = 2              # ハングル等がこれ以上あり、日本語文字より多ければ外国語とみなす
+MIN_KANJI_ONLY_SENTENCE = 20              # 仮名を含まずこれ以上の漢字が続く文は中国語とみなす
+
+# 文字種列から仮名・漢字・文末以外を取り除くための削除対象と、仮名・文末をはさまない漢字の並び
+# （"kanji_only" の文があれば、取り除いた後の列に必ずこの並びが現れる）
+_KANJI_RUN_DELETE = bytes(c for c in range(256) if c not in (_KANA, _KANJI, _TERMINATOR))
+_KANJI_RUN = bytes([_KANJI]) * MIN_KANJI_ONLY_SENTENCE
+
+
+@dataclass(frozen=True)
+class SentenceVerdict:
+    """1文の判定結果（start/end は元テキスト上の位置）"""
+    start: int
+    end: int
+    text: str
+    kana_chars: int
+    kanji_chars: int
+    latin_chars: int
+    latin_lowercase_chars: int
+    other_script_chars: int
+    is_japanese: bool
+    reason: str = ""  # 日本語でないと判定した理由: "latin" / "other_script" / "kanji_only"
+
+    @property
+    def japanese_chars(self) -> int:
+        return self.kana_chars + self.kanji_chars
+
+
+class JapaneseDetectionResult:
+    """
+    テキスト全体の判定結果
+
+    文ごとの判定（sentences）は必要になるまで作らない。テキスト全体の文字数から
+    どの文も日本語でないと判定されえないことが分かっている場合（大半の発言）は、
+    needs_correction・flagged_sentences は文ごとの判定を作らずに返す。
+    """
+
+    def __init__(self, text: str, classes: bytearray, known_japanese: bool):
+        self.text = text
+        self._classes = classes
+        self._known_japanese = known_japanese
+        self._sentences: Optional[Tuple[SentenceVerdict, ...]] = None
+
+    @property
+    def sentences(self) -> Tuple[SentenceVerdict, ...]:
+        if self._sentences is None:
+            self._sentences = _judge_sentences(self.text, self._classes)
+        return self._sentences
+
+    @property
+    def flagged_sentences(self) -> List[SentenceVerdict]:
+        if self._known_japanese:
+            return []
+        return [sentence for sentence in self.sentences if not sentence.is_japanese]
+
+    @property
+    def needs_correction(self) -> bool:
+        if self._known_japanese:
+            return False
+        return any(not sentence.is_japanese for sentence in self.sentences)
+
+    @property
+    def japanese_chars(self) -> int:
+        return sum(sentence.japanese_chars for sentence in self.sentences)
+
+    @property
+    def latin_chars(self) -> int:
+        return sum(sentence.latin_chars for sentence in self.sentences)
+
+
+def _judge_sentence(kana: int, kanji: int, latin_lower: int, other: int) -> Tuple[bool, str]:
+    japanese = kana + kanji
+    if other >= MIN_OTHER_SCRIPT_LETTERS and other > japanese:
+        return False, "other_script"
+    if japanese == 0 and latin_lower >= MIN_LATIN_LETTERS_FOREIGN_SENTENCE:
+        return False, "latin"
+    if latin_lower >= MIXED_MIN_LATIN_LETTERS and latin_lower > japanese * MIXED_LATIN_TO_JAPANESE_RATIO:
+        return False, "latin"
+    if kana == 0 and kanji >= MIN_KANJI_ONLY_SENTENCE:
+        return False, "kanji_only"
+    return True, ""
+
+
+def _cannot_be_flagged(classes: bytearray) -> bool:
+    """
+    どの文も日本語でないと判定されえないか（テキスト全体の文字数による、取りこぼしのない事前判定）
+
+    ラテン小文字・ハングル等がテキスト全体で閾値未満なら "latin" / "other_script" にはならない。
+    "kanji_only" は、仮名と文末をはさまずに漢字が MIN_KANJI_ONLY_SENTENCE 個並ぶ箇所がなければならない。
+    """
+    if classes.count(_LATIN_LOWER) >= MIN_LATIN_LETTERS_FOREIGN_SENTENCE:
+        return False
+    if classes.count(_OTHER_SCRIPT) >= MIN_OTHER_SCRIPT_LETTERS:
+        return False
+    return _KANJI_RUN not in classes.translate(None, _KANJI_RUN_DELETE)
+
+
+def _judge_sentences(text: str, classes: bytearray) -> Tuple[SentenceVerdict, ...]:
+    """文字種列を文に区切り、文ごとの判定を返す"""
+    length = len(classes)
+    sentences: List[SentenceVerdict] = []
+    sentence_start = 0
+    while sentence_start < length:
+        terminator = classes.find(_TERMINATOR, sentence_start)
+        sentence_end = length if terminator == -1 else terminator + 1
+        kana = classes.count(_KANA, sentence_start, sentence_end)
+        kanji = classes.count(_KANJI, sentence_start, sentence_end)
+        latin_lower = classes.count(_LATIN_LOWER, sentence_start, sentence_end)
+        latin = latin_lower + classes.count(_LATIN_UPPER, sentence_start, sentence_end)
+        other = classes.count(_OTHER_SCRIPT, sentence_start, sentence_end)
+        if kana or kanji or latin or other:
+            is_japanese, reason = _judge_sentence(kana, kanji, latin_lower, other)
+            sentences.append(SentenceVerdict(
+                sentence_start, sentence_end, text[sentence_start:sentence_end],
+                kana, kanji, latin, latin_lower, other, is_japanese, reason,
+            ))
+        sentence_start = sentence_end
+    return tuple(sentences)
+
+
+def detect_japanese(text: str) -> JapaneseDetectionResult:
+    """テキストの各文字を文字種に変換し、文ごとの日本語判定を返す"""
+    classes = bytearray(text.translate(_CHAR_CLASS_TABLE).encode("latin-1"))
+    length = len(classes)
+
+    # 除外範囲は文字種を数えず、文の区切りにもしない
+    for marker, pattern in _IGNORED_SPAN_PATTERNS:
+        if marker not in text:
+            continue
+        for match in pattern.finditer(text):
+            start, end = match.span()
+            classes[start:end] = bytes(end - start)
+
+    period = classes.find(_PERIOD)
+    while period != -1:
+        next_index = period + 1
+        is_terminator = next_index >= length or text[next_index].isspace()
+        classes[period] = _TERMINATOR if is_terminator else _NEUTRAL
+        period = classes.find(_PERIOD, next_index)
+    return JapaneseDetectionResult(text, classes, known_japanese=_cannot_be_flagged(classes))
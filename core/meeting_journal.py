@@ -0,0 +1,149 @@
+"""
+会議ジャーナル
+
+会議の進行（設定・フェーズ変更・資料要約・強化後のペルソナ・確定した発言・最終要約）を
+JSONL形式で1行ずつ追記し、書き込みごとに fsync します。
+プロセスが途中で終了しても、ジャーナルから最後に確定した発言までを復元して
+プロバイダーを再度呼び出さずに会議を再開できます。
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .models import ConversationEntry, DocumentSummary, MeetingSettings
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FORMAT_VERSION = 1
+
+# レコード種別
+RECORD_MEETING_STARTED = "meeting_started"
+RECORD_MEETING_RESUMED = "meeting_resumed"
+RECORD_PHASE = "phase"
+RECORD_DOCUMENT_SUMMARY = "document_summary"
+RECORD_PERSONAS = "personas"
+RECORD_ENTRY = "entry"
+RECORD_ROUND_COMPLETED = "round_completed"
+RECORD_DISCUSSION_CONVERGED = "discussion_converged"
+RECORD_FINAL_SUMMARY = "final_summary"
+
+
+class MeetingJournal:
+    """追記専用の会議ジャーナル（1レコード1行のJSON）"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def append(self, record_type: str, **payload: Any) -> None:
+        """レコードを追記し、ディスクへの書き込みが完了するまで待つ"""
+        record = {"type": record_type, "timestamp": datetime.now().isoformat(), **payload}
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+@dataclass
+class JournalEntry:
+    """ジャーナルに記録された確定済みの発言"""
+    entry: ConversationEntry
+    is_error: bool = False
+    is_round_summary: bool = False
+    participant_key: Optional[str] = None
+
+
+@dataclass
+class JournalSnapshot:
+    """ジャーナルから復元した会議の状態"""
+    settings: MeetingSettings
+    carry_over_context: Optional[str] = None
+    last_phase: str = "pending"
+    document_summary: Optional[DocumentSummary] = None
+    document_processed: bool = False
+    participant_personas: Optional[Dict[str, str]] = None
+    moderator_persona: Optional[str] = None
+    entries: List[JournalEntry] = field(default_factory=list)
+    completed_rounds: int = 0
+    converged_at_round: Optional[int] = None
+    final_summary: Optional[str] = None
+    total_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def personas_enhanced(self) -> bool:
+        return self.participant_personas is not None
+
+
+def load_journal(path: Union[str, Path]) -> JournalSnapshot:
+    """
+    ジャーナルを読み込んで会議の状態を復元する
+
+    書き込み途中で終了した場合の末尾の壊れた行は無視します。
+
+    Args:
+        path: ジャーナルファイルのパス
+
+    Returns:
+        復元した会議の状態
+
+    Raises:
+        ValueError: 会議開始レコードがない、または途中の行が壊れている場合
+    """
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    records: List[Dict[str, Any]] = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            if line_number == len(lines):
+                logger.warning(f"ジャーナル末尾の不完全な行を無視します: {path}")
+                break
+            raise ValueError(f"ジャーナルの {line_number} 行目が壊れています: {e}") from e
+
+    if not records or records[0].get("type") != RECORD_MEETING_STARTED:
+        raise ValueError(f"会議開始レコードがありません: {path}")
+
+    started = records[0]
+    snapshot = JournalSnapshot(
+        settings=MeetingSettings.model_validate(started["settings"]),
+        carry_over_context=started.get("carry_over_context"),
+    )
+    for record in records:
+        record_type = record.get("type")
+        if record_type == RECORD_PHASE:
+            snapshot.last_phase = record["phase"]
+        elif record_type == RECORD_DOCUMENT_SUMMARY:
+            snapshot.document_processed = True
+            summary = record.get("summary")
+            snapshot.document_summary = DocumentSummary.model_validate(summary) if summary else None
+        elif record_type == RECORD_PERSONAS:
+            snapshot.participant_personas = dict(record.get("participants") or {})
+            snapshot.moderator_persona = record.get("moderator")
+        elif record_type == RECORD_ENTRY:
+            snapshot.entries.append(JournalEntry(
+                entry=ConversationEntry.model_validate(record["entry"]),
+                is_error=bool(record.get("is_error")),
+                is_round_summary=bool(record.get("is_round_summary")),
+                participant_key=record.get("participant_key"),
+            ))
+        elif record_type == RECORD_ROUND_COMPLETED:
+            snapshot.completed_rounds = max(snapshot.completed_rounds, int(record["round"]))
+        elif record_type == RECORD_DISCUSSION_CONVERGED:
+            snapshot.converged_at_round = int(record["round"])
+        elif record_type == RECORD_FINAL_SUMMARY:
+            snapshot.final_summary = record["content"]
+        snapshot.total_tokens = record.get("total_tokens", snapshot.total_tokens)
+        snapshot.cached_tokens = record.get("cached_tokens", snapshot.cached_tokens)
+    return snapshot
@@ -1,33 +1,78 @@
 import asyncio
 import random
 import logging
-from typing import List, Dict, Optional, Tuple, Any, Callable
+from typing import List, Dict, Optional, Tuple, Any, Callable, Union
 from datetime import datetime
 from dataclasses import dataclass, field
 import copy
-import re # 日本語チェック用
+import functools
+import re
+import sqlite3
+import time
+import uuid
+from pathlib import Path
 
 from .models import (
     MeetingSettings, MeetingResult, ConversationEntry, DocumentSummary,
-    ModelInfo, AIProvider, AppConfig
+    ModelInfo, AIProvider, AppConfig, AuxiliaryTask, AUXILIARY_TASK_TEMPERATURE
 )
 from .api_clients import BaseAIClient
+from .cassette import cassette_from_config
 from .client_factory import ClientFactory
-from .document_processor import DocumentProcessor
+from .document_processor import DocumentProcessor, ExtractionResult, SUMMARY_PROMPT_VERSION, build_extractive_digest
+from .document_summary_cache import DocumentSummaryCache, summary_cache_key
+from .response_cache import ResponseCache, get_response_cache, response_cache_from_config
 from .utils import (
     Timer,
     format_duration,
     sanitize_filename,
     count_tokens,
     extract_content_and_tokens,
+    generate_file_hash,
 )
 from .config_manager import get_config_manager
+from .conversation_ledger import ConversationLedger, ERROR_STATEMENT_PREFIX
+from .japanese_detector import detect_japanese, JapaneseDetectionResult
+from .japanese_correction import (
+    SPAN_CORRECTION_MAX_RATIO,
+    SPAN_CORRECTION_SYSTEM_MESSAGE,
+    build_span_correction_prompt,
+    parse_span_corrections,
+    span_correction_ratio,
+    splice_corrections,
+)
 from .context_manager import save_carry_over
-from .persona_enhancer import PersonaEnhancer
-from .vector_store_manager import VectorStoreManager
+from .convergence import ConvergenceTracker
+from .http_pool import http_pool_stats
+from .meeting_journal import (
+    MeetingJournal,
+    JournalSnapshot,
+    load_journal,
+    JOURNAL_FORMAT_VERSION,
+    RECORD_MEETING_STARTED,
+    RECORD_MEETING_RESUMED,
+    RECORD_PHASE,
+    RECORD_DOCUMENT_SUMMARY,
+    RECORD_PERSONAS,
+    RECORD_ENTRY,
+    RECORD_ROUND_COMPLETED,
+    RECORD_DISCUSSION_CONVERGED,
+    RECORD_FINAL_SUMMARY,
+)
+from .phase_graph import PhaseGraph
+from .persona_enhancer import PersonaEnhancer, DEFAULT_PERSONA_MODEL, PERSONA_MAX_TOKENS, persona_cache_key
+from .vector_store_manager import DEFAULT_VECTOR_STORE_DIR, VectorStoreManager
 
 logger = logging.getLogger(__name__)
 
+# 履歴メッセージ1件あたりのロール・区切り分のトークン数（概算）
+HISTORY_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class _MeetingStartError(Exception):
+    """参加者・司会者を初期化できず会議を開始できない"""
+
+
 @dataclass
 class ParticipantInfo:
     client: BaseAIClient
@@ -47,44 +92,187 @@ class MeetingState:
     conversation_history: List[ConversationEntry] = field(default_factory=list)
     error_message: Optional[str] = None
     total_tokens_this_meeting: int = 0
-
-    def add_conversation_entry(self, entry: ConversationEntry):
+    cached_tokens_this_meeting: int = 0
+    ledger: ConversationLedger = field(default_factory=ConversationLedger)
+    current_round_start_index: int = 0  # 直近のラウンド要約より後の発言の開始位置
+    converged_at_round: Optional[int] = None  # 議論が収束して残りのラウンドを省略した場合のラウンド
+    phase_timings: Dict[str, float] = field(default_factory=dict)  # 会議開始前の各フェーズの所要時間（秒）
+    first_statement_seconds: Optional[float] = None  # 会議開始から最初の発言が確定するまでの秒数
+    document_summary_swapped_at_round: Optional[int] = None  # 資料の抜粋を要約に差し替えたラウンド（progressive_document_summary）
+
+    def add_conversation_entry(self, entry: ConversationEntry, is_error: bool = False, is_round_summary: bool = False):
         self.conversation_history.append(entry)
+        self.ledger.append(entry, is_error=is_error, is_round_summary=is_round_summary)
         logger.debug(f"会話ログ追加: {entry.speaker} - Round {entry.round_number} - {entry.content[:50]}...")
 
+    def add_round_summary(self, entry: ConversationEntry):
+        """司会のラウンド要約を会話ログとローリングメモリの両方に追加する"""
+        self.add_conversation_entry(entry, is_round_summary=True)
+        self.current_round_start_index = len(self.conversation_history)
+
     def add_tokens_used(self, tokens: int):
         self.total_tokens_this_meeting += tokens
 
+    def add_cached_tokens(self, tokens: int):
+        self.cached_tokens_this_meeting += tokens
+
 class MeetingManager:
     def __init__(
         self,
         document_processor: Optional[DocumentProcessor] = None,
         vector_store_manager: Optional[VectorStoreManager] = None,
         carry_over_context: Optional[str] = None,
+        document_store_dir: Optional[str] = None,
     ):
         self.config_manager = get_config_manager()
         self.app_config: AppConfig = self.config_manager.config
         self.document_processor = document_processor or DocumentProcessor(config=self.app_config)
         self.vector_store_manager = vector_store_manager
         self.carry_over_context = carry_over_context
+        # 資料要約の保存先の親ディレクトリ（ベクトルストアと同じく <保存先>/<ファイルハッシュ> に保存する）
+        self.document_store_dir = document_store_dir or DEFAULT_VECTOR_STORE_DIR
         self.participants: Dict[str, ParticipantInfo] = {}
         self.moderator: Optional[ParticipantInfo] = None
         self.state = MeetingState()
         self._system_prompt_context: str = ""
+        # 発言順のシャッフル用（meeting_random_seed を指定すると進行が再現できる）
+        self._rng = random.Random(self.app_config.meeting_random_seed)
+        # 補助タスク用クライアント（task_model_routing で割り当てがない場合は None）
+        self._task_clients: Dict[AuxiliaryTask, Optional[BaseAIClient]] = {}
+        # 会議ジャーナル（meeting_journal_dir が未設定の場合は記録しない）
+        self.journal: Optional[MeetingJournal] = None
+        self.journal_path: Optional[str] = None
+        # 会議開始前に検索した議題のRAGコンテキスト (議題, コンテキスト)
+        self._topic_rag_context: Optional[Tuple[str, Optional[str]]] = None
+        self._meeting_started_at: Optional[float] = None
+        # progressive_document_summary で議論と並行して進める資料要約
+        self._document_summary_task: Optional["asyncio.Task[Optional[DocumentSummary]]"] = None
 
         self.on_statement_added: Optional[Callable[[ConversationEntry], None]] = None
-        self.on_phase_changed: Optional[Callable[[str], None]] = None
+        # (フェーズ名) でフェーズの開始を、(フェーズ名, 所要秒数) で会議開始前のフェーズの終了を通知する
+        self.on_phase_changed: Optional[Callable[..., None]] = None
         self.on_error: Optional[Callable[[str], None]] = None
+        # ストリーミング中のテキスト断片 (発言者の内部キー, 発言者名, 断片) / 最終要約の断片
+        # 同じモデルの参加者は発言者名が同じになるため、発言の区別には内部キー（ConversationEntry.speaker_key）を使う
+        self.on_statement_delta: Optional[Callable[[str, str, str], None]] = None
+        self.on_summary_delta: Optional[Callable[[str], None]] = None
         self.progress_callback_internal: Optional[Callable[[str, int, int], None]] = None
         logger.info("MeetingManager 初期化完了")
 
     def _update_phase(self, new_phase: str):
         self.state.phase = new_phase
         logger.info(f"会議フェーズ変更: {new_phase}")
+        self._journal_record(RECORD_PHASE, phase=new_phase)
         if self.on_phase_changed:
             try: self.on_phase_changed(new_phase)
             except Exception as e: logger.error(f"on_phase_changed コールバック実行エラー: {e}", exc_info=True)
 
+    def _report_phase_timing(self, phase: str, elapsed: float):
+        logger.info(f"会議開始前のフェーズ {phase}: {elapsed:.2f}秒")
+        if self.on_phase_changed:
+            try: self.on_phase_changed(phase, elapsed)
+            except Exception as e: logger.error(f"on_phase_changed コールバック実行エラー: {e}", exc_info=True)
+
+    def _open_journal(self, settings: MeetingSettings) -> None:
+        """新しい会議のジャーナルを作成し、会議設定を記録する"""
+        journal_dir = self.app_config.meeting_journal_dir
+        if not journal_dir:
+            return
+        filename = (
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_"
+            f"{sanitize_filename(settings.user_query[:30])}_{uuid.uuid4().hex[:8]}.jsonl"
+        )
+        try:
+            self.journal = MeetingJournal(Path(journal_dir) / filename)
+        except OSError as e:
+            logger.warning(f"会議ジャーナルを作成できませんでした（記録せずに続行します）: {e}")
+            return
+        self.journal_path = str(self.journal.path)
+        self._journal_record(
+            RECORD_MEETING_STARTED,
+            version=JOURNAL_FORMAT_VERSION,
+            settings=settings.model_dump(mode="json"),
+            carry_over_context=self.carry_over_context,
+        )
+        logger.info(f"会議ジャーナル: {self.journal_path}")
+
+    def _close_journal(self) -> None:
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+    def _journal_record(self, record_type: str, **payload: Any) -> None:
+        """ジャーナルにレコードを追記する（書き込みに失敗しても会議は続行する）"""
+        if not self.journal:
+            return
+        try:
+            self.journal.append(
+                record_type,
+                total_tokens=self.state.total_tokens_this_meeting,
+                cached_tokens=self.state.cached_tokens_this_meeting,
+                **payload,
+            )
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"会議ジャーナルへの書き込みに失敗（以降は記録しません）: {e}")
+            self._close_journal()
+
+    def _journal_entry(
+        self, entry: ConversationEntry, participant_key: Optional[str],
+        is_error: bool = False, is_round_summary: bool = False,
+    ) -> None:
+        self._journal_record(
+            RECORD_ENTRY,
+            entry=entry.model_dump(mode="json"),
+            participant_key=participant_key,
+            is_error=is_error,
+            is_round_summary=is_round_summary,
+        )
+
+    def _restore_from_journal(self, snapshot: JournalSnapshot) -> None:
+        """ジャーナルの内容を参加者と会議状態に反映する（プロバイダーは呼ばない）"""
+        if snapshot.participant_personas is not None:
+            for key, persona in snapshot.participant_personas.items():
+                if key in self.participants:
+                    self.participants[key].persona = persona
+            if self.moderator and snapshot.moderator_persona:
+                self.moderator.persona = snapshot.moderator_persona
+        for journal_entry in snapshot.entries:
+            if journal_entry.is_round_summary:
+                self.state.add_round_summary(journal_entry.entry)
+                continue
+            self.state.add_conversation_entry(journal_entry.entry, is_error=journal_entry.is_error)
+            participant = self.participants.get(journal_entry.participant_key or "")
+            if participant:
+                participant.round_count = max(participant.round_count, journal_entry.entry.round_number)
+                if not journal_entry.is_error:
+                    participant.total_statements += 1
+        self.state.total_tokens_this_meeting = snapshot.total_tokens
+        self.state.cached_tokens_this_meeting = snapshot.cached_tokens
+        logger.info(
+            f"ジャーナルから復元: 発言{len(snapshot.entries)}件, 完了ラウンド{snapshot.completed_rounds}, "
+            f"最終要約{'あり' if snapshot.final_summary is not None else 'なし'}"
+        )
+
+    def _statement_delta_callback(self, speaker: ParticipantInfo) -> Optional[Callable[[str], None]]:
+        """発言者の断片を on_statement_delta に渡すコールバックを返す（未設定なら None）"""
+        if not self.on_statement_delta:
+            return None
+        return functools.partial(self.on_statement_delta, speaker.internal_key, speaker.name)
+
+    async def _request_completion(
+        self, client: BaseAIClient, on_delta: Optional[Callable[[str], None]] = None, **request_kwargs
+    ) -> Any:
+        """on_delta があり、ストリーミングが有効な場合はストリーミングで応答を生成する"""
+        if on_delta and self.app_config.streaming_enabled:
+            return await client.request_completion_stream(on_delta=on_delta, **request_kwargs)
+        return await client.request_completion(**request_kwargs)
+
+    def _task_client(self, task: AuxiliaryTask) -> Optional[BaseAIClient]:
+        """補助タスクに割り当てられたクライアントを返す（初回のみ作成）。割り当てがなければ None"""
+        if task not in self._task_clients:
+            self._task_clients[task] = ClientFactory.create_task_client(task)
+        return self._task_clients[task]
+
     def _report_error(self, error_message: str, exc_info: bool = False):
         logger.error(error_message, exc_info=exc_info)
         self.state.error_message = error_message
@@ -141,17 +329,43 @@ class MeetingManager:
             self._report_error(f"参加者初期化プロセス全体で予期せぬエラー: {e}", exc_info=True)
             return False
 
-    async def _enhance_personas(self, topic: str, document_summary: Optional[DocumentSummary]):
-        """OpenAIを用いて参加者および司会者のペルソナを強化する。"""
-        api_key = self.config_manager.config.openai_api_key
-        if not api_key:
+    def _persona_cache(self) -> Optional[ResponseCache]:
+        """強化ペルソナのキャッシュ（無効な場合と、記録を欠かさないようカセットを使う場合は None）"""
+        if not self.app_config.persona_cache_enabled or self.app_config.cassette_mode != "off":
+            return None
+        try:
+            return get_response_cache(
+                self.app_config.persona_cache_path,
+                max_entries=self.app_config.persona_cache_max_entries,
+                ttl_seconds=self.app_config.persona_cache_ttl_seconds,
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"ペルソナのキャッシュを開けないため、キャッシュせずに続行します: {e}")
+            return None
+
+    def _persona_client(self) -> Optional[BaseAIClient]:
+        """ペルソナ強化に使うクライアント（割り当てがなければ OpenAI の既定モデル。作成できない場合は None）"""
+        routed_client = self._task_client(AuxiliaryTask.PERSONA_ENHANCE)
+        if routed_client is not None:
+            return routed_client
+        if not self.config_manager.config.openai_api_key and self.app_config.cassette_mode != "replay":
             logger.info("OpenAI APIキーが未設定のため、ペルソナ強化をスキップします。")
-            return
+            return None
         try:
-            enhancer = PersonaEnhancer(api_key=api_key)
+            return ClientFactory.create_client(ModelInfo(
+                name=DEFAULT_PERSONA_MODEL, provider=AIProvider.OPENAI, max_tokens=PERSONA_MAX_TOKENS,
+            ))
         except Exception as e:
-            logger.warning(f"PersonaEnhancerの初期化に失敗: {e}")
-            return
+            logger.info(f"ペルソナ強化用のクライアントを作成できないため、ペルソナ強化をスキップします: {e}")
+            return None
+
+    async def _enhance_personas(self, topic: str, document_summary: Optional[DocumentSummary]):
+        """参加者および司会者のペルソナを強化する（保存済みの強化ペルソナがあれば再利用する）。"""
+        routed_model = self.app_config.task_model_routing.get(AuxiliaryTask.PERSONA_ENHANCE)
+        persona_model = (
+            f"{routed_model.provider.value}:{routed_model.name}" if routed_model
+            else f"{AIProvider.OPENAI.value}:{DEFAULT_PERSONA_MODEL}"
+        )
         document_context = (
             document_summary.summary
             if document_summary and document_summary.summary
@@ -160,22 +374,39 @@ class MeetingManager:
         targets: List[ParticipantInfo] = list(self.participants.values())
         if self.moderator:
             targets.append(self.moderator)
-        tasks = [
-            asyncio.to_thread(
-                enhancer.enhance_persona,
-                participant.persona,
-                topic,
-                document_context,
-            )
-            for participant in targets
-        ]
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        for participant, result in zip(targets, results):
-            if isinstance(result, Exception):
-                logger.warning(f"{participant.name}のペルソナ強化に失敗: {result}")
-            elif result:
-                participant.persona = result.strip()
+        persona_cache = self._persona_cache()
+        pending: List[Tuple[ParticipantInfo, str]] = []
+        for participant in targets:
+            cache_key = persona_cache_key(persona_model, participant.persona, topic, document_context)
+            cached = persona_cache.get(cache_key) if persona_cache else None
+            if cached and cached.get("persona"):
+                participant.persona = cached["persona"]
+            else:
+                pending.append((participant, cache_key))
+        if not pending:
+            logger.info(f"全員({len(targets)}名)の強化ペルソナを再利用したため、ペルソナ強化をスキップします。")
+            return
+
+        client = self._persona_client()
+        if client is None:
+            return
+        self._update_phase("enhancing_personas")
+        enhancer = PersonaEnhancer(client, batched=self.app_config.persona_enhancement_batched)
+        try:
+            results = await enhancer.enhance_personas(
+                [participant.persona for participant, _ in pending], topic, document_context
+            )
+        except Exception as e:
+            logger.warning(f"ペルソナ強化に失敗: {e}")
+            return
+        for (participant, cache_key), result in zip(pending, results):
+            if not result:
+                continue
+            # 失敗時は基本ペルソナがそのまま返るため、変化したものだけを保存する
+            if persona_cache and result.strip() != participant.persona.strip():
+                persona_cache.put(cache_key, client.model_info.provider, client.model_info.name, {"persona": result.strip()})
+            participant.persona = result.strip()
 
     async def _ensure_japanese_output(
         self,
@@ -187,25 +418,20 @@ class MeetingManager:
         if not text_to_check.strip():
             return text_to_check, 0
 
-        non_japanese_char_threshold = 0.3
-        min_japanese_char_ratio = 0.6
-        ascii_chars = len(re.findall(r'[ -~]', text_to_check))
-        total_chars = len(text_to_check)
-        # より正確な日本語文字の判定 (ひらがな、カタカナ、漢字の範囲)
-        japanese_chars = len(re.findall(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF々]', text_to_check))
-
-
-        needs_correction = False
-        if total_chars > 0:
-            # 非日本語文字(ASCII)が多すぎるか、または日本語文字が少なすぎる場合
-            # (ただし、URLやコード片などASCIIが多い正当なケースもあるため、この判定は完璧ではない)
-            if (ascii_chars / total_chars) > non_japanese_char_threshold and japanese_chars < (total_chars * (1-non_japanese_char_threshold) * 0.8): # ASCIIが多くても日本語もそれなりにあればOKとする閾値
-                needs_correction = True
-                logger.info(f"日本語修正候補 (ASCII比率高/日本語比率低): 「{text_to_check[:100]}...」")
-            elif (japanese_chars / total_chars) < min_japanese_char_ratio and total_chars > 20: # ある程度長さがあり日本語比率が低い
-                needs_correction = True
-                logger.info(f"日本語修正候補 (日本語比率低): 「{text_to_check[:100]}...」")
+        # URL・コードを除いて文ごとに判定する（LLMは呼ばない）
+        detection = detect_japanese(text_to_check)
+        needs_correction = detection.needs_correction
+        if needs_correction:
+            for sentence in detection.flagged_sentences:
+                logger.info(f"日本語修正候補 ({sentence.reason}): 「{sentence.text.strip()[:100]}」")
+            correction_client = self._task_client(AuxiliaryTask.CORRECTION)
+            if correction_client is not None:
+                client, original_provider = correction_client, correction_client.model_info.provider
 
+        if needs_correction and self.app_config.japanese_correction_mode == "span":
+            span_result = await self._correct_japanese_spans(text_to_check, detection, client, original_provider)
+            if span_result is not None:
+                return span_result
 
         if needs_correction:
             logger.warning(f"発言内容に日本語以外の言語が混じっている可能性があるため、修正を試みます。元テキスト: 「{text_to_check[:100]}...」")
@@ -213,7 +439,8 @@ class MeetingManager:
             try:
                 correction_response = await client.request_completion(
                     user_message=correction_prompt,
-                    system_message="あなたは高度な翻訳・校正AIです。指示されたテキストを完璧な日本語にしてください。"
+                    system_message="あなたは高度な翻訳・校正AIです。指示されたテキストを完璧な日本語にしてください。",
+                    override_temperature=AUXILIARY_TASK_TEMPERATURE,
                 )
                 corrected_text, tokens_for_correction = extract_content_and_tokens(
                     original_provider, correction_response
@@ -230,17 +457,93 @@ class MeetingManager:
                 return text_to_check, 0
         return text_to_check, 0
 
+    async def _correct_japanese_spans(
+        self,
+        text_to_check: str,
+        detection: JapaneseDetectionResult,
+        client: BaseAIClient,
+        original_provider: AIProvider,
+    ) -> Optional[Tuple[str, int]]:
+        """日本語でないと判定された文だけを修正して差し戻す。
+
+        全文修正に切り替えるべき場合（対象が多い・回答を解析できない・エラー）は None を返す。
+        """
+        flagged = detection.flagged_sentences
+        ratio = span_correction_ratio(text_to_check, flagged)
+        if ratio > SPAN_CORRECTION_MAX_RATIO:
+            logger.info(f"修正対象の文がテキストの{ratio:.0%}を占めるため、全文修正を行います。")
+            return None
+
+        logger.warning(f"日本語以外の言語が混じった{len(flagged)}文のみを修正します。")
+        try:
+            correction_response = await client.request_completion(
+                user_message=build_span_correction_prompt(text_to_check, flagged),
+                system_message=SPAN_CORRECTION_SYSTEM_MESSAGE,
+                override_temperature=AUXILIARY_TASK_TEMPERATURE,
+            )
+            response_text, tokens_for_correction = extract_content_and_tokens(
+                original_provider, correction_response
+            )
+        except Exception as e:
+            logger.error(f"文単位の日本語修正中にエラーが発生: {e}。全文修正を試みます。", exc_info=True)
+            return None
+
+        # 文単位の呼び出しに使ったトークンは、全文修正に切り替える場合も計上する
+        self.state.add_tokens_used(tokens_for_correction)
+        corrections = parse_span_corrections(response_text, len(flagged))
+        if corrections is None:
+            logger.warning(f"文単位の修正結果を解析できませんでした。全文修正を試みます。応答: 「{response_text[:100]}」")
+            return None
+
+        corrected_text = splice_corrections(text_to_check, flagged, corrections)
+        logger.info(f"文単位の日本語修正成功 ({len(flagged)}文, 追加トークン: {tokens_for_correction})")
+        return corrected_text, tokens_for_correction
+
     async def run_meeting(
         self, settings: MeetingSettings,
         progress_callback: Optional[Callable[[str, int, int], None]] = None
     ) -> MeetingResult:
-        start_time = datetime.now()
         self.progress_callback_internal = progress_callback
+        self._open_journal(settings)
+        try:
+            return await self._run_meeting_phases(settings)
+        finally:
+            self._close_journal()
+
+    async def resume_meeting(
+        self, journal_path: str,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> MeetingResult:
+        """
+        ジャーナルから中断した会議を再開する
+
+        記録済みの資料要約・ペルソナ・発言・最終要約は再利用し、
+        最後に確定した発言の続きから会議を進めます。以降の進行は同じジャーナルに追記されます。
+        """
+        self.progress_callback_internal = progress_callback
+        snapshot = load_journal(journal_path)
+        if self.carry_over_context is None:
+            self.carry_over_context = snapshot.carry_over_context
+        self.journal = MeetingJournal(journal_path)
+        self.journal_path = str(self.journal.path)
+        try:
+            self._journal_record(RECORD_MEETING_RESUMED, resumed_from_phase=snapshot.last_phase)
+            return await self._run_meeting_phases(snapshot.settings, snapshot)
+        finally:
+            self._close_journal()
+
+    async def _run_meeting_phases(
+        self, settings: MeetingSettings, resume_from: Optional[JournalSnapshot] = None
+    ) -> MeetingResult:
+        start_time = datetime.now()
         document_summary_obj = None
 
         try:
             with Timer("会議全体"):
-                if not self.initialize_participants(settings):
+                self._meeting_started_at = time.perf_counter()
+                try:
+                    document_summary_obj = await self._prepare_meeting(settings, resume_from)
+                except _MeetingStartError:
                     return MeetingResult(
                         settings=copy.deepcopy(settings), conversation_log=self.state.conversation_history.copy(),
                         final_summary=f"会議を開始できませんでした: {self.state.error_message or '参加者初期化エラー'}",
@@ -248,17 +551,26 @@ class MeetingManager:
                         total_tokens_used=self.state.total_tokens_this_meeting,
                         document_summary=None, participants_count=len(self.participants)
                     )
-                if settings.document_path:
-                    self._update_phase("processing_document")
-                    document_summary_obj = await self._process_document(settings.document_path)
-                self._update_phase("enhancing_personas")
-                await self._enhance_personas(settings.user_query, document_summary_obj)
 
                 self._update_phase("discussing")
-                await self._conduct_meeting(settings, document_summary_obj)
+                completed_rounds = 0
+                if resume_from:
+                    completed_rounds = (
+                        settings.rounds_per_ai if resume_from.converged_at_round else resume_from.completed_rounds
+                    )
+                    self.state.converged_at_round = resume_from.converged_at_round
+                await self._conduct_meeting(settings, document_summary_obj, completed_rounds=completed_rounds)
+                document_summary_obj = await self._finish_document_summary(document_summary_obj)
 
-                self._update_phase("summarizing")
-                final_summary_text = await self._generate_final_summary(settings.user_query, document_summary_obj)
+                if resume_from and resume_from.final_summary is not None:
+                    final_summary_text = resume_from.final_summary
+                else:
+                    self._update_phase("summarizing")
+                    error_before_summary = self.state.error_message
+                    final_summary_text = await self._generate_final_summary(settings.user_query, document_summary_obj)
+                    # 生成に失敗した場合は記録せず、再開時に再生成する
+                    if self.state.error_message == error_before_summary:
+                        self._journal_record(RECORD_FINAL_SUMMARY, content=final_summary_text)
 
                 self._update_phase("completed")
                 duration = (datetime.now() - start_time).total_seconds()
@@ -270,7 +582,10 @@ class MeetingManager:
                     document_summary=document_summary_obj,
                     participants_count=len(self.participants)
                 )
-                logger.info(f"会議正常終了。所要時間: {format_duration(duration)}, 総トークン: {self.state.total_tokens_this_meeting}")
+                logger.info(
+                    f"会議正常終了。所要時間: {format_duration(duration)}, 総トークン: {self.state.total_tokens_this_meeting}"
+                    f" (うちキャッシュ済み入力: {self.state.cached_tokens_this_meeting})"
+                )
                 return meeting_result
         except Exception as e:
             self._report_error(f"会議実行中に致命的なエラーが発生: {e}", exc_info=True)
@@ -282,21 +597,201 @@ class MeetingManager:
                 document_summary=document_summary_obj,
                 participants_count=len(self.participants)
             )
+        finally:
+            if self._document_summary_task and not self._document_summary_task.done():
+                self._document_summary_task.cancel()
+            self._document_summary_task = None
+
+    async def _prepare_meeting(
+        self, settings: MeetingSettings, resume_from: Optional[JournalSnapshot] = None
+    ) -> Optional[DocumentSummary]:
+        """
+        会議開始前の処理を依存関係に沿って並行に実行し、資料要約を返す
+
+        資料の読み込み（保存済み要約の確認とテキスト抽出）・議題のRAG検索・参加者の初期化は互いに独立しているため
+        同時に進め、資料要約は資料と司会者が、ペルソナ強化は参加者と資料要約がそろってから行う。
+        progressive_document_summary の場合は資料要約を待たず、資料の抜粋を返して要約はバックグラウンドで進める。
+        参加者を初期化できない場合は _MeetingStartError を送出する。
+        """
+        self._topic_rag_context = None
+        graph = PhaseGraph(on_phase_finished=self._report_phase_timing)
+        process_document = bool(settings.document_path) and not (resume_from and resume_from.document_processed)
+        progressive = process_document and self.app_config.progressive_document_summary
+        document_phase = "digesting_document" if progressive else "processing_document"
+        process_and_record = self._digest_and_summarize_document if progressive else self._process_and_record_document
+        # スレッドで実行する処理を先に登録し、参加者の初期化（同期処理）と重ねる
+        if process_document:
+            graph.add("loading_document", lambda: asyncio.to_thread(
+                self._load_document, settings.document_path, settings.moderator_model
+            ))
+        if self.vector_store_manager:
+            graph.add("retrieving_context", lambda: asyncio.to_thread(self._get_rag_context, settings.user_query))
+        graph.add("initializing_participants", lambda: self._initialize_for_meeting(settings, resume_from))
+        if process_document:
+            graph.add(
+                document_phase,
+                lambda: process_and_record(settings.document_path, graph.results["loading_document"]),
+                depends_on=("loading_document", "initializing_participants"),
+            )
+        if not (resume_from and resume_from.personas_enhanced):
+            graph.add(
+                "enhancing_personas",
+                lambda: self._enhance_and_record_personas(settings.user_query, graph.results.get(
+                    document_phase, resume_from.document_summary if resume_from else None
+                )),
+                depends_on=("initializing_participants", document_phase) if process_document
+                else ("initializing_participants",),
+            )
+
+        results = await graph.run()
+        self.state.phase_timings.update(graph.timings)
+        if "retrieving_context" in results:
+            self._topic_rag_context = (settings.user_query, results["retrieving_context"])
+        if process_document:
+            return results[document_phase]
+        return resume_from.document_summary if resume_from else None
+
+    async def _initialize_for_meeting(
+        self, settings: MeetingSettings, resume_from: Optional[JournalSnapshot]
+    ) -> None:
+        if not self.initialize_participants(settings):
+            raise _MeetingStartError(self.state.error_message or "参加者初期化エラー")
+        if resume_from:
+            self._restore_from_journal(resume_from)
+
+    async def _process_and_record_document(
+        self, document_path: str, loaded: Union[DocumentSummary, ExtractionResult], background: bool = False
+    ) -> Optional[DocumentSummary]:
+        document_summary = await self._process_document(document_path, loaded, background=background)
+        if document_summary:
+            self._journal_record(RECORD_DOCUMENT_SUMMARY, summary=document_summary.model_dump(mode="json"))
+        return document_summary
+
+    async def _digest_and_summarize_document(
+        self, document_path: str, loaded: Union[DocumentSummary, ExtractionResult]
+    ) -> Optional[DocumentSummary]:
+        """資料の抜粋を返し、要約はバックグラウンドで始める（保存済みの要約があればそれを返す）"""
+        if isinstance(loaded, DocumentSummary) or not loaded.is_success or not loaded.extracted_text:
+            return await self._process_and_record_document(document_path, loaded)
+        digest = build_extractive_digest(loaded.extracted_text, self.app_config.summarization_target_tokens * 2)
+        logger.info(f"資料の抜粋で議論を始め、要約はバックグラウンドで進めます ({len(digest)}文字)")
+        self._document_summary_task = asyncio.create_task(self._summarize_in_background(document_path, loaded))
+        return DocumentSummary(
+            original_length=len(loaded.extracted_text), summary=digest,
+            compression_ratio=len(digest) / len(loaded.extracted_text), tokens_used=0,
+        )
+
+    async def _summarize_in_background(
+        self, document_path: str, loaded: ExtractionResult
+    ) -> Optional[DocumentSummary]:
+        started = time.perf_counter()
+        document_summary = await self._process_and_record_document(document_path, loaded, background=True)
+        elapsed = time.perf_counter() - started
+        self.state.phase_timings["processing_document"] = elapsed
+        self._report_phase_timing("processing_document", elapsed)
+        return document_summary
+
+    def _swap_in_document_summary(self, user_query: str, round_number: int) -> None:
+        """バックグラウンドの資料要約が終わっていれば、抜粋と差し替えてシステムプロンプトの文脈を作り直す"""
+        task = self._document_summary_task
+        if not task or not task.done() or self.state.document_summary_swapped_at_round is not None:
+            return
+        document_summary = None if task.cancelled() or task.exception() else task.result()
+        if not document_summary or not document_summary.summary:
+            return
+        self._system_prompt_context = self._build_initial_context(user_query, document_summary)
+        self.state.document_summary_swapped_at_round = round_number
+        logger.info(f"ラウンド{round_number}から資料の抜粋を要約に差し替えます")
+
+    async def _finish_document_summary(
+        self, document_summary: Optional[DocumentSummary]
+    ) -> Optional[DocumentSummary]:
+        """バックグラウンドの資料要約を待って返す（進めていない・失敗した場合は document_summary のまま）"""
+        task = self._document_summary_task
+        if not task:
+            return document_summary
+        if not task.done():
+            logger.info("最終要約の前に、資料要約の完了を待ちます")
+        full_summary = await task
+        return full_summary if full_summary and full_summary.summary else document_summary
+
+    async def _enhance_and_record_personas(self, topic: str, document_summary: Optional[DocumentSummary]) -> None:
+        await self._enhance_personas(topic, document_summary)
+        self._journal_record(
+            RECORD_PERSONAS,
+            participants={key: p.persona for key, p in self.participants.items()},
+            moderator=self.moderator.persona if self.moderator else None,
+        )
 
-    async def _process_document(self, document_path: str) -> Optional[DocumentSummary]:
+    def _document_summary_cache(
+        self, document_path: str, moderator_model: ModelInfo
+    ) -> Tuple[Optional[DocumentSummaryCache], str]:
+        """資料要約のキャッシュとキー（キャッシュを使わない場合は (None, "")）。要約は司会者のモデルで行う"""
+        if not self.app_config.document_summary_cache_enabled:
+            return None, ""
+        file_hash = generate_file_hash(document_path)
+        if not file_hash:
+            return None, ""
+        key = summary_cache_key(
+            file_hash,
+            moderator_model,
+            self.app_config.summarization_target_tokens,
+            SUMMARY_PROMPT_VERSION,
+            chunk_summarizer=self.app_config.task_model_routing.get(AuxiliaryTask.DOC_CHUNK_SUMMARY),
+        )
+        store_path = self.vector_store_manager.persist_path if self.vector_store_manager else None
+        return DocumentSummaryCache(store_path or str(Path(self.document_store_dir) / file_hash)), key
+
+    def _load_document(
+        self, document_path: str, moderator_model: ModelInfo
+    ) -> Union[DocumentSummary, ExtractionResult]:
+        """保存済みの資料要約があればそれを、なければ資料から抽出したテキストを返す（スレッドから呼んでよい）"""
+        summary_cache, cache_key = self._document_summary_cache(document_path, moderator_model)
+        if summary_cache:
+            cached_summary = summary_cache.load(cache_key)
+            if cached_summary:
+                # この会議では要約にトークンを使っていない
+                return cached_summary.model_copy(update={"tokens_used": 0})
+        return self.document_processor.extract_text(document_path)
+
+    def _report_document_error(self, message: str, background: bool, exc_info: bool = False) -> None:
+        """資料処理のエラーを報告する（議論と並行した要約では会議のエラーにせず、抜粋のまま続ける）"""
+        if background:
+            logger.warning(f"{message}（資料の抜粋のまま会議を続けます）", exc_info=exc_info)
+        else:
+            self._report_error(message, exc_info=exc_info)
+
+    async def _process_document(
+        self, document_path: str, loaded: Optional[Union[DocumentSummary, ExtractionResult]] = None,
+        background: bool = False,
+    ) -> Optional[DocumentSummary]:
+        """
+        資料を要約する（loaded は _load_document の結果。省略時はここで読み込む）
+
+        background が真の場合（議論と並行した要約）は会議のフェーズを変えず、失敗してもエラーを報告しない。
+        """
         try:
-            extraction_result = self.document_processor.extract_text(document_path)
-            if not extraction_result.is_success or not extraction_result.extracted_text:
-                self._report_error(f"資料からのテキスト抽出失敗: {extraction_result.error_message or '不明なエラー'}")
-                return None
             if not self.moderator:
                 logger.warning("司会者が未設定のため、資料要約をスキップ。")
                 return None
+            if loaded is None:
+                loaded = await asyncio.to_thread(self._load_document, document_path, self.moderator.model_info)
+            if isinstance(loaded, DocumentSummary):
+                return loaded
+            extraction_result = loaded
+            if not extraction_result.is_success or not extraction_result.extracted_text:
+                self._report_document_error(
+                    f"資料からのテキスト抽出失敗: {extraction_result.error_message or '不明なエラー'}", background
+                )
+                return None
 
+            if not background:
+                self._update_phase("processing_document")
             logger.info(f"資料テキスト抽出成功 ({len(extraction_result.extracted_text)}文字)。要約開始...")
 
             summary_obj = await self.document_processor.summarize_document_for_meeting(
-                extraction_result.extracted_text, self.moderator.client
+                extraction_result.extracted_text, self.moderator.client,
+                chunk_summarizer_ai_client=self._task_client(AuxiliaryTask.DOC_CHUNK_SUMMARY),
             )
 
             if summary_obj and summary_obj.summary:
@@ -311,75 +806,198 @@ class MeetingManager:
                      logger.info(f"資料要約の日本語修正に追加トークン: {correction_tokens_summary}")
 
 
+            summary_cache, cache_key = self._document_summary_cache(document_path, self.moderator.model_info)
+            if summary_cache and summary_obj and summary_obj.summary:
+                summary_cache.store(cache_key, summary_obj)
+
             if summary_obj and summary_obj.tokens_used >= 0 :
                 self.state.add_tokens_used(summary_obj.tokens_used)
                 logger.info(f"資料要約成功。要約長: {len(summary_obj.summary)}文字, 初期トークン: {summary_obj.tokens_used}")
             elif summary_obj:
                  logger.warning("資料要約は成功しましたが、初期トークン数が記録されていません。")
             else:
-                self._report_error("資料要約失敗。DocumentProcessorがNoneを返しました。")
+                self._report_document_error("資料要約失敗。DocumentProcessorがNoneを返しました。", background)
                 return None
             return summary_obj
         except RuntimeError as e:
-            self._report_error(f"資料要約処理中にエラー: {e}", exc_info=True)
+            self._report_document_error(f"資料要約処理中にエラー: {e}", background, exc_info=True)
             return None
         except Exception as e:
-            self._report_error(f"資料処理中に予期せぬエラー: {e}", exc_info=True)
+            self._report_document_error(f"資料処理中に予期せぬエラー: {e}", background, exc_info=True)
             return None
 
     async def _conduct_meeting(
-        self, settings: MeetingSettings, document_summary: Optional[DocumentSummary]
+        self, settings: MeetingSettings, document_summary: Optional[DocumentSummary],
+        completed_rounds: int = 0,
     ):
+        """議論ラウンドを進める。
+
+        completed_rounds はジャーナルから再開する場合の完了済みラウンド数。
+        再開したラウンドでは、そのラウンドの発言が確定済みの参加者は発言しない。
+        early_stop_enabled の場合、ラウンドの発言の新規性が閾値を下回ったら
+        そのラウンドの要約と残りのラウンドを省略する。
+        """
         self._system_prompt_context = self._build_initial_context(settings.user_query, document_summary)
         participant_internal_keys = list(self.participants.keys())
-        current_overall_statement_num = 0
-        for i in range(settings.rounds_per_ai):
+        current_overall_statement_num = sum(p.round_count for p in self.participants.values())
+        convergence_tracker = self._create_convergence_tracker(completed_rounds)
+        for i in range(completed_rounds, settings.rounds_per_ai):
             current_round_label = i + 1
+            self._swap_in_document_summary(settings.user_query, current_round_label)
             logger.info(f"議論ラウンド {current_round_label}/{settings.rounds_per_ai} を開始。")
             if self.progress_callback_internal:
                 self.progress_callback_internal("discussing_round", current_round_label, settings.rounds_per_ai)
-            random.shuffle(participant_internal_keys)
-            for p_key in participant_internal_keys:
-                participant = self.participants[p_key]
-                if participant.round_count < settings.rounds_per_ai:
-                    current_overall_statement_num +=1
-                    if self.progress_callback_internal:
-                         self.progress_callback_internal("discussing_statement", current_overall_statement_num, self.state.total_rounds_expected)
-                    participant.round_count += 1
-                    logger.info(f"  参加者 {participant.name} (キー: {p_key}) の発言 (AI別R{participant.round_count}, 全体{current_overall_statement_num}/{self.state.total_rounds_expected})")
-                    await self._make_participant_statement(
-                        participant, participant.round_count
-                    )
-                    await asyncio.sleep(self.app_config.api_call_delay_seconds)
+            self._rng.shuffle(participant_internal_keys)
+            if self.app_config.parallel_rounds:
+                current_overall_statement_num = await self._conduct_parallel_round(
+                    participant_internal_keys, current_round_label, current_overall_statement_num
+                )
+            else:
+                for p_key in participant_internal_keys:
+                    participant = self.participants[p_key]
+                    if participant.round_count < current_round_label:
+                        current_overall_statement_num +=1
+                        if self.progress_callback_internal:
+                             self.progress_callback_internal("discussing_statement", current_overall_statement_num, self.state.total_rounds_expected)
+                        participant.round_count += 1
+                        logger.info(f"  参加者 {participant.name} (キー: {p_key}) の発言 (AI別R{participant.round_count}, 全体{current_overall_statement_num}/{self.state.total_rounds_expected})")
+                        await self._make_participant_statement(
+                            participant, participant.round_count
+                        )
+            if convergence_tracker and self._discussion_converged(
+                convergence_tracker, current_round_label, settings.rounds_per_ai
+            ):
+                break
             # ラウンド終了後に司会AIによる簡潔な要約を挿入
             if self.moderator:
                 if self.progress_callback_internal:
                     self.progress_callback_internal("moderator_summary", current_round_label, settings.rounds_per_ai)
                 await self._generate_round_summary(current_round_label)
-                await asyncio.sleep(self.app_config.api_call_delay_seconds)
+            self._journal_record(RECORD_ROUND_COMPLETED, round=current_round_label)
         logger.info("全議論ラウンド完了。")
 
+    def _round_statement_texts(self, round_number: int, up_to: bool = False) -> List[str]:
+        """確定済みの参加者発言（エラー・司会要約を除く）のうち、指定ラウンドのものを返す"""
+        ledger = self.state.ledger
+        texts = []
+        for index in range(len(ledger)):
+            record = ledger[index]
+            if record.is_error or record.is_round_summary:
+                continue
+            entry_round = record.entry.round_number
+            if entry_round == round_number or (up_to and entry_round < round_number):
+                texts.append(record.entry.content)
+        return texts
+
+    def _create_convergence_tracker(self, completed_rounds: int) -> Optional[ConvergenceTracker]:
+        if not self.app_config.early_stop_enabled:
+            return None
+        tracker = ConvergenceTracker(
+            threshold=self.app_config.early_stop_novelty_threshold,
+            min_rounds=self.app_config.early_stop_min_rounds,
+            patience=self.app_config.early_stop_patience,
+        )
+        if completed_rounds:
+            # 再開時は完了済みラウンドの発言を比較対象として取り込む
+            tracker.seed(self._round_statement_texts(completed_rounds, up_to=True))
+        return tracker
+
+    def _discussion_converged(
+        self, tracker: ConvergenceTracker, round_number: int, rounds_per_ai: int
+    ) -> bool:
+        """ラウンドの新規性を記録し、収束していれば残りのラウンドを省略する旨を記録する"""
+        round_novelty = tracker.observe_round(self._round_statement_texts(round_number))
+        if round_novelty is None:
+            return False
+        logger.info(f"ラウンド{round_number}の新規性: {round_novelty:.2f} (閾値 {tracker.threshold:.2f})")
+        if round_number >= rounds_per_ai or not tracker.has_converged(round_number):
+            return False
+        logger.info(
+            f"議論が収束したため、ラウンド{round_number}で議論を終了し最終要約に進みます"
+            f"（省略したラウンド: {rounds_per_ai - round_number}）。"
+        )
+        self.state.converged_at_round = round_number
+        self._journal_record(RECORD_DISCUSSION_CONVERGED, round=round_number, novelty=round_novelty)
+        if self.progress_callback_internal:
+            self.progress_callback_internal("discussion_converged", round_number, rounds_per_ai)
+        return True
+
+    async def _conduct_parallel_round(
+        self, ordered_keys: List[str], round_number: int, statement_num_before: int
+    ) -> int:
+        """ラウンド内の全参加者の発言を並行生成し、ordered_keys の順で会話ログに確定する。
+
+        各参加者はラウンド開始時点の会話履歴を参照する（生成中はログに追加しないため）。
+        戻り値は確定後の全体発言数。
+        """
+        speakers = [
+            self.participants[p_key] for p_key in ordered_keys
+            if self.participants[p_key].round_count < round_number
+        ]
+        if not speakers:
+            return statement_num_before
+        for participant in speakers:
+            participant.round_count += 1
+        logger.info(
+            f"  並行ラウンド: {len(speakers)}名の発言を同時に生成します "
+            f"({', '.join(p.name for p in speakers)})"
+        )
+        entries = await asyncio.gather(*[
+            self._generate_participant_entry(participant, participant.round_count)
+            for participant in speakers
+        ])
+        current_overall_statement_num = statement_num_before
+        for participant, (entry, is_error) in zip(speakers, entries):
+            current_overall_statement_num += 1
+            if self.progress_callback_internal:
+                self.progress_callback_internal("discussing_statement", current_overall_statement_num, self.state.total_rounds_expected)
+            self._commit_participant_entry(participant, entry, is_error)
+        return current_overall_statement_num
+
     async def _make_participant_statement(
         self, participant: ParticipantInfo, ai_specific_round_num: int
     ):
+        entry, is_error = await self._generate_participant_entry(participant, ai_specific_round_num)
+        self._commit_participant_entry(participant, entry, is_error)
+
+    async def _generate_participant_entry(
+        self, participant: ParticipantInfo, ai_specific_round_num: int
+    ) -> Tuple[ConversationEntry, bool]:
+        """参加者の発言を生成する（会話ログへの追加は行わない）。
+
+        エラー時は例外を送出せず、エラー内容を記したエントリを返す。
+        戻り値は (エントリ, エラーかどうか)。
+        """
         try:
             user_prompt_for_statement = self._build_statement_prompt(participant, ai_specific_round_num)
-            api_conversation_history = self._prepare_conversation_history_for_api(
-                limit=self.app_config.conversation_history_limit
-            )
             rag_context = self._get_rag_context(user_prompt_for_statement)
             system_message = self._build_system_prompt(participant, rag_context)
+            api_conversation_history = self._prepare_conversation_history_for_api(
+                limit=self.app_config.conversation_history_limit,
+                token_budget=self._history_token_budget(
+                    participant.model_info, system_message, user_prompt_for_statement
+                ),
+            )
             logger.debug(f"発言者: {participant.name}, AIラウンド: {ai_specific_round_num}, システムメッセージ: {system_message[:200]}...")
 
-            raw_response = await participant.client.request_completion(
+            raw_response = await self._request_completion(
+                participant.client,
+                on_delta=self._statement_delta_callback(participant),
                 user_message=user_prompt_for_statement,
                 conversation_history=api_conversation_history,
-                system_message=system_message
+                system_message=system_message,
+                cacheable_system_prefix=(
+                    self._system_prompt_context if self.app_config.prompt_cache_enabled else None
+                ),
             )
+            usage_details: Dict[str, int] = {}
             content, tokens_this_call = extract_content_and_tokens(
-                participant.model_info.provider, raw_response
+                participant.model_info.provider, raw_response, usage_details
             )
             self.state.add_tokens_used(tokens_this_call)
+            self.state.add_cached_tokens(usage_details.get("cached_tokens", 0))
+            if usage_details.get("cached_tokens"):
+                logger.debug(f"  {participant.name}: プロンプトキャッシュから{usage_details['cached_tokens']}トークンを再利用")
 
             corrected_content, correction_tokens = await self._ensure_japanese_output(
                 content,
@@ -391,58 +1009,78 @@ class MeetingManager:
                 )
             )
 
-            entry = ConversationEntry(
-                speaker=participant.name, persona=participant.persona, content=corrected_content,
-                timestamp=datetime.now(), round_number=ai_specific_round_num, model_name=participant.model_info.name
-            )
-            self.state.add_conversation_entry(entry)
-            participant.total_statements += 1
-            if self.on_statement_added:
-                try: self.on_statement_added(entry)
-                except Exception as e: logger.error(f"on_statement_added コールバック実行エラー: {e}", exc_info=True)
-
             total_tokens_for_statement = tokens_this_call + correction_tokens
             logger.info(f"  {participant.name} 発言成功 (AI別R{ai_specific_round_num}, 消費トークン: {total_tokens_for_statement} (初期{tokens_this_call}, 修正{correction_tokens}))")
+            return ConversationEntry(
+                speaker=participant.name, persona=participant.persona, content=corrected_content,
+                timestamp=datetime.now(), round_number=ai_specific_round_num, model_name=participant.model_info.name,
+                speaker_key=participant.internal_key,
+            ), False
 
         except Exception as e:
             self._report_error(f"{participant.name} (AI別R{ai_specific_round_num}) の発言中にエラー: {e}", exc_info=True)
-            error_entry = ConversationEntry(
+            return ConversationEntry(
                 speaker=participant.name, persona=participant.persona,
-                content=f"エラーにより発言できませんでした: {type(e).__name__}。詳細はログを確認してください。",
-                timestamp=datetime.now(), round_number=ai_specific_round_num, model_name=participant.model_info.name
-            )
-            self.state.add_conversation_entry(error_entry)
-            if self.on_statement_added: self.on_statement_added(error_entry)
+                content=f"{ERROR_STATEMENT_PREFIX}: {type(e).__name__}。詳細はログを確認してください。",
+                timestamp=datetime.now(), round_number=ai_specific_round_num, model_name=participant.model_info.name,
+                speaker_key=participant.internal_key,
+            ), True
+
+    def _commit_participant_entry(self, participant: ParticipantInfo, entry: ConversationEntry, is_error: bool = False):
+        """生成済みの発言を会話ログに追加し、UIへ通知する。"""
+        self.state.add_conversation_entry(entry, is_error=is_error)
+        self._journal_entry(entry, participant.internal_key, is_error=is_error)
+        if not is_error:
+            participant.total_statements += 1
+            if self.state.first_statement_seconds is None and self._meeting_started_at is not None:
+                self.state.first_statement_seconds = time.perf_counter() - self._meeting_started_at
+                logger.info(f"最初の発言までの時間: {self.state.first_statement_seconds:.2f}秒")
+        if self.on_statement_added:
+            try: self.on_statement_added(entry)
+            except Exception as e: logger.error(f"on_statement_added コールバック実行エラー: {e}", exc_info=True)
 
     async def _generate_round_summary(self, round_number: int):
         if not self.moderator:
             logger.warning("ラウンド要約生成: 司会者が未設定のためスキップします。")
             return
         try:
-            api_conversation_history = self._prepare_conversation_history_for_api(
-                limit=self.app_config.conversation_history_limit
-            )
-            user_prompt = (
-                f"これまでの議論の要点を日本語で150文字程度にまとめてください。\n"
-                f"これはラウンド{round_number}終了時点の要約です。"
-            )
+            if self.app_config.history_strategy == "rolling_summary":
+                user_prompt = (
+                    f"ラウンド{round_number}の発言で新たに出た論点を中心に、議論の要点を日本語で150文字程度にまとめてください。\n"
+                    f"この要約は以降のラウンドで過去の議論の記録として参照されます。"
+                )
+            else:
+                user_prompt = (
+                    f"これまでの議論の要点を日本語で150文字程度にまとめてください。\n"
+                    f"これはラウンド{round_number}終了時点の要約です。"
+                )
             system_message = (
                 "あなたは会議の司会者です。現在までの議論を簡潔に整理し、次のラウンドに備えます。"
             )
-            raw_response = await self.moderator.client.request_completion(
+            summary_client = self._task_client(AuxiliaryTask.ROUND_SUMMARY) or self.moderator.client
+            summary_model_info = summary_client.model_info
+            api_conversation_history = self._prepare_conversation_history_for_api(
+                limit=self.app_config.conversation_history_limit,
+                token_budget=self._history_token_budget(
+                    summary_model_info, system_message, user_prompt
+                ),
+            )
+            raw_response = await self._request_completion(
+                summary_client,
+                on_delta=self._statement_delta_callback(self.moderator),
                 user_message=user_prompt,
                 conversation_history=api_conversation_history,
                 system_message=system_message,
             )
             content, tokens_this_call = extract_content_and_tokens(
-                self.moderator.model_info.provider, raw_response
+                summary_model_info.provider, raw_response
             )
             self.state.add_tokens_used(tokens_this_call)
 
             corrected_content, correction_tokens = await self._ensure_japanese_output(
                 content,
-                self.moderator.client,
-                self.moderator.model_info.provider,
+                summary_client,
+                summary_model_info.provider,
                 context_for_correction="以下の要約を自然で流暢な日本語にしてください。その他の言語を含めないでください。",
             )
 
@@ -452,9 +1090,11 @@ class MeetingManager:
                 content=corrected_content,
                 timestamp=datetime.now(),
                 round_number=round_number,
-                model_name=self.moderator.model_info.name,
+                model_name=summary_model_info.name,
+                speaker_key=self.moderator.internal_key,
             )
-            self.state.add_conversation_entry(entry)
+            self.state.add_round_summary(entry)
+            self._journal_entry(entry, None, is_round_summary=True)
             if self.on_statement_added:
                 try:
                     self.on_statement_added(entry)
@@ -510,7 +1150,10 @@ class MeetingManager:
                 document_summary.summary,
                 "--- 資料要約 END ---",
             ])
-        rag_context = self._get_rag_context(user_query)
+        if self._topic_rag_context and self._topic_rag_context[0] == user_query:
+            rag_context = self._topic_rag_context[1]
+        else:
+            rag_context = self._get_rag_context(user_query)
         if rag_context:
             context_parts.extend([
                 "\nアップロード資料から抽出された関連情報:",
@@ -544,27 +1187,98 @@ class MeetingManager:
                  prompt_parts.insert(1, f"\n直近の議論のポイント(これも日本語です):\n{recent_points_summary}\n")
         return "\n".join(prompt_parts)
 
-    def _prepare_conversation_history_for_api(self, limit: int = 10) -> List[Dict[str, str]]:
-        actual_limit = limit if limit > 0 else self.app_config.conversation_history_limit
-        api_history = []
-        if actual_limit <= 0: return []
-
-        history_to_process = self.state.conversation_history
-        valid_entries = [e for e in history_to_process if "エラーにより発言できませんでした" not in e.content]
-        start_index = max(0, len(valid_entries) - actual_limit)
+    def _history_token_budget(self, model_info: ModelInfo, system_message: str, user_message: str) -> Optional[int]:
+        """会話履歴に使えるトークン数を返す（history_packing が token_budget 以外なら None）。
 
-        for entry in valid_entries[start_index:]:
-            api_history.append({
+        モデルのコンテキスト長から、生成上限(max_tokens)・構築済みのシステムプロンプト・
+        今回のユーザーメッセージ・安全マージンを差し引いた値。
+        """
+        if self.app_config.history_packing != "token_budget":
+            return None
+        context_window = self.config_manager.get_context_window_for_model(model_info.name)
+        prompt_tokens = count_tokens(system_message, model_info.name) + count_tokens(user_message, model_info.name)
+        budget = (
+            context_window - model_info.max_tokens - prompt_tokens
+            - self.app_config.history_token_budget_margin
+        )
+        logger.debug(
+            f"履歴トークン予算 ({model_info.name}): {budget} "
+            f"(コンテキスト{context_window}, 生成上限{model_info.max_tokens}, プロンプト{prompt_tokens})"
+        )
+        return max(0, budget)
+
+    def _prepare_conversation_history_for_api(
+        self, limit: int = 10, token_budget: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """AIに渡す会話履歴を作成する。
+
+        token_budget が指定された場合は件数ではなくトークン予算で、新しい発言から順に詰める。
+        """
+        if token_budget is None:
+            actual_limit = limit if limit > 0 else self.app_config.conversation_history_limit
+            if actual_limit <= 0: return []
+        else:
+            actual_limit = None
+            if token_budget <= 0: return []
+
+        if self.app_config.history_strategy == "rolling_summary":
+            return self._prepare_rolling_memory_history(actual_limit, token_budget)
+
+        if token_budget is None:
+            return [record.as_api_message() for record in self.state.ledger.recent_valid(actual_limit)]
+        return self._pack_records_within_budget(token_budget)
+
+    def _prepare_rolling_memory_history(
+        self, limit: Optional[int], token_budget: Optional[int] = None
+    ) -> List[Dict[str, str]]:
+        """司会のラウンド要約をまとめた記憶 + 現ラウンドの発言のみを履歴として返す。"""
+        api_history: List[Dict[str, str]] = []
+        round_summaries = self.state.ledger.round_summaries()
+        if round_summaries:
+            memory_lines = [
+                f"- ラウンド{record.entry.round_number}: {record.entry.content}"
+                for record in round_summaries
+            ]
+            memory_message = {
                 "role": "user",
-                "content": f"[スピーカー: {entry.speaker} (役割: {entry.persona}), ラウンド {entry.round_number}の発言]: {entry.content}"
-            })
+                "content": "[司会AIによるこれまでの議論の要約]\n" + "\n".join(memory_lines)
+            }
+            if token_budget is not None:
+                memory_tokens = count_tokens(memory_message["content"]) + HISTORY_MESSAGE_OVERHEAD_TOKENS
+                if memory_tokens > token_budget:
+                    logger.warning("ローリングメモリがトークン予算を超えるため、履歴に含めません。")
+                else:
+                    api_history.append(memory_message)
+                    token_budget -= memory_tokens
+            else:
+                api_history.append(memory_message)
+        if token_budget is None:
+            current_round_records = self.state.ledger.recent_valid(
+                limit, start=self.state.current_round_start_index
+            )
+            api_history.extend(record.as_api_message() for record in current_round_records)
+        else:
+            api_history.extend(
+                self._pack_records_within_budget(token_budget, start=self.state.current_round_start_index)
+            )
         return api_history
 
+    def _pack_records_within_budget(self, token_budget: int, start: int = 0) -> List[Dict[str, str]]:
+        records, truncated = self.state.ledger.newest_valid_within_budget(
+            token_budget,
+            start=start,
+            per_record_overhead=HISTORY_MESSAGE_OVERHEAD_TOKENS,
+            always_include_newest=False,
+        )
+        if truncated:
+            logger.debug(f"トークン予算({token_budget})により履歴を{len(records)}件に制限しました。")
+        return [record.as_api_message() for record in records]
+
     def _summarize_recent_discussion_points_for_prompt(self, count: int =3) -> str:
         if not self.state.conversation_history: return ""
         points = []
         for entry in self.state.conversation_history[-(count):]:
-            if "エラーにより発言できませんでした" not in entry.content:
+            if ERROR_STATEMENT_PREFIX not in entry.content:
                 content_summary = entry.content[:60].strip().replace('\n', ' ') # 改行をスペースに
                 points.append(f"- {entry.speaker} (役割: {entry.persona}) は「{content_summary}...」と述べました。")
         return "\n".join(points) if points else ""
@@ -597,7 +1311,9 @@ class MeetingManager:
             summary_timeout = self.app_config.api_timeout_seconds_summary
             logger.info(f"最終要約生成時のタイムアウト設定: {summary_timeout}秒")
 
-            raw_response = await self.moderator.client.request_completion(
+            raw_response = await self._request_completion(
+                self.moderator.client,
+                on_delta=self.on_summary_delta,
                 user_message=summary_user_prompt,
                 system_message=summary_system_prompt,
                 override_timeout=summary_timeout,
@@ -634,32 +1350,15 @@ class MeetingManager:
     def _format_conversation_for_summary(self) -> str:
         if not self.state.conversation_history: return "（会議中に発言はありませんでした）"
 
-        max_tokens = self.app_config.summary_conversation_log_max_tokens
-        current_tokens = 0
-        log_to_process = []
-
-        reversed_valid_entries = [
-            e for e in reversed(self.state.conversation_history)
-            if "エラーにより発言できませんでした" not in e.content
-        ]
-
-        if not reversed_valid_entries: return "（会議中に有効な発言はありませんでした）"
-
-        for entry in reversed_valid_entries:
-            # entry.content内の改行をMarkdownの改行（スペース2つ + \n）に置換
-            # バックスラッシュをf-stringの外で処理
-            content_for_markdown = entry.content.replace('\n', '  \n')
-            entry_text = f"- **ラウンド {entry.round_number}, {entry.speaker} (役割: {entry.persona}):**\n  {content_for_markdown}\n"
-            model_name = self.moderator.model_info.name if self.moderator else "gpt-3.5-turbo"
-            entry_tokens = count_tokens(entry_text, model_name)
-            if max_tokens > 0 and current_tokens + entry_tokens > max_tokens and log_to_process:
-                log_to_process.insert(0, "... (これより前の会話は、要約生成のトークン数制限のため省略されています) ...\n")
-                break
-            log_to_process.insert(0, entry_text)
-            current_tokens += entry_tokens
-
-        if not log_to_process: return "（会議中に有効な発言はありませんでした）"
+        # トークン数はレジャー追加時に計算済み（全モデルで同じエンコーディングで近似している）
+        records, truncated = self.state.ledger.newest_valid_within_budget(
+            self.app_config.summary_conversation_log_max_tokens, use_summary_form=True
+        )
+        if not records: return "（会議中に有効な発言はありませんでした）"
 
+        log_to_process = [record.summary_text for record in records]
+        if truncated:
+            log_to_process.insert(0, "... (これより前の会話は、要約生成のトークン数制限のため省略されています) ...\n")
         return "\n".join(log_to_process)
 
 
@@ -714,6 +1413,15 @@ class MeetingManager:
             "conversation_log_length": len(self.state.conversation_history),
             "current_phase": self.state.phase,
             "error_message": self.state.error_message,
+            "cached_tokens": self.state.cached_tokens_this_meeting,
+            "converged_at_round": self.state.converged_at_round,
+            "phase_timings": dict(self.state.phase_timings),
+            "time_to_first_statement_seconds": self.state.first_statement_seconds,
+            "document_summary_swapped_at_round": self.state.document_summary_swapped_at_round,
+            "http_pools": http_pool_stats(),
+            "cassette": cassette.stats() if (cassette := cassette_from_config(self.app_config)) else None,
+            "response_cache": cache.stats() if (cache := response_cache_from_config(self.app_config)) else None,
+            "persona_cache": persona_cache.stats() if (persona_cache := self._persona_cache()) else None,
         }
 
     def clear_meeting_state(self):
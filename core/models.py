@@ -1,4 +1,4 @@
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Dict
 from pydantic import BaseModel, Field, field_validator, ConfigDict, ValidationInfo
 from enum import Enum
 from datetime import datetime
@@ -9,6 +9,20 @@ class AIProvider(str, Enum):
     OPENAI = "openai"
     CLAUDE = "claude"
     GEMINI = "gemini"
+    LOCAL = "local"  # OpenAI 互換 API を提供するローカルサーバー（vLLM・Ollama・llama.cpp など）
+    FAKE = "fake"    # API を呼ばずに応答を生成する計測・テスト用のプロバイダー
+
+
+class AuxiliaryTask(str, Enum):
+    """補助的なAI呼び出しの種類（task_model_routing で実行モデルを切り替えられる）"""
+    CORRECTION = "correction"                # 日本語修正
+    ROUND_SUMMARY = "round_summary"          # ラウンドごとの司会要約
+    DOC_CHUNK_SUMMARY = "doc_chunk_summary"  # 長文資料のチャンク要約
+    PERSONA_ENHANCE = "persona_enhance"      # ペルソナ強化
+
+
+# 日本語修正・資料要約など、同じ入力には同じ結果を返すべき補助処理の temperature（応答キャッシュの対象になる）
+AUXILIARY_TASK_TEMPERATURE = 0.0
 
 
 class ModelInfo(BaseModel):
@@ -26,6 +40,48 @@ class ModelInfo(BaseModel):
         return str(v).strip()
 
 
+class ProviderRateLimit(BaseModel):
+    """プロバイダー・APIキーごとのレート上限（None は制限なし）"""
+    requests_per_minute: Optional[int] = Field(default=None, gt=0, description="1分あたりの最大リクエスト数 (RPM)")
+    tokens_per_minute: Optional[int] = Field(default=None, gt=0, description="1分あたりの最大トークン数 (TPM)。入力と生成上限の合計で見積もる")
+    min_interval_seconds: float = Field(default=0.0, ge=0.0, description="同じプロバイダー・APIキーへのリクエスト間の最小間隔（秒）")
+
+
+class FakeProviderSettings(BaseModel):
+    """fake プロバイダーの応答の遅延・長さ・言語・エラー発生率"""
+    latency_distribution: Literal["fixed", "uniform", "lognormal"] = Field(
+        default="lognormal", description="応答時間の分布"
+    )
+    latency_mean_seconds: float = Field(default=0.5, ge=0.0, description="応答時間の平均（秒）")
+    latency_spread: float = Field(
+        default=0.5, ge=0.0,
+        description="応答時間のばらつき。uniform は平均±この秒数、lognormal は対数の標準偏差",
+    )
+    first_token_fraction: float = Field(
+        default=0.2, ge=0.0, le=1.0, description="ストリーミング時、最初の断片を返すまでにかける応答時間の割合"
+    )
+    output_tokens_min: int = Field(default=80, ge=1, description="生成するトークン数の下限（max_tokens が小さい場合はそちらが上限）")
+    output_tokens_max: int = Field(default=300, ge=1, description="生成するトークン数の上限")
+    language: Literal["ja", "en", "mixed"] = Field(default="ja", description="応答の言語（mixed は英語の文を混ぜる）")
+    mixed_english_ratio: float = Field(default=0.3, ge=0.0, le=1.0, description="mixed のときに英語にする文の割合")
+    error_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="503 エラーを返す確率")
+    rate_limit_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="429 エラーを返す確率")
+    retry_after_seconds: Optional[float] = Field(default=1.0, ge=0.0, description="429 の Retry-After（None は付けない）")
+    requests_per_minute: Optional[int] = Field(
+        default=None, gt=0, description="同じAPIキーの1分あたりのリクエスト数がこれを超えると 429 を返す"
+    )
+    seed: Optional[int] = Field(default=None, description="乱数のシード（指定するとクライアントごとに同じ応答列になる）")
+
+
+def default_provider_rate_limits() -> Dict[AIProvider, ProviderRateLimit]:
+    """各プロバイダーの低い利用枠に合わせた既定のレート上限"""
+    return {
+        AIProvider.OPENAI: ProviderRateLimit(requests_per_minute=500),
+        AIProvider.CLAUDE: ProviderRateLimit(requests_per_minute=50),
+        AIProvider.GEMINI: ProviderRateLimit(requests_per_minute=60),
+    }
+
+
 class MeetingSettings(BaseModel):
     """会議の設定"""
     participant_models: List[ModelInfo] = Field(default_factory=list, description="参加AIモデル")
@@ -51,6 +107,9 @@ class ConversationEntry(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now, description="発言時刻")
     round_number: int = Field(default=1, description="発言ラウンド番号")
     model_name: str = Field(..., description="使用されたモデル名")
+    speaker_key: Optional[str] = Field(
+        default=None, description="発言者の内部キー（同じモデルの参加者が複数いても一意）"
+    )
 
 
 class DocumentSummary(BaseModel):
@@ -102,6 +161,19 @@ class AppConfig(BaseModel):
     openai_api_key: Optional[str] = Field(default=None, description="OpenAI APIキー")
     anthropic_api_key: Optional[str] = Field(default=None, description="Anthropic APIキー") # Claudeのキー名としてanthropic_api_keyが一般的
     google_api_key: Optional[str] = Field(default=None, description="Google APIキー") # Geminiのキー名としてgoogle_api_keyが一般的
+    local_base_url: Optional[str] = Field(
+        default=None,
+        description="ローカルの OpenAI 互換サーバーのベースURL（例: http://localhost:8000/v1）。設定すると local プロバイダーが使える",
+    )
+    local_api_key: Optional[str] = Field(default=None, description="ローカルサーバーのAPIキー（認証しないサーバーでは不要）")
+    local_models: List[str] = Field(
+        default_factory=list,
+        description="ローカルサーバーのモデル名。空の場合はサーバーの /models から取得する",
+    )
+    fake_provider_enabled: bool = Field(default=False, description="API を呼ばない fake プロバイダーを使えるようにする（計測・テスト用）")
+    fake_provider: FakeProviderSettings = Field(
+        default_factory=FakeProviderSettings, description="fake プロバイダーの応答の設定"
+    )
 
     # デフォルト設定
     default_temperature: float = Field(default=0.7, ge=0.0, le=2.0)
@@ -111,8 +183,119 @@ class AppConfig(BaseModel):
     # アプリケーション設定
     max_document_size_mb: int = Field(default=10, gt=0, description="アップロード可能なファイルサイズ上限(MB)")
     summarization_target_tokens: int = Field(default=500, gt=0, description="資料要約の目標トークン数 (DocumentProcessor用)")
+    document_summary_cache_enabled: bool = Field(
+        default=True, description="資料要約をベクトルストアと同じディレクトリに保存し、同じ資料・要約モデル・目標トークン数の会議で再利用する"
+    )
+    progressive_document_summary: bool = Field(
+        default=False,
+        description="資料の要約を待たずに、LLMを使わない抜粋とRAGコンテキストで議論を始め、要約が終わったらラウンドの区切りで差し替える",
+    )
     conversation_history_limit: int = Field(default=10, ge=0, description="AIに渡す会話履歴の最大件数")
-    api_call_delay_seconds: float = Field(default=1.0, ge=0.0, description="API呼び出し間の遅延秒数")
+    history_packing: Literal["count", "token_budget"] = Field(
+        default="count",
+        description="会話履歴の詰め方 (count: conversation_history_limit件まで, token_budget: モデルのコンテキスト長から算出した予算まで新しい順に詰める)"
+    )
+    history_token_budget_margin: int = Field(default=256, ge=0, description="token_budget時に残す安全マージン（トークン）")
+    history_strategy: Literal["recent", "rolling_summary"] = Field(
+        default="recent",
+        description="会話履歴の渡し方 (recent: 直近N件の発言, rolling_summary: 司会のラウンド要約 + 現ラウンドの発言)"
+    )
+    api_call_delay_seconds: float = Field(
+        default=0.0, ge=0.0,
+        description="同じプロバイダー・APIキーへのリクエスト間の最小間隔（秒）。rate_limits で個別に指定した場合はそちらを優先",
+    )
+    rate_limits: Dict[AIProvider, ProviderRateLimit] = Field(
+        default_factory=default_provider_rate_limits,
+        description="プロバイダーごとのRPM/TPM上限。同じプロバイダー・APIキーを使う全クライアントで共有される",
+    )
+    max_concurrent_requests: int = Field(
+        default=8, ge=1,
+        description="同じプロバイダー・APIキーに同時に送信するリクエスト数の上限。レート制限を受けると自動で絞り、成功が続くとこの値まで戻す",
+    )
+
+    # クライアントキャッシュ設定
+    client_cache_size: int = Field(
+        default=32, ge=0,
+        description="ClientFactory が再利用のために保持するクライアント数の上限（プロバイダー・モデル・temperature・max_tokens ごと）。0 でキャッシュしない",
+    )
+    client_prewarm_enabled: bool = Field(default=True, description="アプリ起動時に既定モデルと補助タスク用モデルのクライアントをバックグラウンドで作成しておく")
+
+    # HTTP接続プール設定（プロバイダー・APIキーごとにプロセス全体で共有）
+    http_max_connections: int = Field(default=100, ge=1, description="共有HTTPプールの最大接続数")
+    http_max_keepalive_connections: int = Field(default=20, ge=0, description="共有HTTPプールで保持する keep-alive 接続数の上限")
+    http_keepalive_expiry_seconds: float = Field(default=30.0, ge=0.0, description="使われていない keep-alive 接続を閉じるまでの秒数")
+    http2_enabled: bool = Field(default=False, description="HTTP/2 で接続する（h2 パッケージが必要。ない場合は HTTP/1.1）")
+
+    # リトライ・サーキットブレーカー設定
+    max_retries: int = Field(default=3, ge=0, description="タイムアウト・接続エラー・429・5xx のときのリトライ回数")
+    retry_base_delay_seconds: float = Field(default=1.0, gt=0.0, description="リトライ待ち時間の基準（秒）。試行ごとに倍にし、ジッターを加える")
+    retry_max_delay_seconds: float = Field(default=30.0, gt=0.0, description="リトライ待ち時間の上限（秒）。Retry-After の指定がある場合はそちらを優先")
+    circuit_breaker_failure_threshold: int = Field(default=5, ge=1, description="この回数続けて障害が起きたプロバイダーへの呼び出しを一時的に遮断する")
+    circuit_breaker_reset_seconds: float = Field(default=30.0, gt=0.0, description="遮断してから試験的な呼び出しを再開するまでの秒数")
+    cassette_mode: Literal["off", "record", "replay"] = Field(
+        default="off",
+        description="record: プロバイダーの応答をカセットに記録する / replay: カセットの応答を返し、プロバイダーを呼ばない",
+    )
+    cassette_path: Optional[str] = Field(default=None, description="カセットファイルのパス（.gz なら gzip 圧縮）")
+    cassette_replay_latency: Literal["original", "none"] = Field(
+        default="none", description="再生時に記録時の応答時間だけ待つ (original) か、すぐに返す (none) か"
+    )
+    persona_enhancement_batched: bool = Field(
+        default=True, description="全員のペルソナを1回の呼び出しでまとめて強化する（解析できなかった分だけ個別に強化し直す）"
+    )
+    persona_cache_enabled: bool = Field(default=True, description="強化したペルソナを保存し、同じ基本ペルソナ・議題・資料要約の会議で再利用する")
+    persona_cache_path: str = Field(default="cache/personas.sqlite3", description="強化ペルソナのキャッシュのデータベースファイルのパス")
+    persona_cache_max_entries: int = Field(default=1000, ge=1, description="強化ペルソナのキャッシュに保持するエントリ数の上限")
+    persona_cache_ttl_seconds: float = Field(default=30 * 24 * 3600, gt=0.0, description="強化ペルソナのキャッシュのエントリを使う期間（秒）")
+    response_cache_enabled: bool = Field(default=False, description="同じリクエストへの応答を SQLite に保存して再利用する")
+    response_cache_path: str = Field(default="cache/responses.sqlite3", description="応答キャッシュのデータベースファイルのパス")
+    response_cache_max_entries: int = Field(default=5000, ge=1, description="応答キャッシュに保持するエントリ数の上限（超えると最後に使われた時刻が古いものから削除）")
+    response_cache_max_mb: float = Field(default=100.0, gt=0.0, description="応答キャッシュに保持する応答の合計サイズの上限（MB）")
+    response_cache_ttl_seconds: float = Field(default=7 * 24 * 3600, gt=0.0, description="応答キャッシュのエントリを使う期間（秒）")
+    response_cache_max_temperature: float = Field(
+        default=0.0, ge=0.0, le=2.0,
+        description="この temperature 以下のリクエストだけをキャッシュする（既定は日本語修正・資料要約などの補助処理だけ）",
+    )
+    meeting_random_seed: Optional[int] = Field(
+        default=None, description="発言順のシャッフルに使う乱数のシード（指定すると会議の進行が再現できる）"
+    )
+    parallel_rounds: bool = Field(default=False, description="各ラウンドの参加者発言を並行生成する（ラウンド開始時点の履歴を参照）")
+
+    # プロンプトキャッシュ設定
+    prompt_cache_enabled: bool = Field(default=True, description="会議共通のシステムプロンプト（議題・資料要約など）をプロバイダーのプレフィックスキャッシュ対象として送る")
+    gemini_context_cache_enabled: bool = Field(default=False, description="Geminiのコンテキストキャッシュ(CachedContent)を作成して利用する（保存料金が発生）")
+    gemini_context_cache_ttl_seconds: int = Field(default=600, gt=0, description="Geminiコンテキストキャッシュの有効期間（秒）")
+    gemini_context_cache_min_tokens: int = Field(default=4096, gt=0, description="このトークン数未満のプレフィックスはGeminiでキャッシュしない")
+
+    # 補助タスクのモデル振り分け（未指定のタスクは従来どおり発言者・司会者のモデルで実行）
+    task_model_routing: Dict[AuxiliaryTask, ModelInfo] = Field(
+        default_factory=dict,
+        description="補助タスクごとに使うモデル。値は ModelInfo か \"provider:model\" 形式の文字列（例: \"openai:gpt-4o-mini\"）",
+    )
+
+    # 日本語修正設定
+    japanese_correction_mode: Literal["full", "span"] = Field(
+        default="full",
+        description="日本語修正の方法（full: 全文を書き直す / span: 日本語でない文だけを前後の文脈付きで修正して差し戻す）",
+    )
+
+    # 議論の早期終了設定
+    early_stop_enabled: bool = Field(default=False, description="ラウンドの発言に新しい内容が少なくなったら残りのラウンドを省略して最終要約に進む")
+    early_stop_novelty_threshold: float = Field(
+        default=0.55, ge=0.0, le=1.0,
+        description="ラウンドの新規性（それまでの発言にない文字3-gramの割合の平均）がこの値を下回ったら収束の兆候とみなす",
+    )
+    early_stop_min_rounds: int = Field(default=2, ge=1, description="早期終了を判定する前に必ず行うラウンド数")
+    early_stop_patience: int = Field(default=1, ge=1, description="新規性が閾値を下回るラウンドがこの回数続いたら早期終了する")
+
+    # 会議ジャーナル設定
+    meeting_journal_dir: Optional[str] = Field(
+        default="saved_journals",
+        description="会議の進行を逐次記録するジャーナルの保存先（空の場合は記録しない）。中断した会議は resume_meeting で再開できる",
+    )
+
+    # ストリーミング設定
+    streaming_enabled: bool = Field(default=True, description="発言・要約をストリーミングで生成し、生成途中のテキストをUIに逐次表示する")
 
     # タイムアウト設定
     api_timeout_seconds_default: int = Field(default=60, gt=0, description="Default API timeout in seconds") # 少し長めに変更
@@ -136,6 +319,34 @@ class AppConfig(BaseModel):
         extra="ignore",
     )
 
+    @field_validator('rate_limits', mode='before')
+    def merge_default_rate_limits(cls, v):
+        """指定のないプロバイダーは既定の上限を使う"""
+        merged: Dict = dict(default_provider_rate_limits())
+        for provider, limits in dict(v or {}).items():
+            merged[AIProvider(provider)] = limits
+        return merged
+
+    @field_validator('fake_provider', mode='before')
+    def default_fake_provider(cls, v):
+        """未指定の場合は既定の設定を使う"""
+        return FakeProviderSettings() if v is None else v
+
+    @field_validator('task_model_routing', mode='before')
+    def parse_task_model_routing(cls, v):
+        """"provider:model" 形式の文字列を ModelInfo に変換する"""
+        if not v:
+            return {}
+        parsed = {}
+        for task, model in dict(v).items():
+            if isinstance(model, str):
+                provider, separator, name = model.partition(":")
+                if not separator or not name.strip():
+                    raise ValueError(f"task_model_routing[{task}] は 'provider:model' 形式で指定してください: {model}")
+                model = {"name": name.strip(), "provider": provider.strip().lower()}
+            parsed[task] = model
+        return parsed
+
 
 class FileInfo(BaseModel):
     """アップロードされたファイルの情報"""
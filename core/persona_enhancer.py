@@ -1,23 +1,149 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
-import time
-from typing import Optional
+import re
+from typing import Dict, List, Optional, Sequence
 
-from openai import APIError, OpenAI
+from .api_clients import BaseAIClient
+from .utils import extract_content_and_tokens
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PERSONA_MODEL = "gpt-4o"
+# Output budget for one enhanced persona (a batched call gets this much per persona).
+PERSONA_MAX_TOKENS = 1500
+# Largest number of personas enhanced in one batched call.
+PERSONA_BATCH_SIZE = 8
+# Bump when the enhancement prompt changes so that persisted personas are regenerated.
+PERSONA_PROMPT_VERSION = 2
+
+SYSTEM_PROMPT = (
+    """あなたは、AIアシスタントの役割（ペルソナ）を、最高のパフォーマンスが発揮できるようデザインする"""
+    "「AIアーキテクト」です。\n"
+    "単なる役割設定ではなく、思考の深さ、広さ、そして独自性を引き出すための行動指針と制約事項を具体的に設計してください。\n"
+    "出力は、AIアシスタントへの直接の指示（プロンプト）として使える形式で記述してください。"
+)
+
+DESIGN_FRAMEWORK = """
+# AIへの行動指令設計
+以下の思考フレームワークに基づき、AIに与えるべき詳細なペルソナと行動指令を設計してください。
+
+1.  **知識の源泉:**
+    * 提供された参考資料の要点を深く理解し、議論の基盤とすること。
+    * **最重要:** 資料の内容に限定されず、自身の持つ広範な知識（歴史的背景、海外の類似事例、定性的・定量的なデータ、学術的知見、文化的文脈など）を積極的に統合し、独自の視点を提示すること。資料はあくまで出発点であり、あなたの価値はそこからどれだけ思考を飛躍させられるかにある。
+
+2.  **思考のスタンス:**
+    * 議題に対して多角的・複眼的な視点を維持すること。例えば、経済的、技術的、倫理的、社会的インパクトなど、複数の側面から分析を行うこと。
+    * 短期的な視点と長期的な視点の両方から意見を述べること。
+
+3.  **発言のスタイル:**
+    * 具体的で、根拠のある発言を心がけること。「～だと思う」だけでなく、「なぜなら～というデータがあるから」「歴史的に見て～という前例がある」のように、説得力のある議論を展開すること。
+    * 他の参加者の意見を尊重しつつ、安易に同調せず、建設的な批判や対案を恐れずに提示すること。
+"""
+
+_BATCH_MARKER_PATTERN = re.compile(r"^\s*<<<PERSONA\s+(\d+)>>>\s*$", re.MULTILINE)
+
+
+def persona_cache_key(
+    model: str,
+    base_persona: str,
+    topic: str,
+    document_context: Optional[str] = None,
+) -> str:
+    """Return the persona cache key for an enhancement request.
+
+    The key covers the model, the base persona, the topic, a hash of the document
+    context and :data:`PERSONA_PROMPT_VERSION`.
+    """
+    document_hash = (
+        hashlib.sha256(document_context.encode("utf-8")).hexdigest() if document_context else None
+    )
+    payload = json.dumps(
+        {
+            "model": model,
+            "base_persona": base_persona,
+            "topic": topic,
+            "document": document_hash,
+            "prompt_version": PERSONA_PROMPT_VERSION,
+        },
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def build_shared_system_message(topic: str, document_context: Optional[str] = None) -> str:
+    """System message shared by every persona of a meeting (sent as a cacheable prefix)."""
+    message = f"""{SYSTEM_PROMPT}
+
+# 議論の主要テーマ
+{topic}
+"""
+    if document_context:
+        message += f"""
+# 参考資料の要点
+{document_context}
+"""
+    return message + DESIGN_FRAMEWORK
+
+
+def build_single_prompt(base_persona: str) -> str:
+    return f"""# 基本ペルソナ
+{base_persona}
+
+上記を踏まえて、このAIのための最高の「強化ペルソナ設定」を作成してください:"""
+
+
+def build_batch_prompt(base_personas: Sequence[str]) -> str:
+    listed = "\n\n".join(
+        f"## 基本ペルソナ {number}\n{persona}" for number, persona in enumerate(base_personas, start=1)
+    )
+    return f"""以下の{len(base_personas)}名それぞれについて、上記を踏まえた最高の「強化ペルソナ設定」を作成してください。
+
+{listed}
+
+# 出力形式
+各ペルソナの設定の直前に、その番号を示す行 `<<<PERSONA 番号>>>` だけを置いてください（例: `<<<PERSONA 1>>>`）。
+番号は1から{len(base_personas)}まですべて出力し、それ以外の前置きや説明は書かないでください。"""
+
+
+def parse_batch_response(response_text: str, expected_count: int) -> Dict[int, str]:
+    """Split a batched response into ``{persona number: enhanced persona}``.
+
+    Numbers outside ``1..expected_count`` and empty sections are dropped, so callers can
+    fall back to single calls for whatever is missing.
+    """
+    personas: Dict[int, str] = {}
+    markers = list(_BATCH_MARKER_PATTERN.finditer(response_text))
+    for marker, following in zip(markers, markers[1:] + [None]):
+        number = int(marker.group(1))
+        end = following.start() if following else len(response_text)
+        text = response_text[marker.end():end].strip()
+        if 1 <= number <= expected_count and text and number not in personas:
+            personas[number] = text
+    return personas
+
 
 class PersonaEnhancer:
-    """Generate an enhanced persona instruction using OpenAI's Chat Completions API."""
+    """Generate enhanced persona instructions with any :class:`BaseAIClient`.
+
+    Requests go through the client, so they share its rate scheduling, retries,
+    circuit breaker and cassette recording with the rest of the meeting.
+    """
 
-    def __init__(self, api_key: str) -> None:
-        """Create a new enhancer with an initialised OpenAI client."""
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, client: BaseAIClient, batched: bool = True) -> None:
+        """Create a new enhancer.
 
-    def enhance_persona(
+        When ``batched`` is true, :meth:`enhance_personas` asks for all personas in one
+        call and only falls back to per-persona calls for those it could not parse.
+        """
+        self.client = client
+        self.batched = batched
+
+    async def enhance_persona(
         self,
         base_persona: str,
         topic: str,
@@ -33,79 +159,76 @@ class PersonaEnhancer:
             Main discussion topic.
         document_context:
             Optional context extracted from reference documents.
-        """
-
-        system_prompt = (
-            """あなたは、AIアシスタントの役割（ペルソナ）を、最高のパフォーマンスが発揮できるようデザインする"""
-            "「AIアーキテクト」です。\n"
-            "単なる役割設定ではなく、思考の深さ、広さ、そして独自性を引き出すための行動指針と制約事項を具体的に設計してください。\n"
-            "出力は、AIアシスタントへの直接の指示（プロンプト）として使える形式で記述してください。"
-        )
-
-        user_prompt = f"""
-# 基本ペルソナ
-{base_persona}
-
-# 議論の主要テーマ
-{topic}
-"""
-        if document_context:
-            user_prompt += f"""
-# 参考資料の要点
-{document_context}
-"""
-        user_prompt += """
-# AIへの行動指令設計
-以下の思考フレームワークに基づき、このAIに与えるべき詳細なペルソナと行動指令を設計してください。
-
-1.  **知識の源泉:**
-    * 提供された参考資料の要点を深く理解し、議論の基盤とすること。
-    * **最重要:** 資料の内容に限定されず、自身の持つ広範な知識（歴史的背景、海外の類似事例、定性的・定量的なデータ、学術的知見、文化的文脈など）を積極的に統合し、独自の視点を提示すること。資料はあくまで出発点であり、あなたの価値はそこからどれだけ思考を飛躍させられるかにある。
-
-2.  **思考のスタンス:**
-    * 議題に対して多角的・複眼的な視点を維持すること。例えば、経済的、技術的、倫理的、社会的インパクトなど、複数の側面から分析を行うこと。
-    * 短期的な視点と長期的な視点の両方から意見を述べること。
-
-3.  **発言のスタイル:**
-    * 具体的で、根拠のある発言を心がけること。「～だと思う」だけでなく、「なぜなら～というデータがあるから」「歴史的に見て～という前例がある」のように、説得力のある議論を展開すること。
-    * 他の参加者の意見を尊重しつつ、安易に同調せず、建設的な批判や対案を恐れずに提示すること。
 
-上記を踏まえて、このAIのための最高の「強化ペルソナ設定」を作成してください:
-"""
+        Returns the base persona unchanged when the request fails.
+        """
+        system_message = build_shared_system_message(topic, document_context)
+        try:
+            response = await self.client.request_completion(
+                user_message=build_single_prompt(base_persona),
+                system_message=system_message,
+                cacheable_system_prefix=system_message,
+            )
+            content, _ = extract_content_and_tokens(self.client.model_info.provider, response)
+        except Exception as e:
+            logger.error("ペルソナ強化中にエラー: %s", e)
+            content = ""
+        if not content.strip():
+            logger.error("Falling back to base persona after a failed enhancement.")
+            return base_persona
+        return content.strip()
+
+    async def enhance_personas(
+        self,
+        base_personas: Sequence[str],
+        topic: str,
+        document_context: Optional[str] = None,
+    ) -> List[str]:
+        """Enhance several personas that share the same topic and document context.
 
-        max_retries = 3
-        for attempt in range(1, max_retries + 1):
-            try:
-                response = self.client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    temperature=0.7,
-                )
-                return response.choices[0].message.content.strip()
-            except APIError as e:
-                wait_time = 2 ** (attempt - 1)
-                if attempt < max_retries:
-                    logger.warning(
-                        (
-                            "OpenAI API error during persona enhancement "
-                            "(attempt %d/%d): %s. Retrying in %d seconds."
-                        ),
-                        attempt,
-                        max_retries,
-                        e,
-                        wait_time,
-                    )
-                    time.sleep(wait_time)
-                else:
-                    logger.error(
-                        "OpenAI API error during persona enhancement: %s", e
-                    )
-            except Exception:
-                # Catch-all for unexpected issues; do not retry.
-                logger.exception("ペルソナ強化中にエラー")
-                break
-        logger.error("Falling back to base persona after repeated failures.")
-        return base_persona
+        Returns the enhanced personas in the order of ``base_personas``; entries that
+        could not be enhanced keep their base persona.
+        """
+        if not self.batched or len(base_personas) < 2:
+            return list(await asyncio.gather(
+                *(self.enhance_persona(persona, topic, document_context) for persona in base_personas)
+            ))
+        batches = [
+            list(base_personas[start:start + PERSONA_BATCH_SIZE])
+            for start in range(0, len(base_personas), PERSONA_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(self._enhance_batch(batch, topic, document_context) for batch in batches))
+        return [persona for batch_result in results for persona in batch_result]
+
+    async def _enhance_batch(
+        self,
+        base_personas: List[str],
+        topic: str,
+        document_context: Optional[str],
+    ) -> List[str]:
+        """Enhance one batch in a single call, then retry missing personas one by one."""
+        if len(base_personas) == 1:
+            return [await self.enhance_persona(base_personas[0], topic, document_context)]
+        system_message = build_shared_system_message(topic, document_context)
+        count = len(base_personas)
+        try:
+            response = await self.client.request_completion(
+                user_message=build_batch_prompt(base_personas),
+                system_message=system_message,
+                cacheable_system_prefix=system_message,
+                override_max_tokens=self.client.model_info.max_tokens * count,
+                override_timeout=self.client.default_timeout * count,
+            )
+            content, _ = extract_content_and_tokens(self.client.model_info.provider, response)
+            enhanced = parse_batch_response(content, count)
+        except Exception as e:
+            logger.warning("Batched persona enhancement failed (%s); enhancing one by one.", e)
+            enhanced = {}
+        missing = [number for number in range(1, count + 1) if number not in enhanced]
+        if missing:
+            logger.info("Batched persona enhancement missed %d of %d personas; retrying them one by one.", len(missing), count)
+            retried = await asyncio.gather(
+                *(self.enhance_persona(base_personas[number - 1], topic, document_context) for number in missing)
+            )
+            enhanced.update(zip(missing, retried))
+        return [enhanced[number] for number in range(1, count + 1)]
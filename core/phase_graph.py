@@ -0,0 +1,104 @@
+"""
+依存関係のある非同期フェーズの実行
+
+会議開始前の処理（参加者の初期化・資料の読み込みと要約・議題のRAG検索・ペルソナ強化）には
+互いに独立したものがあります。PhaseGraph は各フェーズを依存先がすべて終わった時点で開始し、
+独立したフェーズを並行に進めます。フェーズごとの所要時間は timings と on_phase_finished で取得できます。
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Phase:
+    """1つのフェーズ（run は依存先がすべて終わってから呼ばれる）"""
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    depends_on: Tuple[str, ...] = ()
+
+
+class PhaseGraph:
+    """
+    フェーズの依存グラフ
+
+    いずれかのフェーズが例外を送出した場合は、実行中・未開始のフェーズをすべてキャンセルして
+    その例外を送出する（フェーズ内で処理を続けられるエラーは、各フェーズで捕捉すること）。
+
+    Args:
+        on_phase_finished: フェーズが終わるたびに (フェーズ名, 所要秒数) で呼ばれる
+        clock: 経過時間の計測に使う時計（テスト用）
+    """
+
+    def __init__(
+        self,
+        on_phase_finished: Optional[Callable[[str, float], None]] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.on_phase_finished = on_phase_finished
+        self._clock = clock
+        self._phases: Dict[str, Phase] = {}
+        # 各フェーズの戻り値と所要時間（秒）
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, run: Callable[[], Awaitable[Any]], depends_on: Iterable[str] = ()) -> None:
+        """フェーズを追加する（登録順に開始するため、スレッドで実行する処理などは先に登録するとよい）"""
+        if name in self._phases:
+            raise ValueError(f"フェーズ {name} は登録済みです")
+        self._phases[name] = Phase(name, run, tuple(depends_on))
+
+    def _execution_order(self) -> List[Phase]:
+        """依存先が先に来る順（登録順をなるべく保つ）。未登録の依存先や循環があれば ValueError"""
+        for phase in self._phases.values():
+            for dependency in phase.depends_on:
+                if dependency not in self._phases:
+                    raise ValueError(f"フェーズ {phase.name} の依存先 {dependency} が登録されていません")
+        ordered: List[Phase] = []
+        done: set = set()
+        remaining = list(self._phases.values())
+        while remaining:
+            ready = [phase for phase in remaining if all(d in done for d in phase.depends_on)]
+            if not ready:
+                raise ValueError(f"フェーズの依存関係が循環しています: {[phase.name for phase in remaining]}")
+            for phase in ready:
+                ordered.append(phase)
+                done.add(phase.name)
+            remaining = [phase for phase in remaining if phase.name not in done]
+        return ordered
+
+    async def _run_phase(self, phase: Phase, tasks: Dict[str, "asyncio.Task[Any]"]) -> Any:
+        if phase.depends_on:
+            await asyncio.gather(*(tasks[dependency] for dependency in phase.depends_on))
+        started = self._clock()
+        result = await phase.run()
+        elapsed = self._clock() - started
+        self.results[phase.name] = result
+        self.timings[phase.name] = elapsed
+        logger.info(f"フェーズ {phase.name} 完了 ({elapsed:.2f}秒)")
+        if self.on_phase_finished:
+            try:
+                self.on_phase_finished(phase.name, elapsed)
+            except Exception as e:
+                logger.error(f"on_phase_finished コールバック実行エラー: {e}", exc_info=True)
+        return result
+
+    async def run(self) -> Dict[str, Any]:
+        """全フェーズを実行し、フェーズ名ごとの戻り値を返す"""
+        tasks: Dict[str, "asyncio.Task[Any]"] = {}
+        for phase in self._execution_order():
+            tasks[phase.name] = asyncio.ensure_future(self._run_phase(phase, tasks))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            # キャンセルしたタスクの終了を待ち、「取得されなかった例外」の警告を出さない
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return dict(self.results)
@@ -0,0 +1,201 @@
+"""
+プロバイダー別レートスケジューラ
+
+同じプロバイダー・同じAPIキーを使う全クライアント（全会議）で1つのスケジューラを共有し、
+直近60秒間のリクエスト数（RPM）とトークン数（TPM）が上限を超えないようにリクエストを待たせます。
+上限に余裕がある間は待ち時間なしで通すため、固定の待機は発生しません。
+
+状態は threading.Lock で保護し、待機は呼び出し元のイベントループ上で行うため、
+複数のイベントループ・スレッドから同時に利用できます。
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from .models import AIProvider, ProviderRateLimit
+
+logger = logging.getLogger(__name__)
+
+RATE_WINDOW_SECONDS = 60.0
+
+
+@dataclass
+class RateReservation:
+    """スケジューラが払い出した1リクエスト分の枠"""
+    timestamp: float
+    tokens: int
+    waited_seconds: float = 0.0
+    expired: bool = False  # 集計期間を過ぎて集計から外れたか
+
+
+class ProviderRateScheduler:
+    """1つのプロバイダー・APIキーに対するRPM/TPMスケジューラ"""
+
+    def __init__(
+        self,
+        name: str,
+        limits: Optional[ProviderRateLimit] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        """
+        初期化
+
+        Args:
+            name: ログ用の名前（プロバイダー名とAPIキーのハッシュ）
+            limits: RPM/TPM の上限（None の項目は制限しない）
+            clock: 現在時刻（秒）を返す関数（テスト用）
+            sleep: 待機に使うコルーチン関数（テスト用）
+        """
+        self.name = name
+        self.limits = limits or ProviderRateLimit()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._reservations: Deque[RateReservation] = deque()
+        self._window_tokens = 0
+        self._last_request_at: Optional[float] = None
+        self.total_requests = 0
+        self.total_wait_seconds = 0.0
+
+    @property
+    def tracks_tokens(self) -> bool:
+        """TPM の上限が設定されているか（呼び出し側はこの場合のみトークン数を見積もる）"""
+        return self.limits.tokens_per_minute is not None
+
+    def update_limits(self, limits: ProviderRateLimit) -> None:
+        with self._lock:
+            self.limits = limits
+
+    def _purge(self, now: float) -> None:
+        while self._reservations and now - self._reservations[0].timestamp >= RATE_WINDOW_SECONDS:
+            reservation = self._reservations.popleft()
+            reservation.expired = True
+            self._window_tokens -= reservation.tokens
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        """tokens 分のリクエストを通せるまでの待ち時間（0なら即時）"""
+        wait = 0.0
+        limits = self.limits
+        if limits.min_interval_seconds and self._last_request_at is not None:
+            wait = max(wait, self._last_request_at + limits.min_interval_seconds - now)
+        rpm = limits.requests_per_minute
+        if rpm is not None and len(self._reservations) >= rpm:
+            oldest_to_expire = self._reservations[len(self._reservations) - rpm]
+            wait = max(wait, oldest_to_expire.timestamp + RATE_WINDOW_SECONDS - now)
+        tpm = limits.tokens_per_minute
+        # 1件で上限を超える見積もりは、集計期間が空になれば通す（永久に待たないため）
+        if tpm is not None and self._reservations and self._window_tokens + tokens > tpm:
+            excess = self._window_tokens + tokens - tpm
+            released = 0
+            for reservation in self._reservations:
+                released += reservation.tokens
+                if released >= excess:
+                    wait = max(wait, reservation.timestamp + RATE_WINDOW_SECONDS - now)
+                    break
+            else:
+                wait = max(wait, self._reservations[-1].timestamp + RATE_WINDOW_SECONDS - now)
+        return max(0.0, wait)
+
+    def _try_reserve(self, tokens: int) -> Tuple[Optional[RateReservation], float]:
+        with self._lock:
+            now = self._clock()
+            self._purge(now)
+            wait = self._wait_time(now, tokens)
+            if wait > 0:
+                return None, wait
+            reservation = RateReservation(timestamp=now, tokens=tokens)
+            self._reservations.append(reservation)
+            self._window_tokens += tokens
+            self._last_request_at = now
+            self.total_requests += 1
+            return reservation, 0.0
+
+    async def acquire(self, tokens: int = 0) -> RateReservation:
+        """
+        リクエスト1件分の枠を確保する（上限に達している場合は空くまで待つ）
+
+        Args:
+            tokens: このリクエストで消費する見込みのトークン数（TPM 未設定の場合は 0 でよい）
+
+        Returns:
+            確保した枠（実際のトークン数が分かったら settle に渡す）
+        """
+        waited = 0.0
+        while True:
+            reservation, wait = self._try_reserve(tokens)
+            if reservation:
+                reservation.waited_seconds = waited
+                if waited > 0:
+                    with self._lock:
+                        self.total_wait_seconds += waited
+                    logger.info(f"レート制限のため {self.name} へのリクエストを {waited:.2f}秒 待機しました")
+                return reservation
+            waited += wait
+            await self._sleep(wait)
+
+    def settle(self, reservation: RateReservation, actual_tokens: int) -> None:
+        """見積もりトークン数を実際の消費トークン数で置き換える"""
+        with self._lock:
+            if reservation.expired:
+                return
+            self._window_tokens += actual_tokens - reservation.tokens
+            reservation.tokens = actual_tokens
+
+    def stats(self) -> Dict[str, float]:
+        """直近の集計期間の利用状況"""
+        with self._lock:
+            self._purge(self._clock())
+            return {
+                "requests_in_window": len(self._reservations),
+                "tokens_in_window": self._window_tokens,
+                "total_requests": self.total_requests,
+                "total_wait_seconds": self.total_wait_seconds,
+            }
+
+
+_schedulers: Dict[Tuple[AIProvider, str], ProviderRateScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def api_key_fingerprint(api_key: Optional[str]) -> str:
+    """APIキーを共有状態のキーに使うためのハッシュ（キーそのものは保持しない）"""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+
+def get_rate_scheduler(
+    provider: AIProvider, api_key: Optional[str], limits: Optional[ProviderRateLimit] = None
+) -> ProviderRateScheduler:
+    """
+    プロバイダーとAPIキーの組に対応する共有スケジューラを返す
+
+    Args:
+        provider: プロバイダー
+        api_key: APIキー（ハッシュ化してキーに使う）
+        limits: 上限（指定した場合は既存のスケジューラの上限も更新する）
+
+    Returns:
+        共有スケジューラ
+    """
+    key = (provider, api_key_fingerprint(api_key))
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = ProviderRateScheduler(f"{provider.value}:{key[1]}", limits)
+            _schedulers[key] = scheduler
+            return scheduler
+    if limits is not None and scheduler.limits != limits:
+        scheduler.update_limits(limits)
+    return scheduler
+
+
+def reset_rate_schedulers() -> None:
+    """共有スケジューラをすべて破棄する（テスト用）"""
+    with _schedulers_lock:
+        _schedulers.clear()
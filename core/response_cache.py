@@ -0,0 +1,204 @@
+"""
+LLM 応答のキャッシュ（SQLite）
+
+同じ資料・ペルソナで会議をやり直すと、資料のチャンク要約や日本語修正など全く同じリクエストを
+何度も送ることになります。このモジュールはメッセージ・モデル・temperature・max_tokens の
+ハッシュをキーに応答を SQLite に保存し、同じリクエストにはプロバイダーを呼ばずに応答を返します。
+
+エントリ数・合計サイズの上限を超えると最後に使われた時刻が古いものから削除し（LRU）、
+TTL を過ぎたエントリは使いません。ヒット・ミスなどの件数は stats() で取得できます。
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .models import AIProvider, AppConfig
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+
+class ResponseCache:
+    """
+    SQLite に保存する応答キャッシュ（スレッドセーフ。複数プロセスで同じファイルを共有できる）
+
+    Args:
+        path: データベースファイルのパス
+        max_entries: 保持するエントリ数の上限
+        max_bytes: 保持する応答の合計サイズ（バイト）の上限
+        ttl_seconds: 保存してからエントリを使う期間（秒）
+        max_temperature: キャッシュするリクエストの temperature の上限（既定は 0 のリクエストだけ）
+        clock: 現在時刻（テスト用）
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 5000,
+        max_bytes: int = 100 * 1024 * 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_temperature: float = 0.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_temperature = max_temperature
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stores = 0
+        self.evictions = 0
+        logger.info(f"応答キャッシュを開きました: {self.path}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """キーに対応する応答（ないか期限切れの場合は None）"""
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, provider: AIProvider, model_name: str, response: Dict[str, Any]) -> None:
+        """応答を保存し、上限を超えた分を古いものから削除する"""
+        payload = json.dumps(response, ensure_ascii=False, separators=(",", ":"))
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, model, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, AIProvider(provider).value, model_name, payload, size, now, now),
+            )
+            self.stores += 1
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """期限切れのエントリと、上限を超えた分の最後に使われた時刻が古いエントリを削除する（ロック内で呼ぶ）"""
+        self.evictions += self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        count, total_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+        excess_entries = max(0, count - self.max_entries)
+        excess_bytes = max(0, total_bytes - self.max_bytes)
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            victims.append((key,))
+            excess_entries -= 1
+            excess_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "path": str(self.path),
+                "entries": count,
+                "bytes": total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(
+    path: str,
+    max_entries: int = 5000,
+    max_bytes: int = 100 * 1024 * 1024,
+    ttl_seconds: float = 7 * 24 * 3600,
+    max_temperature: float = 0.0,
+) -> ResponseCache:
+    """パスごとに共有する応答キャッシュ（上限・TTL などは呼び出しごとの値に更新する）"""
+    key = str(Path(path).resolve())
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = ResponseCache(path, max_entries, max_bytes, ttl_seconds, max_temperature)
+            _caches[key] = cache
+        cache.max_entries, cache.max_bytes = max_entries, max_bytes
+        cache.ttl_seconds, cache.max_temperature = ttl_seconds, max_temperature
+        return cache
+
+
+def response_cache_from_config(config: AppConfig) -> Optional[ResponseCache]:
+    """設定に応じた応答キャッシュ（無効な場合は None）"""
+    if not config.response_cache_enabled:
+        return None
+    try:
+        return get_response_cache(
+            config.response_cache_path,
+            max_entries=config.response_cache_max_entries,
+            max_bytes=int(config.response_cache_max_mb * 1024 * 1024),
+            ttl_seconds=config.response_cache_ttl_seconds,
+            max_temperature=config.response_cache_max_temperature,
+        )
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"応答キャッシュを開けないため、キャッシュせずに続行します: {e}")
+        return None
+
+
+def reset_response_caches() -> None:
+    """開いている応答キャッシュをすべて閉じる（テスト用）"""
+    with _caches_lock:
+        caches = list(_caches.values())
+        _caches.clear()
+    for cache in caches:
+        cache.close()
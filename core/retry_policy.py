@@ -0,0 +1,395 @@
+"""
+リトライ・適応的な同時実行制御・サーキットブレーカー
+
+全クライアント共通のリトライ方針（ジッター付き指数バックオフ、Retry-After の尊重）と、
+プロバイダー・APIキーごとに共有する次の2つの制御を提供します。
+
+- AdaptiveConcurrencyLimiter: 同時に送信中のリクエスト数の上限を AIMD で調整する。
+  成功するたびに上限を少しずつ広げ、429 やレート制限ヘッダーの残量不足を受けたら半分に絞る。
+- CircuitBreaker: タイムアウトや 5xx が続いたプロバイダーへの呼び出しを一定時間遮断し、
+  全会議が同じ障害に対してリトライを繰り返さないようにする。
+
+状態は threading.Lock で保護し、待機は呼び出し元のイベントループ上で行うため、
+レートスケジューラと同様に複数のイベントループ・スレッドから同時に利用できます。
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Mapping, Optional, Tuple
+
+from .exceptions import CircuitOpenError
+from .models import AIProvider
+from .rate_scheduler import api_key_fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+
+# リトライ対象とする HTTP ステータス（429: レート制限, 529: Anthropic の過負荷）
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504, 529})
+
+# (残量, 上限) のヘッダー名の組。OpenAI と Anthropic のレート制限ヘッダー
+RATE_LIMIT_HEADER_PAIRS: Tuple[Tuple[str, str], ...] = (
+    ("x-ratelimit-remaining-requests", "x-ratelimit-limit-requests"),
+    ("x-ratelimit-remaining-tokens", "x-ratelimit-limit-tokens"),
+    ("anthropic-ratelimit-requests-remaining", "anthropic-ratelimit-requests-limit"),
+    ("anthropic-ratelimit-tokens-remaining", "anthropic-ratelimit-tokens-limit"),
+    ("anthropic-ratelimit-input-tokens-remaining", "anthropic-ratelimit-input-tokens-limit"),
+    ("anthropic-ratelimit-output-tokens-remaining", "anthropic-ratelimit-output-tokens-limit"),
+)
+
+
+def _lower_headers(headers: Optional[Mapping[str, Any]]) -> Dict[str, str]:
+    if not headers:
+        return {}
+    return {str(key).lower(): str(value) for key, value in headers.items()}
+
+
+def error_status_code(error: BaseException) -> Optional[int]:
+    """例外が示す HTTP ステータスコード（プロバイダーの例外・カスタム例外・google の例外に対応）"""
+    for attribute in ("status_code", "code"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return int(value)
+    return None
+
+
+def error_headers(error: BaseException) -> Optional[Mapping[str, Any]]:
+    """例外に含まれるレスポンスヘッダー（ない場合は None）"""
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None)
+
+
+def parse_retry_after(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """retry-after-ms / retry-after ヘッダーから待ち時間（秒）を求める"""
+    lowered = _lower_headers(headers)
+    if "retry-after-ms" in lowered:
+        try:
+            return max(0.0, float(lowered["retry-after-ms"]) / 1000)
+        except ValueError:
+            pass
+    value = lowered.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def parse_remaining_fraction(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """レート制限ヘッダーから、最も残りの少ない枠の残量の割合（0.0〜1.0）を求める"""
+    lowered = _lower_headers(headers)
+    fractions = []
+    for remaining_name, limit_name in RATE_LIMIT_HEADER_PAIRS:
+        try:
+            remaining = float(lowered[remaining_name])
+            limit = float(lowered[limit_name])
+        except (KeyError, ValueError):
+            continue
+        if limit > 0:
+            fractions.append(max(0.0, min(1.0, remaining / limit)))
+    return min(fractions) if fractions else None
+
+
+@dataclass
+class RetryPolicy:
+    """全クライアント共通のリトライ方針"""
+    max_retries: int = 3
+    base_delay_seconds: float = 1.0
+    max_delay_seconds: float = 30.0
+    rng: random.Random = field(default_factory=random.Random)
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        attempt 回目（0始まり）の失敗後に待つ秒数
+
+        ジッターで待ち時間をばらつかせ、同時に失敗した会議が一斉に再送しないようにします。
+        サーバーが Retry-After を指定した場合はその時間（ただし max_delay_seconds まで）を下回らないようにします。
+        Retry-After: 3600 のような長い指定で会議が止まらないよう、max_delay_seconds を超える指定はそこで打ち切ります。
+        """
+        cap = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** attempt))
+        delay = self.rng.uniform(cap / 2, cap)
+        if retry_after is not None:
+            delay = min(retry_after, self.max_delay_seconds) + self.rng.uniform(0, self.base_delay_seconds)
+        return delay
+
+
+class CircuitBreaker:
+    """プロバイダー・APIキーごとのサーキットブレーカー"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初期化
+
+        Args:
+            name: ログ用の名前
+            failure_threshold: この回数続けて失敗したら遮断する
+            reset_timeout_seconds: 遮断してから試験的な呼び出しを1件通すまでの秒数
+            clock: 現在時刻（秒）を返す関数（テスト用）
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+
+    def before_request(self) -> None:
+        """
+        リクエストを送ってよいか確認する
+
+        Raises:
+            CircuitOpenError: 遮断中の場合
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            now = self._clock()
+            if self.state == self.OPEN:
+                remaining = self._opened_at + self.reset_timeout_seconds - now
+                if remaining > 0:
+                    raise CircuitOpenError(f"{self.name} は障害が続いているため呼び出しを停止中です（あと{remaining:.0f}秒）")
+                self.state = self.HALF_OPEN
+                self._probe_started_at = now
+                return
+            # 半開状態では試験的な呼び出しを1件だけ通す（結果が返らないまま時間が経った場合は次を通す）
+            if self._probe_started_at is not None and now - self._probe_started_at < self.reset_timeout_seconds:
+                raise CircuitOpenError(f"{self.name} は復旧確認中のため呼び出しを停止中です")
+            self._probe_started_at = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info(f"{self.name} への呼び出しが回復したため遮断を解除します")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"{self.name} で失敗が {self.consecutive_failures} 回続いたため、"
+                        f"{self.reset_timeout_seconds:.0f}秒間呼び出しを遮断します"
+                    )
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_started_at = None
+
+
+@dataclass(eq=False)
+class _Waiter:
+    loop: asyncio.AbstractEventLoop
+    future: "asyncio.Future[None]"
+    granted: bool = False
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """同時送信数の上限を AIMD（加算増加・乗算減少）で調整するリミッター"""
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        min_limit: int = 1,
+        initial_limit: Optional[int] = None,
+        decrease_factor: float = 0.5,
+        low_remaining_fraction: float = 0.1,
+        decrease_cooldown_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        初期化
+
+        Args:
+            name: ログ用の名前
+            max_limit: 同時送信数の上限の最大値
+            min_limit: 同時送信数の上限の最小値
+            initial_limit: 初期の上限（None の場合は max_limit）
+            decrease_factor: 絞るときに上限に掛ける係数
+            low_remaining_fraction: レート制限ヘッダーの残量がこの割合を下回ったら絞る
+            decrease_cooldown_seconds: 連続して絞らない間隔（同じ混雑で何度も半減しないため）
+            clock: 現在時刻（秒）を返す関数（テスト用）
+        """
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.decrease_factor = decrease_factor
+        self.low_remaining_fraction = low_remaining_fraction
+        self.decrease_cooldown_seconds = decrease_cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._limit = float(initial_limit or max_limit)
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._last_decrease_at: Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        """現在の同時送信数の上限"""
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def update_max_limit(self, max_limit: int) -> None:
+        with self._lock:
+            self.max_limit = max_limit
+            self._limit = min(self._limit, float(max_limit))
+            self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        """空いた枠を待機中のリクエストに順に割り当てる（ロック取得中に呼ぶ）"""
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            try:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+            except RuntimeError:
+                # 待機元のイベントループが既に閉じている
+                continue
+            waiter.granted = True
+            self._in_flight += 1
+
+    async def acquire(self) -> None:
+        """送信枠を1つ確保する（上限に達している場合は空くまで待つ）"""
+        with self._lock:
+            if not self._waiters and self._in_flight < self.limit:
+                self._in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = _Waiter(loop=loop, future=loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._in_flight -= 1
+                    self._wake_waiters()
+                else:
+                    self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_waiters()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """送信枠を確保して処理を実行する"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_success(self) -> None:
+        """成功したら上限を 1/上限 ずつ広げる（上限分の成功でおよそ1増える）"""
+        with self._lock:
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / max(self._limit, 1.0))
+            self._wake_waiters()
+
+    def on_throttle(self) -> None:
+        """レート制限を受けたら上限を絞る"""
+        with self._lock:
+            now = self._clock()
+            if self._last_decrease_at is not None and now - self._last_decrease_at < self.decrease_cooldown_seconds:
+                return
+            self._last_decrease_at = now
+            previous = self.limit
+            self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        logger.info(f"レート制限のため {self.name} の同時送信数の上限を {previous} → {self.limit} に下げました")
+
+    def observe_headers(self, headers: Optional[Mapping[str, Any]]) -> None:
+        """レスポンスのレート制限ヘッダーを見て、残量が少なければ上限を絞る"""
+        fraction = parse_remaining_fraction(headers)
+        if fraction is not None and fraction < self.low_remaining_fraction:
+            self.on_throttle()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"limit": self.limit, "in_flight": self._in_flight, "waiting": len(self._waiters)}
+
+
+_limiters: Dict[Tuple[AIProvider, str], AdaptiveConcurrencyLimiter] = {}
+_breakers: Dict[Tuple[AIProvider, str], CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_concurrency_limiter(
+    provider: AIProvider, api_key: Optional[str], max_limit: Optional[int] = None
+) -> AdaptiveConcurrencyLimiter:
+    """プロバイダーとAPIキーの組に対応する共有リミッターを返す（max_limit を指定した場合は上限も更新する）"""
+    key = (provider, api_key_fingerprint(api_key))
+    with _registry_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveConcurrencyLimiter(f"{provider.value}:{key[1]}", max_limit or DEFAULT_MAX_CONCURRENT_REQUESTS)
+            _limiters[key] = limiter
+            return limiter
+    if max_limit and limiter.max_limit != max_limit:
+        limiter.update_max_limit(max_limit)
+    return limiter
+
+
+def get_circuit_breaker(
+    provider: AIProvider,
+    api_key: Optional[str],
+    failure_threshold: Optional[int] = None,
+    reset_timeout_seconds: Optional[float] = None,
+) -> CircuitBreaker:
+    """プロバイダーとAPIキーの組に対応する共有サーキットブレーカーを返す"""
+    key = (provider, api_key_fingerprint(api_key))
+    with _registry_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(f"{provider.value}:{key[1]}")
+            _breakers[key] = breaker
+        if failure_threshold is not None:
+            breaker.failure_threshold = failure_threshold
+        if reset_timeout_seconds is not None:
+            breaker.reset_timeout_seconds = reset_timeout_seconds
+        return breaker
+
+
+def reset_provider_controls() -> None:
+    """共有リミッターとサーキットブレーカーをすべて破棄する（テスト用）"""
+    with _registry_lock:
+        _limiters.clear()
+        _breakers.clear()
@@ -9,10 +9,10 @@ import time
 import hashlib
 import json
 from datetime import datetime
-from typing import List, Dict, Any, Callable, TypeVar, Tuple
+from typing import List, Dict, Any, Callable, Iterable, TypeVar, Tuple, Optional
 from pathlib import Path
 import logging
-from functools import wraps
+from functools import wraps, lru_cache
 from .models import AIProvider
 
 # tiktoken is optional; provide a fallback if it's not installed
@@ -28,6 +28,21 @@ T = TypeVar('T')
 F = TypeVar('F', bound=Callable[..., Any])
 
 
+@lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str):
+    """
+    tiktokenのエンコーディングを取得（同一プロセス内で再利用）
+
+    オフライン環境などで読み込めない場合は None を返し、以降も読み込みを試みない
+    （呼び出しのたびにダウンロードを試みて待たされないようにする）。
+    """
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"tiktokenのエンコーディング {encoding_name} を読み込めないため、簡易的なトークン数推定を使用します: {e}")
+        return None
+
+
 def count_tokens(text: str, model_name: str = "gpt-3.5-turbo") -> int:
     """
     指定されたモデルでのトークン数をカウント
@@ -58,7 +73,9 @@ def count_tokens(text: str, model_name: str = "gpt-3.5-turbo") -> int:
         else:
             encoding_name = "cl100k_base"
 
-        encoding = tiktoken.get_encoding(encoding_name)
+        encoding = _get_encoding(encoding_name)
+        if encoding is None:
+            return len(text) // 4
         return len(encoding.encode(text))
     except Exception as e:
         logger.warning(f"トークンカウントに失敗しました: {e}")
@@ -165,16 +182,55 @@ def generate_file_hash(file_path: str) -> str:
         return ""
 
 
-def extract_content_and_tokens(provider: AIProvider, response: Any) -> Tuple[str, int]:
-    """Extract text content and token usage from an AI response."""
+def detect_provider(model_name: str, local_models: Iterable[str] = ()) -> Optional[AIProvider]:
+    """
+    モデル名からプロバイダーを推定
+
+    Args:
+        model_name: モデル名（例: gpt-4o, claude-3-haiku, gemini-pro）
+        local_models: ローカルサーバーのモデル名（一致すればキーワードより優先して local とする）
+
+    Returns:
+        推定したプロバイダー（判別できない場合は None）
+    """
+    if model_name in local_models:
+        return AIProvider.LOCAL
+    model_lower = model_name.lower()
+    if any(p_keyword in model_lower for p_keyword in ["gpt", "openai"]):
+        return AIProvider.OPENAI
+    elif any(p_keyword in model_lower for p_keyword in ["claude", "anthropic"]):
+        return AIProvider.CLAUDE
+    elif any(p_keyword in model_lower for p_keyword in ["gemini", "google"]):
+        return AIProvider.GEMINI
+    elif model_lower.startswith("fake"):
+        return AIProvider.FAKE
+    return None
+
+
+def extract_content_and_tokens(
+    provider: AIProvider,
+    response: Any,
+    usage_details: Optional[Dict[str, int]] = None,
+) -> Tuple[str, int]:
+    """Extract text content and token usage from an AI response.
+
+    If ``usage_details`` is given, it is filled with prompt-cache statistics:
+    ``cached_tokens`` (input tokens served from the provider's prefix cache) and
+    ``cache_creation_tokens`` (input tokens written to the cache, Claude only).
+    """
     content = ""
     tokens_used = 0
+    cached_tokens = 0
+    cache_creation_tokens = 0
     try:
-        if provider == AIProvider.OPENAI:
+        if provider in (AIProvider.OPENAI, AIProvider.LOCAL, AIProvider.FAKE):
             if response and hasattr(response, "choices") and response.choices and getattr(response.choices[0], "message", None):
                 content = response.choices[0].message.content or ""
             if response and hasattr(response, "usage") and response.usage:
                 tokens_used = getattr(response.usage, "total_tokens", 0) or 0
+                prompt_details = getattr(response.usage, "prompt_tokens_details", None)
+                if prompt_details:
+                    cached_tokens = getattr(prompt_details, "cached_tokens", 0) or 0
         elif provider == AIProvider.CLAUDE:
             if (
                 response
@@ -187,9 +243,12 @@ def extract_content_and_tokens(provider: AIProvider, response: Any) -> Tuple[str
                         content = block.text
                         break
             if response and hasattr(response, "usage") and response.usage:
+                # input_tokens にはキャッシュの読み書き分が含まれないため合算する
+                cached_tokens = getattr(response.usage, "cache_read_input_tokens", 0) or 0
+                cache_creation_tokens = getattr(response.usage, "cache_creation_input_tokens", 0) or 0
                 tokens_used = (getattr(response.usage, "input_tokens", 0) or 0) + (
                     getattr(response.usage, "output_tokens", 0) or 0
-                )
+                ) + cached_tokens + cache_creation_tokens
         elif provider == AIProvider.GEMINI:
             if (
                 response
@@ -210,6 +269,7 @@ def extract_content_and_tokens(provider: AIProvider, response: Any) -> Tuple[str
                 ) + (
                     getattr(response.usage_metadata, "candidates_token_count", 0) or 0
                 )
+                cached_tokens = getattr(response.usage_metadata, "cached_content_token_count", 0) or 0
             elif (
                 hasattr(response, "usage")
                 and response.usage
@@ -247,6 +307,9 @@ def extract_content_and_tokens(provider: AIProvider, response: Any) -> Tuple[str
             exc_info=True,
         )
 
+    if usage_details is not None:
+        usage_details["cached_tokens"] = cached_tokens
+        usage_details["cache_creation_tokens"] = cache_creation_tokens
     return content.strip(), tokens_used
 
 
@@ -313,25 +376,6 @@ def retry_with_exponential_backoff(
     return decorator
 
 
-class RateLimiter:
-    """簡単なレート制限クラス"""
-    
-    def __init__(self, calls_per_second: float = 1.0):
-        self.min_interval = 1.0 / calls_per_second
-        self.last_call_time = 0.0
-    
-    async def acquire(self):
-        """レート制限を適用して処理を実行"""
-        current_time = time.time()
-        time_since_last_call = current_time - self.last_call_time
-        
-        if time_since_last_call < self.min_interval:
-            wait_time = self.min_interval - time_since_last_call
-            await asyncio.sleep(wait_time)
-        
-        self.last_call_time = time.time()
-
-
 def chunk_text(text: str, max_chunk_size: int = 1000, overlap: int = 100) -> List[str]:
     """
     テキストを指定されたサイズでチャンクに分割
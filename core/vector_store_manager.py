@@ -14,6 +14,9 @@ from .document_processor import DocumentProcessor
 
 logger = logging.getLogger(__name__)
 
+# 資料ごとのベクトルストア（と資料要約のキャッシュ）を <保存先>/<ファイルハッシュ> に置く
+DEFAULT_VECTOR_STORE_DIR = "vector_stores"
+
 
 class VectorStoreManager:
     """ドキュメントのテキストをベクトル化し、FAISSによる高度な検索機能を提供するクラス。"""
@@ -7,10 +7,106 @@ ANTHROPIC_API_KEY=your_anthropic_api_key_here
 # Google Gemini API キー
 GOOGLE_API_KEY=your_google_api_key_here
 
+# ローカルのOpenAI互換サーバー（vLLM・Ollama・llama.cpp など）
+# LOCAL_BASE_URL=http://localhost:11434/v1
+# LOCAL_API_KEY=
+# LOCAL_MODELS=llama3.1:8b,qwen2.5:7b
+
+# APIを呼ばない fake プロバイダー（計測・テスト用）
+# FAKE_PROVIDER_ENABLED=true
+# FAKE_PROVIDER={"latency_mean_seconds": 0.8, "language": "mixed", "rate_limit_rate": 0.05, "seed": 1}
+
+# プロバイダー呼び出しの記録・再生（off / record / replay）
+# CASSETTE_MODE=record
+# CASSETTE_PATH=cassettes/meeting.jsonl.gz
+# CASSETTE_REPLAY_LATENCY=none
+# MEETING_RANDOM_SEED=1
+
+# 資料要約の再利用（vector_stores/<ファイルハッシュ> に保存）
+DOCUMENT_SUMMARY_CACHE_ENABLED=true
+# 要約を待たずに抜粋で議論を始め、要約が終わったら差し替える
+PROGRESSIVE_DOCUMENT_SUMMARY=false
+
+# ペルソナ強化（まとめて1回で強化し、強化したペルソナは再利用する）
+PERSONA_ENHANCEMENT_BATCHED=true
+PERSONA_CACHE_ENABLED=true
+# PERSONA_CACHE_PATH=cache/personas.sqlite3
+# PERSONA_CACHE_MAX_ENTRIES=1000
+# PERSONA_CACHE_TTL_SECONDS=2592000
+
+# LLM応答のキャッシュ（temperature が上限以下のリクエストだけを保存して再利用）
+# RESPONSE_CACHE_ENABLED=true
+# RESPONSE_CACHE_PATH=cache/responses.sqlite3
+# RESPONSE_CACHE_MAX_ENTRIES=5000
+# RESPONSE_CACHE_MAX_MB=100
+# RESPONSE_CACHE_TTL_SECONDS=604800
+# RESPONSE_CACHE_MAX_TEMPERATURE=0
+
 # アプリケーション設定
 DEFAULT_TEMPERATURE=0.7
 DEFAULT_MAX_TOKENS=1000
 DEFAULT_ROUNDS_PER_AI=3
 
 # ログレベル (DEBUG, INFO, WARNING, ERROR)
-LOG_LEVEL=INFO
\ No newline at end of file
+LOG_LEVEL=INFO
+# 各ラウンドの参加者発言を並行生成する (true/false)
+PARALLEL_ROUNDS=false
+
+# 会話履歴の渡し方 (recent / rolling_summary)
+HISTORY_STRATEGY=recent
+
+# 会話履歴の詰め方 (count / token_budget)
+HISTORY_PACKING=count
+
+
+# 共有コンテキストのプロンプトキャッシュ (true/false)
+PROMPT_CACHE_ENABLED=true
+
+# GeminiのCachedContentによるコンテキストキャッシュ (true/false)
+GEMINI_CONTEXT_CACHE_ENABLED=false
+
+# 発言・要約のストリーミング表示 (true/false)
+STREAMING_ENABLED=true
+
+# 議論が収束したら残りのラウンドを省略する (true/false) と、その判定条件
+EARLY_STOP_ENABLED=false
+EARLY_STOP_NOVELTY_THRESHOLD=0.55
+EARLY_STOP_MIN_ROUNDS=2
+EARLY_STOP_PATIENCE=1
+
+# プロバイダーごとのレート上限（JSON。未指定の項目は既定値）
+RATE_LIMITS='{"openai": {"requests_per_minute": 500}, "claude": {"requests_per_minute": 50}, "gemini": {"requests_per_minute": 60}}'
+
+# 同じプロバイダー・APIキーへのリクエストの最小間隔（秒）
+API_CALL_DELAY_SECONDS=0
+
+# 同じプロバイダー・APIキーへの同時送信数の上限（レート制限を受けると自動で絞る）
+MAX_CONCURRENT_REQUESTS=8
+
+# 作成済みAIクライアントの再利用数（0 で再利用しない）と起動時の事前作成 (true/false)
+CLIENT_CACHE_SIZE=32
+CLIENT_PREWARM_ENABLED=true
+
+# 共有HTTP接続プール（プロバイダー・APIキーごと）。HTTP/2 には h2 パッケージが必要
+HTTP_MAX_CONNECTIONS=100
+HTTP_MAX_KEEPALIVE_CONNECTIONS=20
+HTTP_KEEPALIVE_EXPIRY_SECONDS=30
+HTTP2_ENABLED=false
+
+# リトライ回数と待ち時間（ジッター付き指数バックオフ。Retry-After があればそれに従う）
+MAX_RETRIES=3
+RETRY_BASE_DELAY_SECONDS=1.0
+RETRY_MAX_DELAY_SECONDS=30.0
+
+# 障害が続いたプロバイダーへの呼び出しを遮断する回数と秒数
+CIRCUIT_BREAKER_FAILURE_THRESHOLD=5
+CIRCUIT_BREAKER_RESET_SECONDS=30
+
+# 会議ジャーナルの保存先（空にすると記録しない。中断した会議の再開に使う）
+MEETING_JOURNAL_DIR=saved_journals
+
+# 日本語修正の方法 (full / span)
+JAPANESE_CORRECTION_MODE=full
+
+# 補助タスク（日本語修正・ラウンド要約・資料チャンク要約・ペルソナ強化）のモデル振り分け (JSON)
+# TASK_MODEL_ROUTING='{"correction": "openai:gpt-4o-mini", "round_summary": "openai:gpt-4o-mini"}'
@@ -2,12 +2,13 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 import flet as ft
 import logging
 
 from core.models import ModelInfo, MeetingResult
+from core.client_factory import ClientFactory
 from core.config_manager import get_config_manager
 from core.meeting_manager import MeetingManager
 from core.context_manager import ContextManager
@@ -24,6 +25,9 @@ class MultiAIResearchApp(ComponentsMixin, EventsMixin):
     def __init__(self, page: ft.Page):
         self.page = page
         self.config_manager = get_config_manager()
+        if self.config_manager.config.client_prewarm_enabled:
+            # 最初の会議の開始を待たせないよう、既定モデルのクライアントを先に作っておく
+            ClientFactory.prewarm()
         self.context_manager = ContextManager()
         self.meeting_manager = MeetingManager()
         self.file_picker = ft.FilePicker(on_result=self._on_file_picked)
@@ -33,6 +37,9 @@ class MultiAIResearchApp(ComponentsMixin, EventsMixin):
         self.uploaded_file_path: Optional[str] = None
         self.current_meeting_result: Optional[MeetingResult] = None
         self.vector_store_manager: Optional[VectorStoreManager] = None
+        # ストリーミング中の発言カード（発言者の内部キー -> カードと本文コントロール。同じモデルの参加者は表示名が同じため内部キーで区別する）
+        self._streaming_statements: Dict[str, Dict[str, Any]] = {}
+        self._summary_stream_last_update: float = 0.0
 
         self._init_ui_components()
         self._setup_page()
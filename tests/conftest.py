@@ -2,3 +2,15 @@ import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+
+import pytest
+
+from core.response_cache import reset_response_caches
+
+
+@pytest.fixture(autouse=True)
+def _isolate_persona_cache(tmp_path, monkeypatch):
+    """強化ペルソナのキャッシュをテストごとの一時ディレクトリに置く"""
+    monkeypatch.setenv("PERSONA_CACHE_PATH", str(tmp_path / "personas.sqlite3"))
+    yield
+    reset_response_caches()
@@ -0,0 +1,218 @@
+from types import SimpleNamespace
+
+import pytest
+
+from google.api_core import exceptions as google_exceptions
+
+from core.api_clients import ClaudeClient, GeminiClient, OpenAIClient
+from core.api_clients import gemini_client
+from core.models import AIProvider, ModelInfo
+from core.utils import extract_content_and_tokens
+
+
+def test_prepare_messages_splits_cacheable_prefix():
+    client = OpenAIClient(api_key="test", model_info=ModelInfo(name="gpt-4o", provider=AIProvider.OPENAI))
+    messages = client._prepare_messages(
+        "question",
+        [{"role": "user", "content": "history"}],
+        "shared context\n\npersona instructions",
+        cacheable_system_prefix="shared context",
+    )
+    assert messages[0] == {"role": "system", "content": "shared context", "cacheable": True}
+    assert messages[1] == {"role": "system", "content": "persona instructions"}
+    assert messages[-1] == {"role": "user", "content": "question"}
+
+    plain = client._prepare_messages("q", None, "other system", cacheable_system_prefix="shared context")
+    assert plain[0] == {"role": "system", "content": "other system"}
+
+
+@pytest.mark.asyncio
+async def test_gemini_context_cache_survives_failed_create(monkeypatch):
+    client = GeminiClient(
+        api_key="test", model_info=ModelInfo(name="gemini-1.5-pro", provider=AIProvider.GEMINI),
+        context_cache_enabled=True, context_cache_min_tokens=10,
+    )
+    busy, invalid, other, unsupported = (f"{name}の共通プレフィックス" * 20 for name in ("混雑", "不正", "別", "非対応"))
+    outcomes = {
+        busy: google_exceptions.ServiceUnavailable("busy"),
+        invalid: google_exceptions.InvalidArgument("too short"),
+    }
+    created = []
+
+    def create(model, system_instruction, ttl):
+        created.append(system_instruction)
+        error = outcomes.pop(system_instruction, None)
+        if error:
+            raise error
+        return SimpleNamespace(name=f"cached-{len(created)}")
+
+    monkeypatch.setattr(gemini_client.genai.caching.CachedContent, "create", create)
+
+    # 一時的なエラーでもクライアント全体のキャッシュは無効にしない
+    assert await client._get_cached_content(busy) is None
+    assert await client._get_cached_content(busy) is None  # 作成し直すまで待つ
+    assert await client._get_cached_content(other) is not None
+    assert client.context_cache_enabled
+
+    # 待ち時間を過ぎれば同じプレフィックスで作成し直す
+    monkeypatch.setattr(gemini_client, "CONTEXT_CACHE_RETRY_SECONDS", 0.0)
+    client._context_cache_failures.clear()
+    assert await client._get_cached_content(busy) is not None
+    assert created.count(busy) == 2
+
+    # 不正なリクエストはそのプレフィックスだけ作成し直さない
+    assert await client._get_cached_content(invalid) is None
+    assert await client._get_cached_content(invalid) is None
+    assert created.count(invalid) == 1
+    assert client.context_cache_enabled
+
+    outcomes[unsupported] = google_exceptions.NotFound("model does not support caching")
+    assert await client._get_cached_content(unsupported) is None
+    assert not client.context_cache_enabled
+
+
+@pytest.mark.asyncio
+async def test_claude_marks_cacheable_prefix_with_cache_control():
+    client = ClaudeClient(api_key="test", model_info=ModelInfo(name="claude-3-haiku-20240307", provider=AIProvider.CLAUDE))
+    captured = {}
+
+    async def fake_create(**kwargs):
+        captured.update(kwargs)
+
+        async def parse():
+            return SimpleNamespace(content=[SimpleNamespace(text="ok")], usage=None)
+        return SimpleNamespace(headers={}, parse=parse)
+
+    client.async_client_instance = SimpleNamespace(
+        messages=SimpleNamespace(with_raw_response=SimpleNamespace(create=fake_create))
+    )
+    messages = client._prepare_messages("q", None, "shared\n\npersona", cacheable_system_prefix="shared")
+    await client._make_api_call(messages, temperature=0.5, max_tokens=10, request_timeout=5)
+
+    assert captured["system"] == [
+        {"type": "text", "text": "shared", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "persona"},
+    ]
+    assert captured["messages"] == [{"role": "user", "content": "q"}]
+
+    client.enable_prompt_cache = False
+    await client._make_api_call(messages, temperature=0.5, max_tokens=10, request_timeout=5)
+    assert captured["system"] == "shared\n\npersona"
+
+
+@pytest.mark.parametrize(
+    "provider,response,expected_tokens,expected_cached",
+    [
+        (
+            AIProvider.OPENAI,
+            SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content="a"))],
+                usage=SimpleNamespace(total_tokens=100, prompt_tokens_details=SimpleNamespace(cached_tokens=64)),
+            ),
+            100,
+            64,
+        ),
+        (
+            AIProvider.CLAUDE,
+            SimpleNamespace(
+                content=[SimpleNamespace(text="a")],
+                usage=SimpleNamespace(
+                    input_tokens=10, output_tokens=5,
+                    cache_read_input_tokens=80, cache_creation_input_tokens=0,
+                ),
+            ),
+            95,
+            80,
+        ),
+        (
+            AIProvider.GEMINI,
+            SimpleNamespace(
+                candidates=[SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text="a")]))],
+                usage_metadata=SimpleNamespace(
+                    prompt_token_count=90, candidates_token_count=5, cached_content_token_count=70
+                ),
+            ),
+            95,
+            70,
+        ),
+    ],
+)
+def test_extract_reports_cached_tokens(provider, response, expected_tokens, expected_cached):
+    usage = {}
+    content, tokens = extract_content_and_tokens(provider, response, usage)
+    assert content == "a"
+    assert tokens == expected_tokens
+    assert usage["cached_tokens"] == expected_cached
+
+
+class _FakeStream:
+    def __init__(self, chunks):
+        self._chunks = list(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._chunks:
+            raise StopAsyncIteration
+        return self._chunks.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_emits_deltas_and_returns_completion_shape():
+    client = OpenAIClient(api_key="test", model_info=ModelInfo(name="gpt-4o", provider=AIProvider.OPENAI))
+    captured = {}
+
+    async def fake_create(**kwargs):
+        captured.update(kwargs)
+        return _FakeStream([
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="こんに"), finish_reason=None)], usage=None),
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="ちは"), finish_reason="stop")], usage=None),
+            SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=42, prompt_tokens_details=None)),
+        ])
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=fake_create)))
+    deltas = []
+    response = await client.request_completion_stream("q", on_delta=deltas.append, system_message="s")
+
+    assert captured["stream"] is True
+    assert deltas == ["こんに", "ちは"]
+    assert extract_content_and_tokens(AIProvider.OPENAI, response) == ("こんにちは", 42)
+
+
+class _ScriptedStreamClient(OpenAIClient):
+    """ストリーミングの失敗タイミングを指定できるテスト用クライアント。"""
+
+    def __init__(self, fail_after_deltas):
+        super().__init__(api_key="test", model_info=ModelInfo(name="gpt-4o", provider=AIProvider.OPENAI))
+        self.fail_after_deltas = fail_after_deltas
+        self.fallback_calls = 0
+
+    async def _make_streaming_api_call(self, messages, temperature, max_tokens, request_timeout, on_delta):
+        for delta in self.fail_after_deltas:
+            on_delta(delta)
+        raise ConnectionError("stream dropped")
+
+    async def _execute_request_with_retry(self, messages, temperature, max_tokens, request_specific_timeout):
+        self.fallback_calls += 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="全文"))],
+            usage=SimpleNamespace(total_tokens=5),
+        )
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_only_before_first_delta():
+    client = _ScriptedStreamClient(fail_after_deltas=[])
+    deltas = []
+    response = await client.request_completion_stream("q", on_delta=deltas.append)
+    assert client.fallback_calls == 1
+    assert deltas == ["全文"]
+    assert extract_content_and_tokens(AIProvider.OPENAI, response)[0] == "全文"
+
+    client = _ScriptedStreamClient(fail_after_deltas=["途中"])
+    deltas = []
+    with pytest.raises(ConnectionError):
+        await client.request_completion_stream("q", on_delta=deltas.append)
+    assert client.fallback_calls == 0
+    assert deltas == ["途中"]
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+
+import core.meeting_manager as meeting_manager
+from core.api_clients import FakeClient
+from core.cassette import (
+    Cassette,
+    decode_response,
+    encode_response,
+    get_cassette,
+    request_fingerprint,
+    reset_cassettes,
+)
+from core.client_factory import ClientFactory
+from core.config_manager import initialize_config_manager
+from core.exceptions import CassetteMissError
+from core.meeting_manager import MeetingManager
+from core.models import AIProvider, FakeProviderSettings, MeetingSettings, ModelInfo
+from core.utils import extract_content_and_tokens
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    reset_cassettes()
+    ClientFactory.clear_client_cache()
+    yield
+    reset_cassettes()
+    ClientFactory.clear_client_cache()
+
+
+def fake_client(cassette, seed=0, latency=0.0):
+    return FakeClient(
+        api_key="fake",
+        model_info=ModelInfo(name="fake-model", provider=AIProvider.FAKE),
+        settings=FakeProviderSettings(seed=seed, latency_distribution="fixed", latency_mean_seconds=latency),
+        cassette=cassette,
+    )
+
+
+def test_fingerprint_normalizes_messages():
+    messages = [{"role": "system", "content": "前提  です\n", "cacheable": True}, {"role": "user", "content": "質問"}]
+    same = [{"role": "system", "content": "前提 です"}, {"role": "user", "content": " 質問"}]
+    key = request_fingerprint(AIProvider.OPENAI, "gpt-4o", 0.7, messages)
+    assert key == request_fingerprint(AIProvider.OPENAI, "gpt-4o", 0.7, same)
+    assert key != request_fingerprint(AIProvider.OPENAI, "gpt-4o", 0.2, messages)
+    assert key != request_fingerprint(AIProvider.OPENAI, "gpt-4o-mini", 0.7, messages)
+    assert key != request_fingerprint(AIProvider.CLAUDE, "gpt-4o", 0.7, messages)
+
+
+@pytest.mark.parametrize("provider", list(AIProvider))
+def test_codec_round_trip(provider):
+    data = {"content": "回答です", "tokens": 120, "cached_tokens": 40}
+    response = decode_response(provider, data)
+    usage = {}
+    assert extract_content_and_tokens(provider, response, usage) == ("回答です", 120)
+    assert usage["cached_tokens"] == 40
+    assert encode_response(provider, response) == data
+
+
+@pytest.mark.asyncio
+async def test_record_then_replay(tmp_path):
+    path = tmp_path / "meeting.jsonl.gz"
+    recorder = fake_client(Cassette(str(path), "record"), seed=1, latency=0.05)
+    first = await recorder.request_completion("質問")
+    second = await recorder.request_completion("質問")
+    other = await recorder.request_completion("別の質問")
+    recorder.cassette.close()
+    assert recorder.cassette.stats()["recorded"] == 3
+
+    cassette = Cassette(str(path), "replay")
+    player = fake_client(cassette, seed=99)
+    contents = [
+        (await player.request_completion("質問")).choices[0].message.content,
+        (await player.request_completion("質問")).choices[0].message.content,
+        (await player.request_completion("別の質問")).choices[0].message.content,
+    ]
+    assert contents == [r.choices[0].message.content for r in (first, second, other)]
+    assert player.calls == 0
+    assert (await player.request_completion("別の質問")).usage.total_tokens == other.usage.total_tokens
+
+    deltas = []
+    streamed = await player.request_completion_stream("質問", on_delta=deltas.append)
+    assert deltas == [streamed.choices[0].message.content]
+
+    with pytest.raises(CassetteMissError):
+        await player.request_completion("記録していない質問")
+    assert cassette.stats()["misses"] == 1
+
+    cassette.replay_latency = "original"
+    started = time.perf_counter()
+    await player.request_completion("別の質問")
+    assert time.perf_counter() - started >= 0.04
+
+
+def test_get_cassette_is_shared_per_path(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+    assert get_cassette(path, "record") is get_cassette(path, "record")
+
+
+async def run_fake_meeting():
+    settings = MeetingSettings(
+        participant_models=[
+            ModelInfo(name="fake-model", provider=AIProvider.FAKE, persona="研究者"),
+            ModelInfo(name="fake-model-fast", provider=AIProvider.FAKE, persona="批評家"),
+            ModelInfo(name="fake-model", provider=AIProvider.FAKE, persona="実務家"),
+        ],
+        moderator_model=ModelInfo(name="fake-model", provider=AIProvider.FAKE, persona="司会"),
+        rounds_per_ai=2,
+        user_query="在宅勤務の生産性について",
+    )
+    return await MeetingManager().run_meeting(settings)
+
+
+@pytest.mark.asyncio
+async def test_recorded_meeting_replays_deterministically(monkeypatch, tmp_path):
+    cassette_path = str(tmp_path / "meeting.jsonl")
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("MEETING_JOURNAL_DIR", str(tmp_path / "journals"))
+    monkeypatch.setenv("MEETING_RANDOM_SEED", "3")
+    monkeypatch.setattr(meeting_manager, "save_carry_over", lambda topic, issues: None)
+
+    monkeypatch.setenv("FAKE_PROVIDER_ENABLED", "1")
+    monkeypatch.setenv("FAKE_PROVIDER", '{"latency_mean_seconds": 0, "seed": 1, "output_tokens_max": 120}')
+    monkeypatch.setenv("CASSETTE_MODE", "record")
+    monkeypatch.setenv("CASSETTE_PATH", cassette_path)
+    initialize_config_manager()
+    recorded = await run_fake_meeting()
+    reset_cassettes()
+    ClientFactory.clear_client_cache()
+
+    # 再生時は fake プロバイダーを無効にしても（APIキーがなくても）同じ会議になる
+    monkeypatch.setenv("FAKE_PROVIDER_ENABLED", "0")
+    monkeypatch.setenv("CASSETTE_MODE", "replay")
+    initialize_config_manager()
+    replayed = await run_fake_meeting()
+    stats = get_cassette(cassette_path, "replay").stats()
+
+    assert [(e.speaker, e.content) for e in replayed.conversation_log] == [
+        (e.speaker, e.content) for e in recorded.conversation_log
+    ]
+    assert replayed.final_summary == recorded.final_summary
+    assert replayed.total_tokens_used == recorded.total_tokens_used
+    assert stats["replayed"] > 0
+    # 記録時はOpenAIのキーがなくペルソナ強化をしていないため、まとめての強化1回と
+    # 個別の強化（参加者3名と司会）の分は記録がなく元のペルソナのまま進む
+    assert stats["misses"] == 5
@@ -0,0 +1,123 @@
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import core.cli as cli
+from core.models import AIProvider, MeetingResult
+from core.utils import detect_provider
+from core.config_manager import initialize_config_manager
+
+
+class FakeMeetingManager:
+    running = 0
+    max_running = 0
+
+    def __init__(self, vector_store_manager=None, **kwargs):
+        self.state = type("State", (), {"phase": "pending", "error_message": None})()
+        self.journal_path = None
+
+    async def run_meeting(self, settings, progress_callback=None):
+        FakeMeetingManager.running += 1
+        FakeMeetingManager.max_running = max(FakeMeetingManager.max_running, FakeMeetingManager.running)
+        await asyncio.sleep(0.01)
+        FakeMeetingManager.running -= 1
+        self.state.phase = "completed"
+        return MeetingResult(
+            settings=settings,
+            final_summary=f"{settings.user_query}の要約",
+            duration_seconds=0.01,
+            participants_count=len(settings.participant_models),
+        )
+
+
+@pytest.fixture(autouse=True)
+def _config(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    initialize_config_manager()
+
+
+def test_detect_provider():
+    assert detect_provider("gpt-4o-mini") == AIProvider.OPENAI
+    assert detect_provider("claude-3-haiku") == AIProvider.CLAUDE
+    assert detect_provider("gemini-1.5-pro") == AIProvider.GEMINI
+    assert detect_provider("unknown-model") is None
+
+
+def test_load_meeting_definitions_json_and_jsonl(tmp_path):
+    json_path = tmp_path / "meetings.json"
+    json_path.write_text(json.dumps([{"query": "議題A"}, {"query": "議題B"}]), encoding="utf-8")
+    assert [d["query"] for d in cli.load_meeting_definitions(json_path)] == ["議題A", "議題B"]
+
+    jsonl_path = tmp_path / "meetings.jsonl"
+    jsonl_path.write_text('{"query": "議題A"}\n\n{"query": "議題B"}\n', encoding="utf-8")
+    assert [d["query"] for d in cli.load_meeting_definitions(jsonl_path)] == ["議題A", "議題B"]
+
+    broken_path = tmp_path / "broken.jsonl"
+    broken_path.write_text('{"query": "議題A"}\n{broken\n', encoding="utf-8")
+    with pytest.raises(ValueError):
+        cli.load_meeting_definitions(broken_path)
+
+
+def test_build_meeting_settings():
+    settings = cli.build_meeting_settings({
+        "query": "今後の方針",
+        "participants": ["gpt-4o", "claude:my-model", {"name": "gemini-pro", "persona": "研究者", "temperature": 0.2}],
+        "rounds": 2,
+    })
+    assert [m.provider for m in settings.participant_models] == [AIProvider.OPENAI, AIProvider.CLAUDE, AIProvider.GEMINI]
+    assert settings.participant_models[1].name == "my-model"
+    assert settings.participant_models[2].persona == "研究者"
+    assert settings.participant_models[2].temperature == 0.2
+    assert settings.moderator_model.name == "gpt-4o"
+    assert settings.rounds_per_ai == 2
+
+    with pytest.raises(ValueError):
+        cli.build_meeting_settings({"query": "今後の方針", "participants": ["unknown-model"]})
+    with pytest.raises(ValueError):
+        cli.build_meeting_settings({"participants": ["gpt-4o"]})
+
+
+@pytest.mark.asyncio
+async def test_batch_runner_caps_concurrency(monkeypatch):
+    monkeypatch.setattr(cli, "MeetingManager", FakeMeetingManager)
+    FakeMeetingManager.running = 0
+    FakeMeetingManager.max_running = 0
+    definitions = [{"id": f"m{i}", "query": f"議題{i}", "participants": ["gpt-4o"]} for i in range(6)]
+    definitions.append({"id": "bad", "query": "議題", "participants": ["unknown-model"]})
+
+    output = io.StringIO()
+    runner = cli.BatchRunner(concurrency=2, vector_store_dir=None)
+    records = await runner.run(definitions, output)
+
+    assert FakeMeetingManager.max_running == 2
+    assert [r["id"] for r in records] == [f"m{i}" for i in range(6)] + ["bad"]
+    assert all(r["status"] == "completed" for r in records[:6])
+    assert records[0]["result"]["final_summary"] == "議題0の要約"
+    assert records[-1]["status"] == "failed" and records[-1]["error"]
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(line["index"] for line in lines) == list(range(7))
+
+
+def test_main_writes_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "MeetingManager", FakeMeetingManager)
+    input_path = tmp_path / "meetings.jsonl"
+    input_path.write_text('{"query": "議題", "participants": ["gpt-4o"]}\n', encoding="utf-8")
+    output_path = tmp_path / "results.jsonl"
+
+    exit_code = cli.main([str(input_path), "-o", str(output_path), "--no-rag"])
+
+    assert exit_code == 0
+    record = json.loads(output_path.read_text(encoding="utf-8").strip())
+    assert record["status"] == "completed"
+
+
+def test_cli_does_not_import_flet():
+    repo_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    code = "import sys, core.cli; sys.exit(1 if 'flet' in sys.modules else 0)"
+    completed = subprocess.run([sys.executable, "-c", code], cwd=repo_root, capture_output=True)
+    assert completed.returncode == 0, completed.stderr.decode(errors="replace")
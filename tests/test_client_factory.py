@@ -0,0 +1,79 @@
+import logging
+import threading
+
+import pytest
+
+from core.client_factory import ClientFactory
+from core.config_manager import initialize_config_manager
+from core.models import AIProvider, AuxiliaryTask, ModelInfo
+
+
+@pytest.fixture
+def factory_env(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test-secret")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "")
+    monkeypatch.setenv("GOOGLE_API_KEY", "")
+    monkeypatch.setenv("CLIENT_CACHE_SIZE", "2")
+    monkeypatch.setenv("TASK_MODEL_ROUTING", '{"correction": "openai:gpt-4o-mini"}')
+    initialize_config_manager()
+    ClientFactory.clear_client_cache()
+    yield
+    ClientFactory.clear_client_cache()
+
+
+def model(name="gpt-4o", temperature=0.7, max_tokens=1000, persona=None):
+    return ModelInfo(name=name, provider=AIProvider.OPENAI, temperature=temperature, max_tokens=max_tokens, persona=persona)
+
+
+def test_clients_are_reused_per_model_settings(factory_env):
+    client = ClientFactory.create_client(model(persona="研究者"))
+    assert ClientFactory.create_client(model(persona="批評家")) is client
+    assert ClientFactory.create_client(model(temperature=0.2)) is not client
+    assert ClientFactory.create_client(model(max_tokens=500)) is not client
+    # 引数を指定した場合はキャッシュを使わない
+    assert ClientFactory.create_client(model(), default_timeout=5) is not client
+
+
+def test_cache_is_bounded_lru(factory_env):
+    first = ClientFactory.create_client(model("gpt-4o"))
+    second = ClientFactory.create_client(model("gpt-4o-mini"))
+    assert ClientFactory.create_client(model("gpt-4o")) is first
+    ClientFactory.create_client(model("gpt-4.1"))  # 最も使われていない gpt-4o-mini が追い出される
+    assert ClientFactory.create_client(model("gpt-4o")) is first
+    assert ClientFactory.create_client(model("gpt-4o-mini")) is not second
+
+
+def test_cache_is_dropped_when_config_is_reloaded(factory_env):
+    client = ClientFactory.create_client(model())
+    initialize_config_manager()
+    assert ClientFactory.create_client(model()) is not client
+
+
+def test_concurrent_creation_returns_one_client(factory_env):
+    results = []
+
+    def create():
+        results.append(ClientFactory.create_client(model()))
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in results}) == 1
+
+
+def test_prewarm_fills_cache(factory_env):
+    names = [m.name for m in ClientFactory.prewarm_models()]
+    assert names == ["gpt-4o-mini", "gpt-4o-mini"]
+
+    ClientFactory.prewarm().join()
+    default = ClientFactory.create_client(ClientFactory.prewarm_models()[0])
+    assert ClientFactory.create_task_client(AuxiliaryTask.CORRECTION) is not None
+    assert default is ClientFactory.create_client(ClientFactory.prewarm_models()[0])
+
+
+def test_api_key_is_not_logged(factory_env, caplog):
+    with caplog.at_level(logging.DEBUG, logger="core.client_factory"):
+        ClientFactory.create_client(model())
+    assert "sk-test-secret" not in caplog.text
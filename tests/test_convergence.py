@@ -0,0 +1,33 @@
+from core.convergence import ConvergenceTracker, char_ngrams, novelty
+
+
+def test_char_ngrams_ignore_whitespace_and_punctuation():
+    assert char_ngrams("人口 増加。") == char_ngrams("人口増加")
+    assert char_ngrams("ＡＩ活用") == char_ngrams("ai活用")
+    assert char_ngrams("") == set()
+
+
+def test_novelty_measures_unseen_ngrams():
+    prior = char_ngrams("地域の人口を増やすには子育て支援が重要です")
+    assert novelty("地域の人口を増やすには子育て支援が重要です", prior) == 0.0
+    assert novelty("観光資源を活かした雇用創出も必要です", prior) > 0.8
+
+
+def test_tracker_converges_after_low_novelty_rounds():
+    tracker = ConvergenceTracker(threshold=0.5, min_rounds=2, patience=1)
+    assert tracker.observe_round(["子育て支援を拡充すべきです", "交通網の整備が先決です"]) == 1.0
+    assert not tracker.has_converged(1)
+    tracker.observe_round(["子育て支援を拡充すべきです", "交通網の整備が先決です"])
+    assert tracker.has_converged(2)
+
+    tracker.observe_round(["企業誘致と大学連携で若年層の雇用を生み出しましょう"])
+    assert not tracker.has_converged(3)
+    assert tracker.observe_round([]) is None
+
+
+def test_tracker_respects_min_rounds_and_seed():
+    tracker = ConvergenceTracker(threshold=0.5, min_rounds=3, patience=1)
+    tracker.seed(["子育て支援を拡充すべきです"])
+    assert tracker.observe_round(["子育て支援を拡充すべきです"]) == 0.0
+    assert not tracker.has_converged(2)
+    assert tracker.has_converged(3)
@@ -0,0 +1,60 @@
+import core.conversation_ledger as conversation_ledger
+from core.conversation_ledger import ConversationLedger
+from core.models import ConversationEntry
+
+
+def _entry(speaker, content, round_number=1):
+    return ConversationEntry(
+        speaker=speaker, persona="persona", content=content,
+        round_number=round_number, model_name="m",
+    )
+
+
+def test_tokens_and_renderings_computed_once_on_append(monkeypatch):
+    calls = []
+
+    def fake_count(text, model_name="gpt-3.5-turbo"):
+        calls.append(text)
+        return 10
+
+    monkeypatch.setattr(conversation_ledger, "count_tokens", fake_count)
+    ledger = ConversationLedger()
+    for i in range(5):
+        ledger.append(_entry(f"s{i}", f"発言{i}"))
+    assert len(calls) == 10  # API用と要約用で1件につき2回
+
+    ledger.recent_valid(3)
+    ledger.newest_valid_within_budget(25, use_summary_form=True)
+    assert len(calls) == 10
+    assert ledger[0].api_text == "[スピーカー: s0 (役割: persona), ラウンド 1の発言]: 発言0"
+
+
+def test_recent_valid_skips_errors_and_respects_start(monkeypatch):
+    monkeypatch.setattr(conversation_ledger, "count_tokens", lambda text, model_name="": 1)
+    ledger = ConversationLedger()
+    ledger.append(_entry("A", "a1"))
+    ledger.append(_entry("B", "エラーにより発言できませんでした: X"), is_error=True)
+    ledger.append(_entry("司会AI", "要約", 1), is_round_summary=True)
+    ledger.append(_entry("A", "a2", 2))
+
+    assert [r.entry.content for r in ledger.recent_valid(10)] == ["a1", "要約", "a2"]
+    assert [r.entry.content for r in ledger.recent_valid(2)] == ["要約", "a2"]
+    assert [r.entry.content for r in ledger.recent_valid(10, start=3)] == ["a2"]
+    assert [r.entry.content for r in ledger.round_summaries()] == ["要約"]
+
+
+def test_newest_valid_within_budget(monkeypatch):
+    monkeypatch.setattr(conversation_ledger, "count_tokens", lambda text, model_name="": 10)
+    ledger = ConversationLedger()
+    for i in range(5):
+        ledger.append(_entry("A", f"c{i}"))
+
+    records, truncated = ledger.newest_valid_within_budget(25)
+    assert [r.entry.content for r in records] == ["c3", "c4"]
+    assert truncated
+
+    records, truncated = ledger.newest_valid_within_budget(5)
+    assert [r.entry.content for r in records] == ["c4"]  # 最新の1件は必ず含める
+
+    records, truncated = ledger.newest_valid_within_budget(0)
+    assert len(records) == 5 and not truncated
@@ -1,4 +1,4 @@
-from core.document_processor import DocumentProcessor
+from core.document_processor import DocumentProcessor, build_extractive_digest
 from core.models import AppConfig, ModelInfo, AIProvider
 from core.utils import extract_content_and_tokens
 from types import SimpleNamespace
@@ -96,3 +96,54 @@ async def test_summarize_document_for_meeting_with_various_providers(provider, r
     assert summary.tokens_used == expected_tokens
     assert summary.summary_length == len(expected_content)
 
+
+
+class CountingClient(DummyClient):
+    def __init__(self, name: str, content: str):
+        super().__init__(
+            AIProvider.OPENAI,
+            SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                usage=SimpleNamespace(total_tokens=1),
+            ),
+        )
+        self.model_info = ModelInfo(name=name, provider=AIProvider.OPENAI)
+        self.calls = 0
+
+    async def request_completion(self, *args, **kwargs):
+        self.calls += 1
+        return self._response
+
+
+@pytest.mark.asyncio
+async def test_long_document_chunks_use_chunk_summarizer(monkeypatch):
+    import core.document_processor as document_processor
+
+    monkeypatch.setattr(document_processor, "count_tokens", lambda text, model_name="": 5000)
+    monkeypatch.setattr(document_processor, "chunk_text", lambda text, max_chunk_size, overlap: ["a", "b", "c"])
+    processor = DocumentProcessor(AppConfig(summarization_target_tokens=10))
+    summarizer = CountingClient("flagship", "final")
+    chunk_summarizer = CountingClient("fast", "chunk")
+
+    summary = await processor.summarize_document_for_meeting(
+        "x" * 100, summarizer, chunk_summarizer_ai_client=chunk_summarizer
+    )
+
+    assert summary.summary == "final"
+    assert chunk_summarizer.calls == 3
+    assert summarizer.calls == 1
+    assert summary.tokens_used == 4
+
+
+def test_extractive_digest_samples_paragraph_leads_within_budget():
+    text = "\n\n".join(f"段落{i}の冒頭です。段落{i}の詳細です。" for i in range(100))
+    digest = build_extractive_digest(text, 200)
+    lines = digest.split("\n")
+    assert len(digest) <= 200
+    assert lines[0] == "段落0の冒頭です。"
+    assert all("詳細" not in line for line in lines)
+    # 先頭に偏らず資料全体から選ぶ
+    assert int(lines[-1][2:].split("の")[0]) > 50
+
+    assert build_extractive_digest("短い資料です。二文目です。", 200) == "短い資料です。\n二文目です。"
+    assert build_extractive_digest("", 200) == ""
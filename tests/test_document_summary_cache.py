@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+from core.config_manager import initialize_config_manager
+from core.document_processor import ExtractionResult
+from core.document_summary_cache import DocumentSummaryCache, summary_cache_key
+from core.meeting_manager import MeetingManager, ParticipantInfo
+from core.models import AIProvider, DocumentSummary, ModelInfo
+from core.utils import generate_file_hash
+
+
+MODERATOR = ModelInfo(name="gpt-4o", provider=AIProvider.OPENAI)
+
+
+class CountingProcessor:
+    """抽出・要約の回数を数えるダミーの DocumentProcessor"""
+
+    def __init__(self):
+        self.extractions = 0
+        self.summaries = 0
+
+    def extract_text(self, path):
+        self.extractions += 1
+        return ExtractionResult(extracted_text="資料の本文です。" * 10, metadata={})
+
+    async def summarize_document_for_meeting(self, text, client, chunk_summarizer_ai_client=None):
+        self.summaries += 1
+        return DocumentSummary(original_length=len(text), summary="資料の要約です。", tokens_used=321)
+
+
+def make_manager(processor, store_dir):
+    manager = MeetingManager(document_processor=processor, document_store_dir=str(store_dir))
+    manager.moderator = ParticipantInfo(
+        client=None, name="mod", internal_key="mod", persona="mod", model_info=MODERATOR,
+    )
+
+    async def no_correction(content, client, provider, context_for_correction):
+        return content, 0
+
+    manager._ensure_japanese_output = no_correction
+    return manager
+
+
+def test_key_changes_with_model_target_and_prompt_version():
+    key = summary_cache_key("abc", MODERATOR, 500, 1)
+    assert key == summary_cache_key("abc", MODERATOR, 500, 1, chunk_summarizer=MODERATOR)
+    assert key != summary_cache_key("abd", MODERATOR, 500, 1)
+    assert key != summary_cache_key("abc", ModelInfo(name="gpt-4o-mini", provider=AIProvider.OPENAI), 500, 1)
+    assert key != summary_cache_key("abc", MODERATOR, 800, 1)
+    assert key != summary_cache_key("abc", MODERATOR, 500, 2)
+    assert key != summary_cache_key(
+        "abc", MODERATOR, 500, 1, chunk_summarizer=ModelInfo(name="gpt-4o-mini", provider=AIProvider.OPENAI)
+    )
+
+
+def test_store_and_load(tmp_path):
+    cache = DocumentSummaryCache(str(tmp_path / "store"))
+    assert cache.load("k") is None
+    summary = DocumentSummary(original_length=100, summary="要約", tokens_used=50)
+    cache.store("k", summary)
+    assert cache.load("k") == summary
+
+    (tmp_path / "store" / "summary-broken.json").write_text("{", encoding="utf-8")
+    assert cache.load("broken") is None
+
+
+@pytest.mark.asyncio
+async def test_second_meeting_reuses_summary(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOCUMENT_SUMMARY_CACHE_ENABLED", "true")
+    initialize_config_manager()
+    document = tmp_path / "doc.txt"
+    document.write_text("資料", encoding="utf-8")
+    processor = CountingProcessor()
+
+    first = await make_manager(processor, tmp_path / "stores")._process_document(str(document))
+    assert first.tokens_used == 321
+    assert list((tmp_path / "stores" / generate_file_hash(str(document))).glob("summary-*.json"))
+
+    second_manager = make_manager(processor, tmp_path / "stores")
+    second = await second_manager._process_document(str(document))
+    assert second.summary == first.summary
+    assert second.tokens_used == 0
+    assert second_manager.state.total_tokens_this_meeting == 0
+    assert (processor.extractions, processor.summaries) == (1, 1)
+
+    # 資料が変われば要約し直す
+    document.write_text("改訂した資料", encoding="utf-8")
+    await make_manager(processor, tmp_path / "stores")._process_document(str(document))
+    assert processor.summaries == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_can_be_disabled(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOCUMENT_SUMMARY_CACHE_ENABLED", "false")
+    initialize_config_manager()
+    document = tmp_path / "doc.txt"
+    document.write_text("資料", encoding="utf-8")
+    processor = CountingProcessor()
+    for _ in range(2):
+        await make_manager(processor, tmp_path / "stores")._process_document(str(document))
+    assert processor.summaries == 2
+    assert not (tmp_path / "stores").exists()
+
+
+@pytest.mark.asyncio
+async def test_progressive_mode_starts_with_digest_and_swaps_in_summary(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROGRESSIVE_DOCUMENT_SUMMARY", "true")
+    initialize_config_manager()
+    document = tmp_path / "doc.txt"
+    document.write_text("資料", encoding="utf-8")
+    release = asyncio.Event()
+
+    class SlowProcessor(CountingProcessor):
+        async def summarize_document_for_meeting(self, text, client, chunk_summarizer_ai_client=None):
+            await release.wait()
+            return await super().summarize_document_for_meeting(text, client, chunk_summarizer_ai_client)
+
+    processor = SlowProcessor()
+    manager = make_manager(processor, tmp_path / "stores")
+    loaded = manager._load_document(str(document), MODERATOR)
+    digest = await manager._digest_and_summarize_document(str(document), loaded)
+    assert digest.summary.startswith("資料の本文です。") and digest.tokens_used == 0
+    manager._system_prompt_context = manager._build_initial_context("議題", digest)
+
+    # 要約が終わるまではラウンドの区切りでも抜粋のまま
+    manager._swap_in_document_summary("議題", 2)
+    assert "資料の要約です。" not in manager._system_prompt_context
+
+    release.set()
+    await asyncio.sleep(0.01)
+    manager._swap_in_document_summary("議題", 3)
+    assert "資料の要約です。" in manager._system_prompt_context
+    assert manager.state.document_summary_swapped_at_round == 3
+
+    full_summary = await manager._finish_document_summary(digest)
+    assert full_summary.summary == "資料の要約です。" and full_summary.tokens_used == 321
+    assert "processing_document" in manager.state.phase_timings
+
+
+@pytest.mark.asyncio
+async def test_failed_background_summary_keeps_digest_without_meeting_error(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROGRESSIVE_DOCUMENT_SUMMARY", "true")
+    initialize_config_manager()
+    document = tmp_path / "doc.txt"
+    document.write_text("資料", encoding="utf-8")
+    release = asyncio.Event()
+
+    class FailingProcessor(CountingProcessor):
+        async def summarize_document_for_meeting(self, text, client, chunk_summarizer_ai_client=None):
+            await release.wait()
+            raise RuntimeError("要約APIが失敗しました")
+
+    manager = make_manager(FailingProcessor(), tmp_path / "stores")
+    loaded = manager._load_document(str(document), MODERATOR)
+    digest = await manager._digest_and_summarize_document(str(document), loaded)
+    manager._update_phase("discussing")
+    phases, errors = [], []
+    manager.on_phase_changed = lambda phase, elapsed=None: phases.append(phase)
+    manager.on_error = errors.append
+
+    # 議論の途中で要約が失敗しても、会議のフェーズ・エラーは変わらない
+    release.set()
+    await asyncio.sleep(0.01)
+    manager._swap_in_document_summary("議題", 2)
+    assert await manager._finish_document_summary(digest) == digest
+    assert manager.state.phase == "discussing"
+    assert manager.state.error_message is None
+    assert errors == []
+    assert phases == ["processing_document"]  # 所要時間の通知のみ
+    assert manager.state.document_summary_swapped_at_round is None
@@ -0,0 +1,198 @@
+import asyncio
+import random
+
+import pytest
+
+import core.meeting_manager as meeting_manager
+from core.api_clients import FakeClient
+from core.api_clients.fake_client import reset_fake_quotas
+from core.client_factory import ClientFactory
+from core.config_manager import initialize_config_manager
+from core.exceptions import APIStatusError, RateLimitError
+from core.meeting_manager import MeetingManager
+from core.models import AIProvider, FakeProviderSettings, MeetingSettings, ModelInfo, ProviderRateLimit
+from core.rate_scheduler import ProviderRateScheduler
+from core.retry_policy import AdaptiveConcurrencyLimiter, CircuitBreaker, RetryPolicy
+from core.utils import detect_provider, extract_content_and_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(max_retries=0, clock=None, max_tokens=1000, **settings):
+    """(クライアント, 応答待ちの秒数, リトライ待ちの秒数)"""
+    latency_sleeps = []
+    retry_sleeps = []
+
+    async def latency_sleep(seconds):
+        latency_sleeps.append(seconds)
+
+    async def retry_sleep(seconds):
+        retry_sleeps.append(seconds)
+
+    client = FakeClient(
+        api_key="fake",
+        model_info=ModelInfo(name="fake-model", provider=AIProvider.FAKE, max_tokens=max_tokens),
+        settings=FakeProviderSettings(**settings),
+        sleep=latency_sleep,
+        clock=clock or FakeClock(),
+        rate_scheduler=ProviderRateScheduler("test", ProviderRateLimit()),
+        retry_policy=RetryPolicy(max_retries=max_retries, rng=random.Random(0), sleep=retry_sleep),
+        concurrency_limiter=AdaptiveConcurrencyLimiter("test", max_limit=8),
+        circuit_breaker=CircuitBreaker("test", failure_threshold=5),
+    )
+    return client, latency_sleeps, retry_sleeps
+
+
+@pytest.fixture(autouse=True)
+def _reset_quotas():
+    reset_fake_quotas()
+    yield
+    reset_fake_quotas()
+
+
+@pytest.mark.asyncio
+async def test_seeded_responses_are_reproducible():
+    first, _, _ = make_client(seed=7, latency_distribution="uniform")
+    second, _, _ = make_client(seed=7, latency_distribution="uniform")
+    a = await first.request_completion("質問")
+    b = await second.request_completion("質問")
+    assert a.choices[0].message.content == b.choices[0].message.content
+
+    content, tokens = extract_content_and_tokens(AIProvider.FAKE, a)
+    assert content
+    assert tokens == a.usage.prompt_tokens + a.usage.completion_tokens
+    assert 80 <= a.usage.completion_tokens
+
+
+@pytest.mark.asyncio
+async def test_language_and_length_settings():
+    english, _, _ = make_client(seed=1, language="en")
+    response = await english.request_completion("question")
+    assert response.choices[0].message.content.isascii()
+
+    short, _, _ = make_client(seed=1, max_tokens=30, output_tokens_min=500, output_tokens_max=800)
+    response = await short.request_completion("質問")
+    assert response.usage.completion_tokens <= 30
+    assert response.choices[0].finish_reason == "length"
+
+    # 最初の文だけで上限を超える場合も空にせず、上限までで打ち切る
+    tiny, _, _ = make_client(seed=1, max_tokens=3, output_tokens_min=500, output_tokens_max=800)
+    response = await tiny.request_completion("質問")
+    assert response.choices[0].message.content
+    assert 0 < response.usage.completion_tokens <= 3
+    assert response.choices[0].finish_reason == "length"
+
+
+@pytest.mark.asyncio
+async def test_latency_distribution_is_applied():
+    client, sleeps, _ = make_client(latency_distribution="fixed", latency_mean_seconds=1.5)
+    await client.request_completion("質問")
+    assert sleeps == [1.5]
+
+    client, sleeps, _ = make_client(seed=3, latency_distribution="lognormal", latency_mean_seconds=0.5, latency_spread=0.8)
+    for _ in range(200):
+        await client.request_completion("質問")
+    assert 0.3 < sum(sleeps) / len(sleeps) < 0.8
+    assert max(sleeps) > 2 * min(sleeps)
+
+
+@pytest.mark.asyncio
+async def test_streaming_splits_latency_across_deltas():
+    client, sleeps, _ = make_client(seed=2, latency_distribution="fixed", latency_mean_seconds=2.0, first_token_fraction=0.25)
+    deltas = []
+    response = await client.request_completion_stream("質問", on_delta=deltas.append)
+    assert "".join(deltas) == response.choices[0].message.content
+    assert sleeps[0] == pytest.approx(0.5)
+    assert sum(sleeps) == pytest.approx(2.0)
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_go_through_retry_policy():
+    client, _, sleeps = make_client(max_retries=2, seed=0, error_rate=1.0, latency_mean_seconds=0)
+    with pytest.raises(APIStatusError):
+        await client.request_completion("質問")
+    assert client.calls == 3
+    assert len(sleeps) == 2
+
+    client, _, _ = make_client(seed=0, rate_limit_rate=1.0, retry_after_seconds=4.0, latency_mean_seconds=0)
+    with pytest.raises(RateLimitError):
+        await client.request_completion("質問")
+    assert client.concurrency_limiter.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_requests_per_minute_quota_returns_429_with_retry_after():
+    clock = FakeClock()
+    client, _, sleeps = make_client(max_retries=1, clock=clock, requests_per_minute=2, latency_mean_seconds=0)
+    client.retry_policy.max_delay_seconds = 60.0  # Retry-After は max_delay_seconds までしか待たない
+    await client.request_completion("質問")
+    clock.now = 10.0
+    await client.request_completion("質問")
+    with pytest.raises(RateLimitError):
+        await client.request_completion("質問")
+    # Retry-After（先頭のリクエストが1分を過ぎるまでの50秒）に従って待ってから再試行する
+    assert 50.0 <= sleeps[-1] <= 51.0
+    # 残り枠が少ないヘッダーを受けて同時送信数を絞っている
+    assert client.concurrency_limiter.limit < 8
+
+
+def test_detect_provider_and_factory(monkeypatch):
+    monkeypatch.setenv("FAKE_PROVIDER_ENABLED", "1")
+    monkeypatch.setenv("FAKE_PROVIDER", '{"latency_mean_seconds": 0, "seed": 5}')
+    config_manager = initialize_config_manager()
+    ClientFactory.clear_client_cache()
+    assert detect_provider("fake-model") == AIProvider.FAKE
+    assert config_manager.get_api_key(AIProvider.FAKE) == "fake"
+    client = ClientFactory.create_client(ModelInfo(name="fake-model", provider=AIProvider.FAKE))
+    assert isinstance(client, FakeClient)
+    assert client.settings.seed == 5
+    ClientFactory.clear_client_cache()
+
+    monkeypatch.setenv("FAKE_PROVIDER_ENABLED", "0")
+    config_manager = initialize_config_manager()
+    assert not config_manager.is_api_key_configured(AIProvider.FAKE)
+
+
+@pytest.mark.asyncio
+async def test_full_meeting_runs_offline(monkeypatch, tmp_path):
+    monkeypatch.setenv("FAKE_PROVIDER_ENABLED", "1")
+    monkeypatch.setenv("FAKE_PROVIDER", '{"latency_mean_seconds": 0, "seed": 1, "output_tokens_max": 120}')
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("MEETING_JOURNAL_DIR", str(tmp_path))
+    monkeypatch.setattr(meeting_manager, "save_carry_over", lambda topic, issues: None)
+    initialize_config_manager()
+    ClientFactory.clear_client_cache()
+
+    settings = MeetingSettings(
+        participant_models=[
+            ModelInfo(name="fake-model", provider=AIProvider.FAKE, persona="研究者"),
+            ModelInfo(name="fake-model-fast", provider=AIProvider.FAKE, persona="批評家"),
+        ],
+        moderator_model=ModelInfo(name="fake-model", provider=AIProvider.FAKE, persona="司会"),
+        rounds_per_ai=2,
+        user_query="在宅勤務の生産性について",
+    )
+    manager = MeetingManager()
+    phase_events = []
+    manager.on_phase_changed = lambda phase, elapsed=None: phase_events.append((phase, elapsed))
+    result = await manager.run_meeting(settings)
+    ClientFactory.clear_client_cache()
+
+    # 会議開始前のフェーズは所要時間つきでも通知され、統計にも残る
+    finished = {phase for phase, elapsed in phase_events if elapsed is not None}
+    assert "initializing_participants" in finished
+    statistics = manager.get_meeting_statistics()
+    assert "initializing_participants" in statistics["phase_timings"]
+    assert statistics["time_to_first_statement_seconds"] is not None
+
+    assert result.participants_count == 2
+    assert result.final_summary
+    statements = [entry for entry in result.conversation_log if entry.speaker != "司会AI"]
+    assert len(statements) == 4
+    assert result.total_tokens_used > 0
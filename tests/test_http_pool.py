@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.api_clients import ClaudeClient, OpenAIClient
+from core.http_pool import get_async_http_client, get_sync_http_client, http_pool_stats, reset_http_pools
+from core.models import AIProvider, ModelInfo
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    httpd.client_ports = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _reset_pools():
+    reset_http_pools()
+    yield
+    reset_http_pools()
+
+
+def test_requests_reuse_connections_within_an_event_loop(server):
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    async def run():
+        # 別々に取得したクライアントでも同じプールを使う
+        for _ in range(5):
+            response = await get_async_http_client(AIProvider.OPENAI, "key").get(url)
+            assert response.text == "ok"
+
+    asyncio.run(run())
+    assert len(server.client_ports) == 1
+
+    # 別のイベントループからは、そのループ用のプールで接続する
+    asyncio.run(run())
+    stats = http_pool_stats()
+    assert len(stats) == 1
+    pool = next(iter(stats.values()))
+    assert pool["requests"] == 10
+    assert pool["pools_created"] == 2
+
+
+def test_pools_are_keyed_by_provider_and_api_key():
+    shared = get_async_http_client(AIProvider.OPENAI, "key-a")
+    assert get_async_http_client(AIProvider.OPENAI, "key-a") is shared
+    assert get_async_http_client(AIProvider.OPENAI, "key-b") is not shared
+    assert get_async_http_client(AIProvider.CLAUDE, "key-a") is not shared
+    assert get_sync_http_client(AIProvider.OPENAI, "key-a") is get_sync_http_client(AIProvider.OPENAI, "key-a")
+    assert all("key-a" not in name for name in http_pool_stats())
+
+
+def test_sdk_clients_share_the_pool():
+    model = ModelInfo(name="gpt-4o", provider=AIProvider.OPENAI)
+    first = OpenAIClient(api_key="key", model_info=model)
+    second = OpenAIClient(api_key="key", model_info=model)
+    assert first.async_client._client is second.async_client._client
+
+    claude_model = ModelInfo(name="claude-3-haiku-20240307", provider=AIProvider.CLAUDE)
+    first_claude = ClaudeClient(api_key="key", model_info=claude_model)
+    second_claude = ClaudeClient(api_key="key", model_info=claude_model)
+    assert first_claude.async_client_instance._client is second_claude.async_client_instance._client
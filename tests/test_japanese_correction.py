@@ -0,0 +1,47 @@
+from core.japanese_correction import (
+    build_span_correction_prompt,
+    parse_span_corrections,
+    splice_corrections,
+)
+from core.japanese_detector import detect_japanese
+
+
+TEXT = "まず現状を整理します。However, we should also consider the long-term impact.\n次に対策を述べます。"
+
+
+def test_prompt_contains_only_flagged_sentence_as_target():
+    flagged = detect_japanese(TEXT).flagged_sentences
+    prompt = build_span_correction_prompt(TEXT, flagged)
+    assert "【修正対象】: However, we should also consider the long-term impact." in prompt
+    assert "前の文脈: まず現状を整理します。" in prompt
+    assert "後の文脈: 次に対策を述べます。" in prompt
+
+
+def test_parse_span_corrections_requires_every_item():
+    assert parse_span_corrections("[1] 一つ目\n[2] 二つ目\n続き", 2) == ["一つ目", "二つ目続き"]
+    assert parse_span_corrections("[1] 一つ目", 2) is None
+    assert parse_span_corrections("修正しました。", 1) is None
+
+
+def test_splice_keeps_surrounding_text_and_newlines():
+    flagged = detect_japanese(TEXT).flagged_sentences
+    corrected = splice_corrections(TEXT, flagged, ["しかし、長期的な影響も考慮すべきです。"])
+    assert corrected == "まず現状を整理します。しかし、長期的な影響も考慮すべきです。\n次に対策を述べます。"
+
+
+def test_splice_restores_terminator_and_drops_ascii_separator():
+    text = "まず現状を整理します。Therefore we should review the plan carefully. 次に進みます。"
+    flagged = detect_japanese(text).flagged_sentences
+    assert len(flagged) == 1
+    expected = "まず現状を整理します。計画を慎重に見直すべきです。次に進みます。"
+    # 修正文に句点がない場合は元の文末を付け、半角の句点は「。」にする
+    assert splice_corrections(text, flagged, ["計画を慎重に見直すべきです"]) == expected
+    assert splice_corrections(text, flagged, ["計画を慎重に見直すべきです."]) == expected
+
+    # 続く文も修正対象の場合、その文の先頭の空白も取り除く
+    text = "まず現状を整理します。First we should review the plan. Then we should move on to the next topic!"
+    flagged = detect_japanese(text).flagged_sentences
+    assert len(flagged) == 2
+    assert splice_corrections(text, flagged, ["まず計画を見直すべきです", "次の議題に進むべきです"]) == (
+        "まず現状を整理します。まず計画を見直すべきです。次の議題に進むべきです！"
+    )
@@ -0,0 +1,60 @@
+import pytest
+
+from core.japanese_detector import detect_japanese
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "詳細は https://example.com/reports/2024/ai-adoption-survey.html を参照してください。",
+        "`pip install -r requirements.txt` を実行してから `python main.py` で起動します。",
+        "設定例:\n```python\nclient = OpenAI(api_key=os.environ['OPENAI_API_KEY'])\n```\nこのように初期化します。",
+        "- KPI: MAU 45,000 / DAU 12,000\n- 売上: 1,200万円 (前年比 +15.3%)",
+        "GDPR (General Data Protection Regulation) とCCPAへの対応が必要です。",
+        "問い合わせ先は support@example.co.jp です。",
+        "",
+    ],
+)
+def test_legitimate_japanese_is_not_flagged(text):
+    assert not detect_japanese(text).needs_correction
+
+
+def test_flags_only_the_foreign_sentence_with_offsets():
+    text = "まず現状を整理します。However, we should also consider the long-term impact.\n次に対策を述べます。"
+    result = detect_japanese(text)
+    assert [s.is_japanese for s in result.sentences] == [True, False, True]
+    flagged = result.flagged_sentences[0]
+    assert flagged.reason == "latin"
+    assert text[flagged.start:flagged.end] == flagged.text
+    assert flagged.text.startswith("However")
+
+
+@pytest.mark.parametrize(
+    "text,reason",
+    [
+        ("農業 인구 감소 문제를 해결하기 위해 스마트 농업을 도입해야 합니다.", "other_script"),
+        ("我们应该重视人工智能技术在农业领域的应用与发展前景问题研究", "kanji_only"),
+        ("This proposal focuses on cost reduction and efficiency.", "latin"),
+    ],
+)
+def test_foreign_text_is_flagged(text, reason):
+    result = detect_japanese(text)
+    assert result.needs_correction
+    assert result.flagged_sentences[0].reason == reason
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "議題について賛成の立場です。理由は三つあります。",
+        "我们应该重视人工智能技术在农业领域的应用与发展前景问题研究",
+        "日本の農業では人手不足が深刻です。我们应该重视人工智能技术在农业领域的应用与发展前景问题研究。",
+        "漢字の多い見出し：地域農業活性化推進事業費補助金交付要綱改正案について",
+        "略語のみ: AI, KPI, ROI。v1.2 を採用します。",
+        "農業 인구 감소 문제를",
+    ],
+)
+def test_whole_text_precheck_matches_sentence_verdicts(text):
+    result = detect_japanese(text)
+    assert result.needs_correction == any(not s.is_japanese for s in result.sentences)
+    assert len(result.flagged_sentences) == sum(not s.is_japanese for s in result.sentences)
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.api_clients import LocalClient
+from core.client_factory import ClientFactory
+from core.config_manager import initialize_config_manager
+from core.http_pool import reset_http_pools
+from core.models import AIProvider, ModelInfo
+from core.utils import detect_provider, extract_content_and_tokens
+
+
+class OpenAICompatibleHandler(BaseHTTPRequestHandler):
+    """/v1/models と /v1/chat/completions だけを返すスタブサーバー（usage は返さない）"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.authorizations.append(self.headers.get("Authorization"))
+        if self.path == "/v1/models":
+            self._send_json({"object": "list", "data": [
+                {"id": "llama3.1:8b", "object": "model", "created": 0, "owned_by": "local"},
+                {"id": "qwen2.5:7b", "object": "model", "created": 0, "owned_by": "local"},
+            ]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(request)
+        text = "ローカルモデルの回答です"
+        if not request.get("stream"):
+            self._send_json({
+                "id": "chatcmpl-local", "object": "chat.completion", "created": 0, "model": request["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            })
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for delta in ("ローカル", "モデルの回答です"):
+            chunk = {
+                "id": "chatcmpl-local", "object": "chat.completion.chunk", "created": 0, "model": request["model"],
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server(monkeypatch):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), OpenAICompatibleHandler)
+    httpd.requests = []
+    httpd.authorizations = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("LOCAL_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}/v1")
+    monkeypatch.setenv("LOCAL_API_KEY", "")
+    monkeypatch.setenv("LOCAL_MODELS", "")
+    reset_http_pools()
+    ClientFactory.clear_client_cache()
+    yield httpd
+    ClientFactory.clear_client_cache()
+    reset_http_pools()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_local_provider_is_configured_from_base_url(local_server):
+    config_manager = initialize_config_manager()
+    assert config_manager.is_api_key_configured(AIProvider.LOCAL)
+    assert AIProvider.LOCAL in config_manager.get_configured_providers()
+    assert config_manager.get_model_names_for_provider(AIProvider.LOCAL) == ["llama3.1:8b", "qwen2.5:7b"]
+    assert config_manager.get_default_model_for_provider(AIProvider.LOCAL) == "llama3.1:8b"
+    # 一覧は一度だけ取得する
+    config_manager.get_model_names_for_provider(AIProvider.LOCAL)
+    assert local_server.authorizations == ["Bearer local"]
+
+
+def test_configured_model_names_skip_discovery(local_server, monkeypatch):
+    monkeypatch.setenv("LOCAL_MODELS", "my-model, other-model")
+    config_manager = initialize_config_manager()
+    assert config_manager.get_model_names_for_provider(AIProvider.LOCAL) == ["my-model", "other-model"]
+    assert local_server.authorizations == []
+
+
+def test_local_provider_is_not_configured_without_base_url(monkeypatch):
+    monkeypatch.setenv("LOCAL_BASE_URL", "")
+    config_manager = initialize_config_manager()
+    assert not config_manager.is_api_key_configured(AIProvider.LOCAL)
+    assert config_manager.get_model_names_for_provider(AIProvider.LOCAL) == []
+    assert config_manager.get_api_key(AIProvider.LOCAL) is None
+
+
+def test_detect_provider_prefers_local_models():
+    assert detect_provider("gpt-oss-20b", local_models=["gpt-oss-20b"]) == AIProvider.LOCAL
+    assert detect_provider("gpt-oss-20b") == AIProvider.OPENAI
+    assert detect_provider("llama3.1:8b", local_models=["llama3.1:8b"]) == AIProvider.LOCAL
+
+
+def test_completion_against_stub_server_estimates_usage(local_server):
+    initialize_config_manager()
+    client = ClientFactory.create_client(ModelInfo(name="llama3.1:8b", provider=AIProvider.LOCAL, max_tokens=200))
+    assert isinstance(client, LocalClient)
+
+    response = asyncio.run(client.request_completion("こんにちは", system_message="日本語で答えてください"))
+    content, tokens = extract_content_and_tokens(AIProvider.LOCAL, response)
+    assert content == "ローカルモデルの回答です"
+    assert tokens > 0
+    assert response.usage.total_tokens == response.usage.prompt_tokens + response.usage.completion_tokens
+
+    sent = local_server.requests[0]
+    assert sent["model"] == "llama3.1:8b"
+    assert sent["max_tokens"] == 200
+    assert [m["role"] for m in sent["messages"]] == ["system", "user"]
+
+
+def test_streaming_against_stub_server(local_server):
+    initialize_config_manager()
+    client = ClientFactory.create_client(ModelInfo(name="qwen2.5:7b", provider=AIProvider.LOCAL))
+    deltas = []
+
+    response = asyncio.run(client.request_completion_stream("こんにちは", on_delta=deltas.append))
+    assert "".join(deltas) == "ローカルモデルの回答です"
+    assert extract_content_and_tokens(AIProvider.LOCAL, response)[1] > 0
+    assert asyncio.run(client.list_models()) == ["llama3.1:8b", "qwen2.5:7b"]
@@ -0,0 +1,125 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import core.meeting_manager as meeting_manager
+from core.config_manager import initialize_config_manager
+from core.meeting_journal import MeetingJournal, load_journal, RECORD_ENTRY, RECORD_MEETING_STARTED
+from core.meeting_manager import MeetingManager
+from core.models import AIProvider, MeetingSettings, ModelInfo
+
+
+class SimulatedCrash(BaseException):
+    """プロセスの強制終了を模擬する（except Exception で捕捉されない）"""
+
+
+class CountingClient:
+    def __init__(self, calls, crash_on_call=None):
+        self.calls = calls
+        self.crash_on_call = crash_on_call
+        self.model_info = ModelInfo(name="mod", provider=AIProvider.OPENAI)
+
+    async def request_completion(self, user_message, **kwargs):
+        self.calls.append(user_message)
+        if self.crash_on_call is not None and len(self.calls) == self.crash_on_call:
+            raise SimulatedCrash()
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"{len(self.calls)}回目の日本語の応答です。"))],
+            usage=SimpleNamespace(total_tokens=10),
+        )
+
+
+SETTINGS = MeetingSettings(
+    participant_models=[
+        ModelInfo(name="model0", provider=AIProvider.OPENAI, persona="p0"),
+        ModelInfo(name="model1", provider=AIProvider.OPENAI, persona="p1"),
+    ],
+    moderator_model=ModelInfo(name="mod", provider=AIProvider.OPENAI, persona="m"),
+    rounds_per_ai=2,
+    user_query="地域医療の今後",
+)
+
+
+@pytest.fixture
+def journal_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("API_CALL_DELAY_SECONDS", "0")
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("STREAMING_ENABLED", "false")
+    monkeypatch.setenv("MEETING_JOURNAL_DIR", str(tmp_path / "journals"))
+    initialize_config_manager()
+    monkeypatch.setattr(meeting_manager, "save_carry_over", lambda *args, **kwargs: None)
+
+    def use_client(client):
+        monkeypatch.setattr(
+            meeting_manager.ClientFactory, "create_client", lambda model_info, **kwargs: client
+        )
+    return use_client
+
+
+def test_load_journal_ignores_truncated_last_line(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = MeetingJournal(path)
+    journal.append(RECORD_MEETING_STARTED, settings=SETTINGS.model_dump(mode="json"), carry_over_context=None)
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "entry", "entry": {"speak')
+
+    snapshot = load_journal(path)
+    assert snapshot.settings.user_query == "地域医療の今後"
+    assert snapshot.entries == []
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("\n" + json.dumps({"type": "phase", "phase": "discussing"}) + "\n")
+    with pytest.raises(ValueError):
+        load_journal(path)
+
+
+@pytest.mark.asyncio
+async def test_resume_continues_from_last_committed_turn(journal_env):
+    calls = []
+    # 1ラウンド目の発言2件と司会要約の後、2ラウンド目の最初の発言中に終了する
+    journal_env(CountingClient(calls, crash_on_call=4))
+    crashed = MeetingManager(document_processor=object())
+    with pytest.raises(SimulatedCrash):
+        await crashed.run_meeting(SETTINGS)
+    journal_path = crashed.journal_path
+    committed = [entry.content for entry in crashed.state.conversation_history]
+    assert len(committed) == 3
+
+    resumed_calls = []
+    journal_env(CountingClient(resumed_calls))
+    resumed = MeetingManager(document_processor=object())
+    result = await resumed.resume_meeting(journal_path)
+
+    # 2ラウンド目の発言2件・司会要約・最終要約のみを新たに呼び出す
+    assert len(resumed_calls) == 4
+    assert resumed.state.phase == "completed"
+    assert [entry.content for entry in result.conversation_log[:3]] == committed
+    assert len(result.conversation_log) == 6
+    assert all(p.round_count == 2 for p in resumed.participants.values())
+    assert result.total_tokens_used == 70
+
+    snapshot = load_journal(journal_path)
+    assert snapshot.completed_rounds == 2
+    assert snapshot.final_summary == result.final_summary
+    assert len([e for e in snapshot.entries if not e.is_round_summary]) == 4
+
+
+@pytest.mark.asyncio
+async def test_resume_of_completed_meeting_makes_no_provider_calls(journal_env):
+    calls = []
+    journal_env(CountingClient(calls))
+    manager = MeetingManager(document_processor=object())
+    first = await manager.run_meeting(SETTINGS)
+    assert len(calls) == 7
+
+    replay_calls = []
+    journal_env(CountingClient(replay_calls))
+    replayed = await MeetingManager(document_processor=object()).resume_meeting(manager.journal_path)
+
+    assert replay_calls == []
+    assert replayed.final_summary == first.final_summary
+    assert [e.content for e in replayed.conversation_log] == [e.content for e in first.conversation_log]
+    with open(manager.journal_path, encoding="utf-8") as f:
+        assert sum(1 for line in f if json.loads(line)["type"] == RECORD_ENTRY) == 6
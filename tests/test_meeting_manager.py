@@ -1,5 +1,7 @@
+import asyncio
 import pytest
 from datetime import datetime
+from types import SimpleNamespace
 
 from core.meeting_manager import MeetingManager, ParticipantInfo, ConversationEntry
 import core.meeting_manager as meeting_manager
@@ -117,11 +119,12 @@ async def test_run_meeting_basic(monkeypatch):
 
 
 class DummyEnhancer:
-    def __init__(self, api_key: str):
-        self.api_key = api_key
+    def __init__(self, client, batched: bool = True):
+        self.client = client
+        self.batched = batched
 
-    def enhance_persona(self, base_persona: str, topic: str, document_context: str):
-        return f"{base_persona}-enhanced"
+    async def enhance_personas(self, base_personas, topic: str, document_context=None):
+        return [f"{base_persona}-enhanced" for base_persona in base_personas]
 
 
 @pytest.mark.asyncio
@@ -148,6 +151,82 @@ async def test_persona_enhancement(monkeypatch):
     assert manager.moderator.persona == "moderator-enhanced"
 
 
+class CountingEnhancer(DummyEnhancer):
+    created = 0
+    calls = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingEnhancer.created += 1
+
+    async def enhance_personas(self, base_personas, topic: str, document_context=None):
+        CountingEnhancer.calls += len(base_personas)
+        return await super().enhance_personas(base_personas, topic, document_context)
+
+
+@pytest.mark.asyncio
+async def test_enhanced_personas_are_reused_across_meetings(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    initialize_config_manager()
+    monkeypatch.setattr(meeting_manager, "PersonaEnhancer", CountingEnhancer)
+    monkeypatch.setattr(CountingEnhancer, "created", 0)
+    monkeypatch.setattr(CountingEnhancer, "calls", 0)
+    settings = MeetingSettings(
+        participant_models=[ModelInfo(name="modelA", provider=AIProvider.OPENAI, persona="p1")],
+        moderator_model=ModelInfo(name="mod", provider=AIProvider.OPENAI, persona="m"),
+        rounds_per_ai=1,
+        user_query="topic",
+    )
+
+    phases = []
+    for _ in range(2):
+        manager = DummyMeetingManager()
+        manager._update_phase = phases.append
+        manager.initialize_participants(settings)
+        await manager._enhance_personas("topic", None)
+        assert manager.participants["p0"].persona == "p1-enhanced"
+        assert manager.moderator.persona == "moderator-enhanced"
+    # 2回目は強化処理（フェーズ切り替えを含む）をすべて省略する
+    assert (CountingEnhancer.created, CountingEnhancer.calls) == (1, 2)
+    assert phases == ["enhancing_personas"]
+    assert manager.get_meeting_statistics()["persona_cache"]["hits"] == 2
+
+    # 議題が変われば強化し直す
+    manager = DummyMeetingManager()
+    manager.initialize_participants(settings)
+    await manager._enhance_personas("another topic", None)
+    assert CountingEnhancer.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_persona_enhancement_uses_routed_non_openai_model(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.setenv("FAKE_PROVIDER_ENABLED", "true")
+    monkeypatch.setenv("TASK_MODEL_ROUTING", '{"persona_enhance": "fake:fake-model-fast"}')
+    initialize_config_manager()
+    meeting_manager.ClientFactory.clear_client_cache()
+    created = []
+
+    def make_enhancer(client, batched):
+        created.append(client)
+        return DummyEnhancer(client, batched)
+
+    monkeypatch.setattr(meeting_manager, "PersonaEnhancer", make_enhancer)
+    settings = MeetingSettings(
+        participant_models=[ModelInfo(name="modelA", provider=AIProvider.OPENAI, persona="p1")],
+        moderator_model=ModelInfo(name="mod", provider=AIProvider.OPENAI, persona="m"),
+        rounds_per_ai=1,
+        user_query="topic",
+    )
+
+    manager = DummyMeetingManager()
+    manager.initialize_participants(settings)
+    await manager._enhance_personas("topic", None)
+    assert manager.participants["p0"].persona == "p1-enhanced"
+    assert [(c.model_info.provider, c.model_info.name) for c in created] == [(AIProvider.FAKE, "fake-model-fast")]
+    meeting_manager.ClientFactory.clear_client_cache()
+
+
 class DummyVectorStore:
     def get_relevant_documents(self, query, k=3, use_mmr=True):
         return ["chunk1", "chunk2"]
@@ -217,3 +296,362 @@ async def test_carry_over_created(tmp_path, monkeypatch):
     assert len(carry_overs) == 1
     assert carry_overs[0]["id"] == files[0].name
 
+
+
+class ConcurrencyTrackingClient:
+    """呼び出し時の履歴件数と同時実行数を記録するダミークライアント。"""
+
+    def __init__(self, name, tracker):
+        self.name = name
+        self.tracker = tracker
+
+    async def request_completion(self, user_message, conversation_history=None, system_message=None, **kwargs):
+        self.tracker["active"] += 1
+        self.tracker["max_active"] = max(self.tracker["max_active"], self.tracker["active"])
+        self.tracker["history_lengths"].append(len(conversation_history or []))
+        await asyncio.sleep(0.01)
+        self.tracker["active"] -= 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="参加者としての意見を述べます。多角的に検討しました。"))],
+            usage=SimpleNamespace(total_tokens=10),
+        )
+
+
+@pytest.mark.asyncio
+async def test_parallel_round_generates_concurrently_and_commits_in_order(monkeypatch):
+    monkeypatch.setenv("API_CALL_DELAY_SECONDS", "0")
+    monkeypatch.setenv("PARALLEL_ROUNDS", "true")
+    initialize_config_manager()
+
+    tracker = {"active": 0, "max_active": 0, "history_lengths": []}
+    models = [
+        ModelInfo(name=f"model{i}", provider=AIProvider.OPENAI, persona=f"p{i}") for i in range(3)
+    ]
+    settings = MeetingSettings(
+        participant_models=models,
+        moderator_model=models[0],
+        rounds_per_ai=2,
+        user_query="topic",
+    )
+    manager = DummyMeetingManager()
+    monkeypatch.setattr(manager._rng, "shuffle", lambda keys: keys.reverse())
+    manager.initialize_participants(settings)
+    for participant in manager.participants.values():
+        participant.client = ConcurrencyTrackingClient(participant.name, tracker)
+    summaries = []
+
+    async def fake_round_summary(round_number):
+        summaries.append(round_number)
+
+    monkeypatch.setattr(manager, "_generate_round_summary", fake_round_summary)
+    await MeetingManager._conduct_meeting(manager, settings, None)
+
+    assert tracker["max_active"] == 3
+    # 同一ラウンド内の参加者は全員ラウンド開始時点の履歴を参照する
+    assert tracker["history_lengths"] == [0, 0, 0, 3, 3, 3]
+    speakers = [entry.speaker for entry in manager.state.conversation_history]
+    assert speakers == ["model2", "model1", "model0", "model0", "model1", "model2"]
+    assert summaries == [1, 2]
+    assert all(p.total_statements == 2 for p in manager.participants.values())
+
+
+def _entry(speaker, content, round_number):
+    return ConversationEntry(
+        speaker=speaker, persona="persona", content=content,
+        round_number=round_number, model_name="m",
+    )
+
+
+def test_rolling_summary_history_uses_memory_and_current_round(monkeypatch):
+    monkeypatch.setenv("HISTORY_STRATEGY", "rolling_summary")
+    initialize_config_manager()
+    manager = MeetingManager(document_processor=object())
+    manager.state.add_conversation_entry(_entry("A", "ラウンド1のAの長い発言", 1))
+    manager.state.add_conversation_entry(_entry("B", "ラウンド1のBの長い発言", 1))
+    manager.state.add_round_summary(_entry("司会AI", "第1ラウンドの要点", 1))
+    manager.state.add_conversation_entry(_entry("A", "ラウンド2のAの発言", 2))
+    manager.state.add_conversation_entry(
+        _entry("B", "エラーにより発言できませんでした: RuntimeError。", 2), is_error=True
+    )
+
+    history = manager._prepare_conversation_history_for_api(limit=10)
+
+    assert len(history) == 2
+    assert history[0]["content"].startswith("[司会AIによるこれまでの議論の要約]")
+    assert "- ラウンド1: 第1ラウンドの要点" in history[0]["content"]
+    assert "ラウンド2のAの発言" in history[1]["content"]
+    assert not any("ラウンド1のAの長い発言" in m["content"] for m in history)
+
+
+def test_token_budget_packing_fills_newest_first(monkeypatch):
+    monkeypatch.setenv("HISTORY_PACKING", "token_budget")
+    initialize_config_manager()
+    monkeypatch.setattr(meeting_manager, "count_tokens", lambda text, model_name="": 100)
+    monkeypatch.setattr(
+        "core.conversation_ledger.count_tokens", lambda text, model_name="": 100
+    )
+    manager = MeetingManager(document_processor=object())
+    manager.app_config.history_token_budget_margin = 0
+    monkeypatch.setattr(manager.config_manager, "get_context_window_for_model", lambda name: 1550)
+    for i in range(20):
+        manager.state.add_conversation_entry(_entry("A", f"発言{i}", 1))
+
+    model = ModelInfo(name="small-model", provider=AIProvider.OPENAI, max_tokens=1000)
+    budget = manager._history_token_budget(model, "system", "user")
+    # 1550 - 1000(max_tokens) - 200(system+user)
+    assert budget == 350
+
+    history = manager._prepare_conversation_history_for_api(limit=10, token_budget=budget)
+    # 1件あたり 100 + 4(メッセージ枠) トークン
+    assert [m["content"][-4:] for m in history] == ["発言17", "発言18", "発言19"]
+    assert manager._prepare_conversation_history_for_api(limit=10, token_budget=50) == []
+
+
+class StreamingClient:
+    """request_completion_stream で断片を通知するダミークライアント。"""
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.stream_calls = 0
+        self.plain_calls = 0
+
+    def _response(self):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="".join(self.deltas)))],
+            usage=SimpleNamespace(total_tokens=10),
+        )
+
+    async def request_completion_stream(self, user_message, on_delta, **kwargs):
+        self.stream_calls += 1
+        for delta in self.deltas:
+            on_delta(delta)
+        return self._response()
+
+    async def request_completion(self, user_message, **kwargs):
+        self.plain_calls += 1
+        return self._response()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streaming_enabled", ["true", "false"])
+async def test_statement_streams_deltas_before_commit(monkeypatch, streaming_enabled):
+    monkeypatch.setenv("STREAMING_ENABLED", streaming_enabled)
+    initialize_config_manager()
+    settings = MeetingSettings(
+        participant_models=[ModelInfo(name="model0", provider=AIProvider.OPENAI, persona="p0")],
+        moderator_model=ModelInfo(name="mod", provider=AIProvider.OPENAI, persona="m"),
+        rounds_per_ai=1,
+        user_query="topic",
+    )
+    manager = DummyMeetingManager()
+    manager.initialize_participants(settings)
+    participant = manager.participants["p0"]
+    participant.client = StreamingClient(["議題について", "賛成の立場です。"])
+    events = []
+    manager.on_statement_delta = lambda key, speaker, delta: events.append(("delta", key, speaker, delta))
+    manager.on_statement_added = lambda entry: events.append(("added", entry.speaker_key, entry.speaker, entry.content))
+
+    await MeetingManager._make_participant_statement(manager, participant, 1)
+
+    if streaming_enabled == "true":
+        assert participant.client.stream_calls == 1
+        assert events == [
+            ("delta", "p0", "model0", "議題について"),
+            ("delta", "p0", "model0", "賛成の立場です。"),
+            ("added", "p0", "model0", "議題について賛成の立場です。"),
+        ]
+    else:
+        assert participant.client.plain_calls == 1
+        assert events == [("added", "p0", "model0", "議題について賛成の立場です。")]
+
+
+@pytest.mark.asyncio
+async def test_streamed_statements_are_keyed_per_participant_with_same_model(monkeypatch):
+    monkeypatch.setenv("STREAMING_ENABLED", "true")
+    initialize_config_manager()
+    settings = MeetingSettings(
+        participant_models=[
+            ModelInfo(name="model0", provider=AIProvider.OPENAI, persona="賛成派"),
+            ModelInfo(name="model0", provider=AIProvider.OPENAI, persona="反対派"),
+        ],
+        moderator_model=ModelInfo(name="mod", provider=AIProvider.OPENAI, persona="m"),
+        rounds_per_ai=1,
+        user_query="topic",
+    )
+    manager = DummyMeetingManager()
+    manager.initialize_participants(settings)
+    manager.participants["p0"].client = StreamingClient(["賛成", "です。"])
+    manager.participants["p1"].client = StreamingClient(["反対", "です。"])
+    deltas = {}
+    added = {}
+    manager.on_statement_delta = lambda key, speaker, delta: deltas.setdefault(key, []).append((speaker, delta))
+    manager.on_statement_added = lambda entry: added.setdefault(entry.speaker_key, entry.content)
+
+    await asyncio.gather(*(
+        MeetingManager._make_participant_statement(manager, participant, 1)
+        for participant in manager.participants.values()
+    ))
+
+    # 表示名は同じでも、断片と確定した発言は参加者ごとに対応づけられる
+    assert deltas == {
+        "p0": [("model0", "賛成"), ("model0", "です。")],
+        "p1": [("model0", "反対"), ("model0", "です。")],
+    }
+    assert added == {"p0": "賛成です。", "p1": "反対です。"}
+
+
+class ScriptedCorrectionClient:
+    """修正呼び出しに対して順に応答を返すダミークライアント。"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    async def request_completion(self, user_message, **kwargs):
+        self.prompts.append(user_message)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.replies.pop(0)))],
+            usage=SimpleNamespace(total_tokens=7),
+        )
+
+
+STATEMENT_WITH_ENGLISH = (
+    "まず現状を整理します。農業人口は減少を続けており、担い手の確保が課題です。"
+    "特に中山間地域では耕作放棄地が増え、地域の集落機能の維持も難しくなっています。"
+    "スマート農業の導入は省力化に有効ですが、初期投資の負担が小規模農家にとって大きな壁になっています。"
+    "However, we should also consider the long-term impact.\n次に対策を述べます。"
+)
+
+
+@pytest.mark.asyncio
+async def test_span_correction_rewrites_only_flagged_sentence(monkeypatch):
+    monkeypatch.setenv("JAPANESE_CORRECTION_MODE", "span")
+    initialize_config_manager()
+    manager = DummyMeetingManager()
+    client = ScriptedCorrectionClient(["[1] しかし、長期的な影響も考慮すべきです。"])
+
+    corrected, tokens = await manager._ensure_japanese_output(STATEMENT_WITH_ENGLISH, client, AIProvider.OPENAI)
+
+    assert corrected == (
+        "まず現状を整理します。農業人口は減少を続けており、担い手の確保が課題です。"
+        "特に中山間地域では耕作放棄地が増え、地域の集落機能の維持も難しくなっています。"
+        "スマート農業の導入は省力化に有効ですが、初期投資の負担が小規模農家にとって大きな壁になっています。"
+        "しかし、長期的な影響も考慮すべきです。\n次に対策を述べます。"
+    )
+    assert tokens == 7
+    assert len(client.prompts) == 1
+    assert "農業人口は減少" not in client.prompts[0].split("【修正対象】")[1].splitlines()[0]
+
+
+@pytest.mark.asyncio
+async def test_span_correction_falls_back_to_full_rewrite(monkeypatch):
+    monkeypatch.setenv("JAPANESE_CORRECTION_MODE", "span")
+    initialize_config_manager()
+    manager = DummyMeetingManager()
+    client = ScriptedCorrectionClient(["番号のない応答です。", "全文を書き直した日本語の発言です。"])
+
+    corrected, _ = await manager._ensure_japanese_output(STATEMENT_WITH_ENGLISH, client, AIProvider.OPENAI)
+
+    assert corrected == "全文を書き直した日本語の発言です。"
+    assert len(client.prompts) == 2
+    assert manager.state.total_tokens_this_meeting == 14
+
+
+@pytest.mark.asyncio
+async def test_round_summary_and_correction_use_routed_task_clients(monkeypatch):
+    monkeypatch.setenv(
+        "TASK_MODEL_ROUTING",
+        '{"round_summary": "openai:gpt-4o-mini", "correction": "openai:gpt-4o-mini"}',
+    )
+    initialize_config_manager()
+    routed = ScriptedCorrectionClient([
+        "これまでの議論では担い手不足と初期投資が主な論点でした。",
+        "[1] しかし、長期的な影響も考慮すべきです。",
+    ])
+    routed.model_info = ModelInfo(name="gpt-4o-mini", provider=AIProvider.OPENAI)
+    created = []
+
+    def fake_create_client(model_info, api_key=None, **kwargs):
+        created.append(model_info.name)
+        return routed
+
+    monkeypatch.setattr(meeting_manager.ClientFactory, "create_client", fake_create_client)
+    settings = MeetingSettings(
+        participant_models=[ModelInfo(name="model0", provider=AIProvider.OPENAI, persona="p0")],
+        moderator_model=ModelInfo(name="slow-flagship", provider=AIProvider.OPENAI, persona="m"),
+        rounds_per_ai=1,
+        user_query="topic",
+    )
+    manager = DummyMeetingManager()
+    manager.initialize_participants(settings)
+
+    await MeetingManager._generate_round_summary(manager, 1)
+    corrected, _ = await manager._ensure_japanese_output(STATEMENT_WITH_ENGLISH, None, AIProvider.CLAUDE)
+
+    # 司会者・発言者のクライアント(None)は使われず、割り当てたモデルで実行される
+    summary_entry = manager.state.conversation_history[-1]
+    assert summary_entry.model_name == "gpt-4o-mini"
+    assert summary_entry.content.startswith("これまでの議論では")
+    assert "しかし、長期的な影響も考慮すべきです。" in corrected
+    assert created == ["gpt-4o-mini", "gpt-4o-mini"]
+
+
+class RepeatingClient:
+    """毎回同じ内容を返すダミークライアント（議論の収束を模擬する）。"""
+
+    def __init__(self, content):
+        self.content = content
+        self.calls = 0
+
+    async def request_completion(self, user_message, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))],
+            usage=SimpleNamespace(total_tokens=10),
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("early_stop_enabled", ["true", "false"])
+async def test_early_stop_skips_remaining_rounds_when_converged(monkeypatch, early_stop_enabled):
+    monkeypatch.setenv("API_CALL_DELAY_SECONDS", "0")
+    monkeypatch.setenv("EARLY_STOP_ENABLED", early_stop_enabled)
+    monkeypatch.setenv("EARLY_STOP_MIN_ROUNDS", "2")
+    initialize_config_manager()
+    settings = MeetingSettings(
+        participant_models=[
+            ModelInfo(name=f"model{i}", provider=AIProvider.OPENAI, persona=f"p{i}") for i in range(2)
+        ],
+        moderator_model=ModelInfo(name="mod", provider=AIProvider.OPENAI, persona="m"),
+        rounds_per_ai=4,
+        user_query="topic",
+    )
+    manager = DummyMeetingManager()
+    manager.initialize_participants(settings)
+    clients = [RepeatingClient(f"参加者{i}として、子育て支援と交通網の整備を優先すべきだと考えます。") for i in range(2)]
+    for participant, client in zip(manager.participants.values(), clients):
+        participant.client = client
+    summaries = []
+    progress = []
+
+    async def fake_round_summary(round_number):
+        summaries.append(round_number)
+
+    monkeypatch.setattr(manager, "_generate_round_summary", fake_round_summary)
+    monkeypatch.setattr(
+        manager, "_make_participant_statement",
+        lambda participant, round_num: MeetingManager._make_participant_statement(manager, participant, round_num),
+    )
+    manager.progress_callback_internal = lambda phase, current, total: progress.append((phase, current))
+    await MeetingManager._conduct_meeting(manager, settings, None)
+
+    if early_stop_enabled == "true":
+        # 2ラウンド目で新規性が0になり、そのラウンドの要約と残りのラウンドを省略する
+        assert [client.calls for client in clients] == [2, 2]
+        assert summaries == [1]
+        assert manager.state.converged_at_round == 2
+        assert ("discussion_converged", 2) in progress
+    else:
+        assert [client.calls for client in clients] == [4, 4]
+        assert summaries == [1, 2, 3, 4]
+        assert manager.state.converged_at_round is None
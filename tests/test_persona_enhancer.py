@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core.models import AIProvider, ModelInfo
+from core.persona_enhancer import PERSONA_BATCH_SIZE, PersonaEnhancer, parse_batch_response
+
+
+class ScriptedClient:
+    """まとめての強化には batch_reply を、個別の強化には「<基本ペルソナ>-enhanced」を返すクライアント"""
+
+    def __init__(self, batch_reply=None, batch_error=None):
+        self.model_info = ModelInfo(name="gpt-4o", provider=AIProvider.OPENAI, max_tokens=1500)
+        self.default_timeout = 60.0
+        self.batch_reply = batch_reply
+        self.batch_error = batch_error
+        self.requests = []
+
+    async def request_completion(self, user_message, **kwargs):
+        self.requests.append((user_message, kwargs))
+        if "<<<PERSONA" in user_message:
+            if self.batch_error:
+                raise self.batch_error
+            content = self.batch_reply(user_message) if callable(self.batch_reply) else self.batch_reply
+        else:
+            base = user_message.split("\n")[1]
+            content = f"{base}-enhanced"
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=10),
+        )
+
+
+def test_parse_batch_response():
+    text = "前置き\n<<<PERSONA 2>>>\n二人目\n複数行\n<<<PERSONA 1>>>\n一人目\n<<<PERSONA 3>>>\n\n<<<PERSONA 9>>>\n範囲外"
+    assert parse_batch_response(text, 3) == {1: "一人目", 2: "二人目\n複数行"}
+
+
+@pytest.mark.asyncio
+async def test_batched_call_enhances_everyone_at_once():
+    client = ScriptedClient(batch_reply="<<<PERSONA 1>>>\nA+\n<<<PERSONA 2>>>\nB+\n<<<PERSONA 3>>>\nC+")
+    enhancer = PersonaEnhancer(client)
+    assert await enhancer.enhance_personas(["A", "B", "C"], "議題", "資料の要点") == ["A+", "B+", "C+"]
+
+    assert len(client.requests) == 1
+    user_message, kwargs = client.requests[0]
+    assert "議題" in kwargs["system_message"] and "資料の要点" in kwargs["system_message"]
+    assert kwargs["cacheable_system_prefix"] == kwargs["system_message"]
+    assert kwargs["override_max_tokens"] == 1500 * 3
+    assert "資料の要点" not in user_message
+
+
+@pytest.mark.asyncio
+async def test_missing_personas_fall_back_to_single_calls():
+    client = ScriptedClient(batch_reply="<<<PERSONA 2>>>\nB+")
+    results = await PersonaEnhancer(client).enhance_personas(["A", "B", "C"], "議題")
+    assert results == ["A-enhanced", "B+", "C-enhanced"]
+    assert len(client.requests) == 3
+
+    client = ScriptedClient(batch_error=RuntimeError("503"))
+    assert await PersonaEnhancer(client).enhance_personas(["A", "B"], "議題") == ["A-enhanced", "B-enhanced"]
+
+
+@pytest.mark.asyncio
+async def test_unbatched_mode_and_large_groups():
+    client = ScriptedClient()
+    assert await PersonaEnhancer(client, batched=False).enhance_personas(["A", "B"], "議題") == [
+        "A-enhanced", "B-enhanced"
+    ]
+    assert all("<<<PERSONA" not in message for message, _ in client.requests)
+
+    def reply(user_message):
+        count = user_message.count("## 基本ペルソナ")
+        return "\n".join(f"<<<PERSONA {n}>>>\nok" for n in range(1, count + 1))
+
+    client = ScriptedClient(batch_reply=reply)
+    personas = [f"P{i}" for i in range(PERSONA_BATCH_SIZE + 2)]
+    assert await PersonaEnhancer(client).enhance_personas(personas, "議題") == ["ok"] * len(personas)
+    assert len(client.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_single_call_keeps_base_persona():
+    class FailingClient(ScriptedClient):
+        async def request_completion(self, user_message, **kwargs):
+            raise RuntimeError("boom")
+
+    assert await PersonaEnhancer(FailingClient()).enhance_persona("基本", "議題") == "基本"
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from core.phase_graph import PhaseGraph
+
+
+@pytest.mark.asyncio
+async def test_independent_phases_overlap_and_dependents_wait():
+    events = []
+    release = asyncio.Event()
+
+    async def slow():
+        events.append("slow:start")
+        await release.wait()
+        events.append("slow:end")
+        return "slow"
+
+    async def fast():
+        events.append("fast")
+        release.set()
+        return "fast"
+
+    async def dependent():
+        events.append("dependent")
+        return "dependent"
+
+    graph = PhaseGraph()
+    graph.add("dependent", dependent, depends_on=["slow", "fast"])
+    graph.add("slow", slow)
+    graph.add("fast", fast)
+    results = await graph.run()
+
+    # slow が終わる前に fast が始まり、dependent は両方の後に始まる
+    assert events == ["slow:start", "fast", "slow:end", "dependent"]
+    assert results == {"slow": "slow", "fast": "fast", "dependent": "dependent"}
+
+
+@pytest.mark.asyncio
+async def test_timings_are_reported():
+    ticks = iter(range(100))
+    finished = []
+
+    async def noop():
+        return None
+
+    graph = PhaseGraph(on_phase_finished=lambda name, elapsed: finished.append((name, elapsed)), clock=lambda: next(ticks))
+    graph.add("a", noop)
+    graph.add("b", noop, depends_on=["a"])
+    await graph.run()
+
+    assert [name for name, _ in finished] == ["a", "b"]
+    assert set(graph.timings) == {"a", "b"}
+    assert all(elapsed > 0 for _, elapsed in finished)
+
+
+def test_invalid_graphs_are_rejected():
+    async def noop():
+        return None
+
+    graph = PhaseGraph()
+    graph.add("a", noop)
+    with pytest.raises(ValueError):
+        graph.add("a", noop)
+
+    graph = PhaseGraph()
+    graph.add("a", noop, depends_on=["missing"])
+    with pytest.raises(ValueError):
+        asyncio.run(graph.run())
+
+    graph = PhaseGraph()
+    graph.add("a", noop, depends_on=["b"])
+    graph.add("b", noop, depends_on=["a"])
+    with pytest.raises(ValueError):
+        asyncio.run(graph.run())
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_remaining_phases():
+    cancelled = []
+
+    async def waits_forever():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append("waiting")
+            raise
+
+    async def fails():
+        raise RuntimeError("boom")
+
+    async def never_runs():
+        cancelled.append("never_runs started")
+
+    graph = PhaseGraph()
+    graph.add("waiting", waits_forever)
+    graph.add("failing", fails)
+    graph.add("after_failure", never_runs, depends_on=["failing"])
+    with pytest.raises(RuntimeError, match="boom"):
+        await graph.run()
+    assert cancelled == ["waiting"]
+    assert "failing" not in graph.results
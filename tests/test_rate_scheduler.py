@@ -0,0 +1,119 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.models import AIProvider, ProviderRateLimit
+from core.rate_scheduler import ProviderRateScheduler, get_rate_scheduler, reset_rate_schedulers
+
+
+class FakeClock:
+    """sleep で時刻を進める疑似時計"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_scheduler(clock, **limits):
+    return ProviderRateScheduler("test", ProviderRateLimit(**limits), clock=clock, sleep=clock.sleep)
+
+
+@pytest.mark.asyncio
+async def test_requests_under_limit_do_not_wait():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, requests_per_minute=10)
+    for _ in range(10):
+        reservation = await scheduler.acquire()
+        assert reservation.waited_seconds == 0
+    assert clock.sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_rpm_limit_waits_for_window():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, requests_per_minute=2)
+    await scheduler.acquire()
+    clock.now = 10.0
+    await scheduler.acquire()
+    third = await scheduler.acquire()
+
+    # 最初のリクエストが集計期間から外れる 60 秒後まで待つ
+    assert third.timestamp == 60.0
+    assert third.waited_seconds == pytest.approx(50.0)
+    assert scheduler.stats()["requests_in_window"] == 2
+
+
+@pytest.mark.asyncio
+async def test_tpm_limit_and_settle():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, tokens_per_minute=100)
+    first = await scheduler.acquire(60)
+    # 実際の消費が見積もりより少なければ、その分すぐに次のリクエストを通せる
+    scheduler.settle(first, 30)
+    second = await scheduler.acquire(60)
+    assert second.waited_seconds == 0
+    assert scheduler.stats()["tokens_in_window"] == 90
+
+    third = await scheduler.acquire(60)
+    assert third.timestamp == 60.0
+    assert scheduler.stats()["tokens_in_window"] == 60
+
+
+@pytest.mark.asyncio
+async def test_oversized_request_passes_once_window_is_empty():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, tokens_per_minute=100)
+    oversized = await scheduler.acquire(500)
+    assert oversized.waited_seconds == 0
+    following = await scheduler.acquire(10)
+    assert following.timestamp == 60.0
+
+
+@pytest.mark.asyncio
+async def test_min_interval():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, min_interval_seconds=0.5)
+    await scheduler.acquire()
+    second = await scheduler.acquire()
+    assert second.timestamp == pytest.approx(0.5)
+
+
+def test_scheduler_is_shared_across_threads_and_event_loops():
+    scheduler = ProviderRateScheduler("test", ProviderRateLimit())
+
+    def worker():
+        async def run():
+            for _ in range(50):
+                await scheduler.acquire()
+        asyncio.run(run())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert scheduler.stats()["total_requests"] == 200
+
+
+def test_get_rate_scheduler_is_keyed_by_provider_and_api_key():
+    reset_rate_schedulers()
+    try:
+        shared = get_rate_scheduler(AIProvider.OPENAI, "key-a")
+        assert get_rate_scheduler(AIProvider.OPENAI, "key-a") is shared
+        assert get_rate_scheduler(AIProvider.OPENAI, "key-b") is not shared
+        assert get_rate_scheduler(AIProvider.CLAUDE, "key-a") is not shared
+        assert "key-a" not in shared.name
+
+        limits = ProviderRateLimit(requests_per_minute=5)
+        assert get_rate_scheduler(AIProvider.OPENAI, "key-a", limits) is shared
+        assert shared.limits == limits
+    finally:
+        reset_rate_schedulers()
@@ -0,0 +1,155 @@
+import pytest
+
+from core.api_clients import FakeClient
+from core.client_factory import ClientFactory
+from core.config_manager import initialize_config_manager
+from core.document_processor import DocumentProcessor
+from core.meeting_manager import MeetingManager, ParticipantInfo
+from core.models import AIProvider, FakeProviderSettings, ModelInfo
+from core.response_cache import ResponseCache, reset_response_caches
+from core.utils import extract_content_and_tokens
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    reset_response_caches()
+    ClientFactory.clear_client_cache()
+    yield
+    reset_response_caches()
+    ClientFactory.clear_client_cache()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_client(cache, seed=0):
+    return FakeClient(
+        api_key="fake",
+        model_info=ModelInfo(name="fake-model", provider=AIProvider.FAKE, temperature=0.7),
+        settings=FakeProviderSettings(seed=seed, latency_distribution="fixed", latency_mean_seconds=0.0),
+        response_cache=cache,
+    )
+
+
+def test_get_put_and_ttl(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=60, clock=clock)
+    assert cache.get("a") is None
+    cache.put("a", AIProvider.OPENAI, "gpt-4o-mini", {"content": "回答", "tokens": 10})
+    assert cache.get("a") == {"content": "回答", "tokens": 10}
+
+    clock.now += 61
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"], stats["entries"]) == (1, 2, 1, 0)
+
+
+def test_evicts_least_recently_used_by_count_and_size(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2, clock=clock)
+    for key in ("a", "b"):
+        clock.now += 1
+        cache.put(key, AIProvider.OPENAI, "m", {"content": key, "tokens": 1})
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.put("c", AIProvider.OPENAI, "m", {"content": "c", "tokens": 1})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+    small = ResponseCache(str(tmp_path / "small.sqlite3"), max_bytes=120, clock=clock)
+    for key in ("x", "y", "z"):
+        clock.now += 1
+        small.put(key, AIProvider.OPENAI, "m", {"content": key * 20, "tokens": 1})
+    assert small.stats()["bytes"] <= 120
+    assert small.get("x") is None and small.get("z") is not None
+
+
+def test_entries_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    ResponseCache(path).put("a", AIProvider.CLAUDE, "claude", {"content": "保存済み", "tokens": 5})
+    assert ResponseCache(path).get("a") == {"content": "保存済み", "tokens": 5}
+
+
+@pytest.mark.asyncio
+async def test_temperature_zero_requests_hit_cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    client = fake_client(cache)
+
+    first = await client.request_completion("要約してください", override_temperature=0.0)
+    second = await client.request_completion("要約してください", override_temperature=0.0)
+    assert client.calls == 1
+    assert second.choices[0].message.content == first.choices[0].message.content
+    assert extract_content_and_tokens(AIProvider.FAKE, first)[1] > 0
+    # キャッシュの応答ではトークンを使っていない
+    assert extract_content_and_tokens(AIProvider.FAKE, second)[1] == 0
+
+    # max_tokens が違えば別のリクエスト
+    await client.request_completion("要約してください", override_temperature=0.0, override_max_tokens=50)
+    assert client.calls == 2
+
+    # temperature が上限を超える会話の発言はキャッシュしない
+    await client.request_completion("意見をください")
+    await client.request_completion("意見をください")
+    assert client.calls == 4
+
+    deltas = []
+    await client.request_completion_stream("要約してください", on_delta=deltas.append, override_temperature=0.0)
+    assert client.calls == 4
+    assert "".join(deltas) == first.choices[0].message.content
+    assert cache.stats()["hits"] == 2
+
+
+def test_factory_attaches_cache_from_config(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "true")
+    monkeypatch.setenv("RESPONSE_CACHE_PATH", str(tmp_path / "responses.sqlite3"))
+    monkeypatch.setenv("RESPONSE_CACHE_MAX_ENTRIES", "10")
+    monkeypatch.setenv("FAKE_PROVIDER_ENABLED", "true")
+    initialize_config_manager()
+    client = ClientFactory.create_client(ModelInfo(name="fake-model", provider=AIProvider.FAKE))
+    assert client.response_cache is not None
+    assert client.response_cache.max_entries == 10
+
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    initialize_config_manager()
+    ClientFactory.clear_client_cache()
+    client = ClientFactory.create_client(ModelInfo(name="fake-model", provider=AIProvider.FAKE))
+    assert client.response_cache is None
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_add_no_tokens_to_meeting(tmp_path, monkeypatch):
+    monkeypatch.setenv("DOCUMENT_SUMMARY_CACHE_ENABLED", "false")
+    config = initialize_config_manager().config
+    document = tmp_path / "doc.txt"
+    document.write_text("会議資料の本文です。" * 400, encoding="utf-8")
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    client = fake_client(cache)
+
+    async def run_meeting_document_step():
+        manager = MeetingManager(document_processor=DocumentProcessor(config), document_store_dir=str(tmp_path))
+        manager.moderator = ParticipantInfo(
+            client=client, name="mod", internal_key="mod", persona="mod", model_info=client.model_info,
+        )
+
+        async def no_correction(content, client, provider, context_for_correction):
+            return content, 0
+
+        manager._ensure_japanese_output = no_correction
+        summary = await manager._process_document(str(document))
+        return manager, summary
+
+    first_manager, first = await run_meeting_document_step()
+    assert first_manager.state.total_tokens_this_meeting > 0
+
+    second_manager, second = await run_meeting_document_step()
+    assert second.summary == first.summary
+    assert cache.stats()["hits"] > 0
+    assert second.tokens_used == 0
+    assert second_manager.state.total_tokens_this_meeting == 0
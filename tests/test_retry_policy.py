@@ -0,0 +1,208 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from core.api_clients.base_client import BaseAIClient
+from core.exceptions import APIStatusError, CircuitOpenError
+from core.models import AIProvider, ModelInfo, ProviderRateLimit
+from core.rate_scheduler import ProviderRateScheduler
+from core.retry_policy import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    RetryPolicy,
+    parse_remaining_fraction,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"Retry-After": "2"}) == 2.0
+    assert parse_retry_after({"retry-after-ms": "1500", "retry-after": "9"}) == 1.5
+    assert parse_retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+    assert parse_retry_after({}) is None
+    assert parse_retry_after(None) is None
+
+
+def test_parse_remaining_fraction():
+    openai_headers = {
+        "x-ratelimit-limit-requests": "500", "x-ratelimit-remaining-requests": "400",
+        "x-ratelimit-limit-tokens": "10000", "x-ratelimit-remaining-tokens": "500",
+    }
+    assert parse_remaining_fraction(openai_headers) == pytest.approx(0.05)
+    anthropic_headers = {"anthropic-ratelimit-requests-limit": "50", "anthropic-ratelimit-requests-remaining": "25"}
+    assert parse_remaining_fraction(anthropic_headers) == pytest.approx(0.5)
+    assert parse_remaining_fraction({"content-type": "application/json"}) is None
+
+
+def test_backoff_is_jittered_and_honours_retry_after():
+    policy = RetryPolicy(base_delay_seconds=1.0, max_delay_seconds=8.0, rng=random.Random(0))
+    delays = [policy.backoff(attempt) for attempt in range(6)]
+    for attempt, delay in enumerate(delays):
+        cap = min(8.0, 2 ** attempt)
+        assert cap / 2 <= delay <= cap
+    assert len({round(policy.backoff(2), 6) for _ in range(5)}) > 1
+    assert 5.0 <= policy.backoff(0, retry_after=5.0) <= 6.0
+
+
+def test_backoff_caps_long_retry_after():
+    policy = RetryPolicy(base_delay_seconds=1.0, max_delay_seconds=8.0, rng=random.Random(0))
+    assert 8.0 <= policy.backoff(0, retry_after=3600.0) <= 9.0
+    assert 8.0 <= policy.backoff(0, retry_after=20.0) <= 9.0
+
+
+def test_circuit_breaker_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout_seconds=10, clock=clock)
+    breaker.before_request()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    clock.now = 10.0
+    breaker.before_request()  # 試験的な呼び出し
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20.0
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_request()
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_in_flight_requests():
+    limiter = AdaptiveConcurrencyLimiter("test", max_limit=2)
+    running = 0
+    peak = 0
+
+    async def task():
+        nonlocal running, peak
+        async with limiter.slot():
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(task() for _ in range(6)))
+    assert peak == 2
+    assert limiter.stats() == {"limit": 2, "in_flight": 0, "waiting": 0}
+
+
+@pytest.mark.asyncio
+async def test_limiter_aimd():
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter("test", max_limit=8, clock=clock)
+    limiter.on_throttle()
+    assert limiter.limit == 4
+    # 同じ混雑で続けて半減しない
+    limiter.on_throttle()
+    assert limiter.limit == 4
+
+    clock.now = 5.0
+    limiter.observe_headers({"x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "3"})
+    assert limiter.limit == 2
+    limiter.observe_headers({"x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "90"})
+    assert limiter.limit == 2
+
+    for _ in range(20):
+        limiter.on_success()
+    assert 2 < limiter.limit <= 8
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    limiter = AdaptiveConcurrencyLimiter("test", max_limit=1)
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    limiter.release()
+    assert limiter.stats() == {"limit": 1, "in_flight": 0, "waiting": 0}
+
+
+class FlakyClient(BaseAIClient):
+    """指定した例外を順に送出してから成功するクライアント"""
+
+    def __init__(self, errors, **kwargs):
+        self.errors = list(errors)
+        self.calls = 0
+        super().__init__(api_key="test", model_info=ModelInfo(name="m", provider=AIProvider.OPENAI), **kwargs)
+
+    async def _make_api_call(self, messages, temperature, max_tokens, request_timeout):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+
+def rate_limited_error(retry_after):
+    error = APIStatusError("rate limited", status_code=429)
+    error.response = SimpleNamespace(headers={"retry-after": str(retry_after)})
+    return error
+
+
+def make_flaky_client(errors, max_retries=3):
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    client = FlakyClient(
+        errors,
+        rate_scheduler=ProviderRateScheduler("test", ProviderRateLimit()),
+        retry_policy=RetryPolicy(max_retries=max_retries, rng=random.Random(0), sleep=fake_sleep),
+        concurrency_limiter=AdaptiveConcurrencyLimiter("test", max_limit=8),
+        circuit_breaker=CircuitBreaker("test", failure_threshold=2),
+    )
+    return client, sleeps
+
+
+@pytest.mark.asyncio
+async def test_client_retries_with_retry_after_and_throttles():
+    client, sleeps = make_flaky_client([rate_limited_error(5), APIStatusError("unavailable", status_code=503)])
+    response = await client.request_completion("質問")
+
+    assert response.choices[0].message.content == "ok"
+    assert client.calls == 3
+    assert 5.0 <= sleeps[0] <= 6.0
+    assert 1.0 <= sleeps[1] <= 2.0
+    assert client.concurrency_limiter.limit == 4
+    assert client.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_client_does_not_retry_client_errors():
+    client, sleeps = make_flaky_client([APIStatusError("bad request", status_code=400)])
+    with pytest.raises(APIStatusError):
+        await client.request_completion("質問")
+    assert client.calls == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_stops_retrying():
+    errors = [APIStatusError("unavailable", status_code=503) for _ in range(5)]
+    client, sleeps = make_flaky_client(errors)
+    with pytest.raises(CircuitOpenError):
+        await client.request_completion("質問")
+    # 2回続けて失敗した時点で遮断され、3回目は送信しない
+    assert client.calls == 2
+    assert len(sleeps) == 2
@@ -1,4 +1,5 @@
 import asyncio
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -18,18 +19,24 @@ from core.utils import (
     format_timestamp,
     sanitize_filename,
     generate_file_hash,
+    detect_provider,
 )
-from core.vector_store_manager import VectorStoreManager
+from core.vector_store_manager import DEFAULT_VECTOR_STORE_DIR, VectorStoreManager
 from core.meeting_manager import MeetingManager
 
 logger = logging.getLogger(__name__)
 
+# ストリーミング中のUI更新間隔（秒）。断片ごとに描画すると重くなるため間引く
+STREAM_UI_UPDATE_INTERVAL_SECONDS = 0.05
+
 
 class EventsMixin:
     def _update_api_status(self):
         status_parts = []
         api_validation = self.config_manager.validate_api_keys()
         for provider, is_configured in api_validation.items():
+            if provider == AIProvider.FAKE and not is_configured:
+                continue  # 計測・テスト用のプロバイダーは有効にしたときだけ表示する
             status_icon = "✅" if is_configured else "❌"
             status_parts.append(f"{status_icon} {provider.value}")
         self.api_status_text.value = " | ".join(status_parts)
@@ -72,14 +79,8 @@ class EventsMixin:
         self.page.update()
 
     def _detect_provider(self, model_name: str) -> Optional[AIProvider]:
-        model_lower = model_name.lower()
-        if any(p_keyword in model_lower for p_keyword in ["gpt", "openai"]):
-            return AIProvider.OPENAI
-        elif any(p_keyword in model_lower for p_keyword in ["claude", "anthropic"]):
-            return AIProvider.CLAUDE
-        elif any(p_keyword in model_lower for p_keyword in ["gemini", "google"]):
-            return AIProvider.GEMINI
-        return None
+        local_models = self.config_manager.get_model_names_for_provider(AIProvider.LOCAL)
+        return detect_provider(model_name, local_models)
 
     def _update_models_list(self):
         self.models_list.controls.clear()
@@ -204,7 +205,7 @@ class EventsMixin:
 
             openai_key = self.config_manager.config.openai_api_key
             if openai_key:
-                store_root = Path("vector_stores")
+                store_root = Path(DEFAULT_VECTOR_STORE_DIR)
                 file_hash = generate_file_hash(self.uploaded_file_path)
                 store_path = store_root / file_hash
                 self.vector_store_manager = VectorStoreManager(
@@ -273,6 +274,8 @@ class EventsMixin:
         self._set_ui_processing(True)
         self.result_text.value = ""
         self.conversation_list.controls.clear()
+        self._streaming_statements.clear()
+        self._summary_stream_last_update = 0.0
         self.current_meeting_result = None
 
         self.save_conversation_button.disabled = True
@@ -307,6 +310,8 @@ class EventsMixin:
             )
             self.meeting_manager.on_statement_added = self._on_statement_added
             self.meeting_manager.on_phase_changed = self._on_phase_changed
+            self.meeting_manager.on_statement_delta = self._on_statement_delta
+            self.meeting_manager.on_summary_delta = self._on_summary_delta
 
             logger.info("MeetingManager.run_meeting を呼び出します...")
             result_from_manager = await self.meeting_manager.run_meeting(
@@ -416,28 +421,31 @@ class EventsMixin:
 
         self.page.update()
 
-    def _on_statement_added(self, entry: ConversationEntry):
-        statement_card = ft.Card(
+    def _build_statement_header(self, speaker: str, persona: str, round_label: str) -> ft.Row:
+        return ft.Row([
+            ft.Text(
+                f"{speaker}",
+                weight=ft.FontWeight.BOLD,
+                color="primary",
+            ),
+            ft.Text(
+                f"({persona})",
+                size=12,
+                color="outline",
+                italic=True,
+            ),
+            ft.Text(
+                round_label,
+                size=10,
+                color="outline",
+            ),
+        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
+
+    def _build_statement_card(self, entry: ConversationEntry) -> ft.Card:
+        return ft.Card(
             ft.Container(
                 ft.Column([
-                    ft.Row([
-                        ft.Text(
-                            f"{entry.speaker}",
-                            weight=ft.FontWeight.BOLD,
-                            color="primary",
-                        ),
-                        ft.Text(
-                            f"({entry.persona})",
-                            size=12,
-                            color="outline",
-                            italic=True,
-                        ),
-                        ft.Text(
-                            f"Round {entry.round_number}",
-                            size=10,
-                            color="outline",
-                        ),
-                    ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                    self._build_statement_header(entry.speaker, entry.persona, f"Round {entry.round_number}"),
                     ft.Markdown(
                         entry.content,
                         selectable=True,
@@ -453,13 +461,84 @@ class EventsMixin:
                 padding=ft.padding.all(10),
             )
         )
-        self.conversation_list.controls.append(statement_card)
+
+    def _on_statement_added(self, entry: ConversationEntry):
+        statement_card = self._build_statement_card(entry)
+        streaming = self._streaming_statements.pop(entry.speaker_key or entry.speaker, None)
+        if streaming and streaming["card"] in self.conversation_list.controls:
+            # 生成途中のカードを確定した発言（日本語修正後の内容）で置き換える
+            index = self.conversation_list.controls.index(streaming["card"])
+            self.conversation_list.controls[index] = statement_card
+        else:
+            self.conversation_list.controls.append(statement_card)
+        self.conversation_list.update()
+
+    def _on_statement_delta(self, speaker_key: str, speaker: str, delta: str):
+        # 同じモデルの参加者は表示名が同じため、生成途中のカードは内部キーで区別する
+        streaming = self._streaming_statements.get(speaker_key)
+        if streaming is None:
+            markdown = ft.Markdown(
+                "",
+                selectable=True,
+                extension_set=ft.MarkdownExtensionSet.COMMON_MARK,
+            )
+            card = ft.Card(
+                ft.Container(
+                    ft.Column([
+                        self._build_statement_header(speaker, "発言中", "生成中..."),
+                        markdown,
+                    ]),
+                    padding=ft.padding.all(10),
+                )
+            )
+            streaming = {"card": card, "markdown": markdown, "last_update": time.monotonic()}
+            self._streaming_statements[speaker_key] = streaming
+            markdown.value = delta
+            self.conversation_list.controls.append(card)
+            self.conversation_list.update()
+            return
+
+        streaming["markdown"].value += delta
+        now = time.monotonic()
+        if now - streaming["last_update"] >= STREAM_UI_UPDATE_INTERVAL_SECONDS:
+            streaming["last_update"] = now
+            streaming["markdown"].update()
+
+    def _discard_stale_streaming_statements(self):
+        """確定されずに残った生成途中のカード（生成途中で失敗した発言）を取り除く"""
+        if not self._streaming_statements:
+            return
+        for streaming in self._streaming_statements.values():
+            if streaming["card"] in self.conversation_list.controls:
+                self.conversation_list.controls.remove(streaming["card"])
+        self._streaming_statements.clear()
         self.conversation_list.update()
 
-    def _on_phase_changed(self, phase: str):
+    def _on_summary_delta(self, delta: str):
+        self.result_text.value = (self.result_text.value or "") + delta
+        now = time.monotonic()
+        if now - self._summary_stream_last_update >= STREAM_UI_UPDATE_INTERVAL_SECONDS:
+            self._summary_stream_last_update = now
+            self.result_text.update()
+
+    def _on_phase_changed(self, phase: str, elapsed: Optional[float] = None):
+        if elapsed is not None:
+            # 会議開始前のフェーズの終了（並行して進むため、次のフェーズの通知で表示が上書きされることがある）
+            phase_labels = {
+                "loading_document": "資料の読み込み",
+                "retrieving_context": "関連情報の検索",
+                "initializing_participants": "参加者の初期化",
+                "digesting_document": "資料の抜粋作成",
+                "processing_document": "資料の要約",
+                "enhancing_personas": "ペルソナの強化",
+            }
+            self.progress_text.value = f"{phase_labels.get(phase, phase)}完了 ({elapsed:.1f}秒)"
+            self.progress_text.update()
+            return
         phase_messages = {
             "initializing_participants": "参加者を初期化中...",
             "processing_document": "資料を処理中...",
+            "enhancing_personas": "ペルソナを強化中...",
             "discussing": "議論を進行中...",
             "summarizing": "最終要約を生成中...",
             "completed": "会議完了",
@@ -470,12 +549,17 @@ class EventsMixin:
         self.progress_text.update()
 
     def _on_progress_update(self, phase_detail: str, current: int, total: int):
+        if phase_detail in ("discussing_round", "moderator_summary", "discussion_converged"):
+            # この時点で直前の発言・要約はすべて確定済み
+            self._discard_stale_streaming_statements()
         if phase_detail == "discussing_round":
             self.progress_text.value = f"議論中 - ラウンド {current}/{total}"
         elif phase_detail == "discussing_statement":
             self.progress_text.value = f"議論中 - {current}/{total} 発言目"
         elif phase_detail == "moderator_summary":
             self.progress_text.value = f"司会要約作成中 ({current}/{total})"
+        elif phase_detail == "discussion_converged":
+            self.progress_text.value = f"議論が収束したため、ラウンド {current}/{total} で最終要約に進みます"
         self.progress_text.update()
 
     async def _save_conversation(self, e):